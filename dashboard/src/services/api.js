@@ -1,4 +1,5 @@
 import { session } from '../data/session'
+import { initSocket, useSocket } from '../socket'
 
 // Debug flag for development
 const DEBUG = false
@@ -9,6 +10,7 @@ class ApiService {
     this.csrfToken = localStorage.getItem('csrf_token') || null // try load cached token
     this.csrfAttempted = false // avoid repeated failed attempts
     this.inFlight = new Map() // de-duplicate identical concurrent requests
+    this.conditional = new Map() // last ETag and payload per request, for If-None-Match
   }
 
   async request(endpoint, options = {}) {
@@ -46,10 +48,20 @@ class ApiService {
       return this.inFlight.get(inFlightKey)
     }
 
+    const cached = this.conditional.get(inFlightKey)
+    if (cached) {
+      defaultOptions.headers = { ...defaultOptions.headers, 'If-None-Match': cached.etag }
+    }
+
     const fetchPromise = (async () => {
       try {
         if (DEBUG) console.log('API Request:', { url, method: defaultOptions.method, headers: defaultOptions.headers })
         const response = await fetch(url, defaultOptions)
+        // Report data unchanged since the last response: reuse it
+        if (response.status === 304 && cached) {
+          if (DEBUG) console.log('API Not Modified:', endpoint)
+          return cached.data
+        }
         if (!response.ok) {
           // Redirect to login only on auth errors
           if (response.status === 401 || response.status === 403) {
@@ -63,7 +75,12 @@ class ApiService {
         const data = await response.json()
         if (DEBUG) console.log('API Response:', { endpoint, data })
         // Unwrap Frappe response so callers get plain objects/arrays
-        return (data && data.message !== undefined) ? data.message : data
+        const message = (data && data.message !== undefined) ? data.message : data
+        const etag = response.headers.get('ETag')
+        if (etag) {
+          this.conditional.set(inFlightKey, { etag, data: message })
+        }
+        return message
       } catch (error) {
         console.error('API request failed:', error)
         // Return mock data for testing
@@ -88,6 +105,145 @@ class ApiService {
     })
   }
 
+  /**
+   * Compute the dashboard in a background job instead of the web request.
+   * Same result as getDashboardData; onProgress receives { stage, progress }.
+   */
+  async getDashboardDataInBackground(filters = {}, onProgress = null) {
+    return this.runReportJob('get_dashboard_data', filters, {}, onProgress)
+  }
+
+  /**
+   * Run a report (get_dashboard_data, get_forecast_simulation, get_variance_ranking)
+   * as a background job and resolve with its result once the job reports 'done'.
+   */
+  async runReportJob(method, filters = {}, options = {}, onProgress = null) {
+    let jobId = null
+    const early = []
+    let settle = null
+    const finished = new Promise((resolve, reject) => { settle = { resolve, reject } })
+
+    const handle = async (message) => {
+      if (onProgress) onProgress(message)
+      if (message.stage === 'failed') {
+        settle.reject(new Error(message.error || 'Report job failed'))
+      } else if (message.stage === 'done') {
+        if (message.result != null) {
+          settle.resolve(message.result)
+        } else {
+          const response = await this.request('yearly_income_statement.api.get_report_job_result', {
+            method: 'POST',
+            body: JSON.stringify({ job_id: message.job_id })
+          })
+          if (response?.success) settle.resolve(response.result)
+          else settle.reject(new Error(response?.error || 'Report job result unavailable'))
+        }
+      }
+    }
+
+    // Subscribe before enqueueing; events that arrive before the job id is known are replayed
+    const unsubscribe = this.onRealtime('report_job_progress', (message) => {
+      if (jobId === null) early.push(message)
+      else if (message?.job_id === jobId) handle(message)
+    })
+    try {
+      const job = await this.request('yearly_income_statement.api.start_report_job', {
+        method: 'POST',
+        body: JSON.stringify({ method, filters, options })
+      })
+      jobId = job.job_id
+      early.filter((message) => message?.job_id === jobId).forEach(handle)
+      return await finished
+    } finally {
+      unsubscribe()
+    }
+  }
+
+  /**
+   * Get the P&L collapsed to a tree depth, or the children of one node
+   * @param {Object} filters - Dashboard filters
+   * @param {Object} view - { depth } for a collapsed view or { expandNode } for a drill-down
+   * @returns {Promise<Object>} Rolled-up rows for the requested level
+   */
+  async getDashboardTreeView(filters = {}, { depth = 1, expandNode = null } = {}) {
+    const treeFilters = expandNode ? { ...filters, expand_node: expandNode } : { ...filters, depth }
+    return this.request('yearly_income_statement.api.get_dashboard_tree_view', {
+      method: 'POST',
+      body: JSON.stringify({ filters: treeFilters })
+    })
+  }
+
+  /**
+   * Get dashboard data using the compact columnar payload
+   * @param {Object} filters - Dashboard filters
+   * @returns {Promise<Object>} Response with dashboard_data decoded back to row objects
+   */
+  async getDashboardDataColumnar(filters = {}) {
+    const response = await this.request('yearly_income_statement.api.get_dashboard_data', {
+      method: 'POST',
+      body: JSON.stringify({ filters, payload_format: 'columnar' })
+    })
+    return this.decodeColumnarDashboard(response)
+  }
+
+  /**
+   * Decode a columnar get_dashboard_data payload into the usual row objects.
+   * Ratios are derived from the amounts the same way the server's safe_ratio does.
+   * @param {Object} response - Response whose dashboard_data has format 'columnar'
+   * @returns {Object} Response with dashboard_data as an array of rows
+   */
+  decodeColumnarDashboard(response) {
+    const payload = response?.dashboard_data
+    if (!payload || payload.format !== 'columnar') return response
+
+    const ratio = (numerator, denominator) =>
+      denominator ? Math.round((numerator / denominator) * 1000) / 10 : 'N/A'
+    const width = payload.values.shape[1]
+    const data = payload.values.data
+    const periods = ['currentMonth', 'yearToDate', 'forecast']
+
+    const rows = new Array(payload.length)
+    for (let i = 0; i < payload.length; i++) {
+      const row = {}
+      payload.fields.forEach((field, f) => {
+        const dictionary = payload.dictionaries[field]
+        const value = dictionary ? dictionary[payload.columns[f][i]] : payload.columns[f][i]
+        if (value !== null && value !== undefined) row[field] = value
+      })
+
+      const offset = i * width
+      if (payload.has_amounts[i]) {
+        periods.forEach((period, p) => {
+          const base = offset + p * 3
+          const lastYear = data[base] / 100
+          const budget = data[base + 1] / 100
+          const actual = data[base + 2] / 100
+          row[period] = {
+            lastYear,
+            budget,
+            actual,
+            actBudThisYear: ratio(actual, budget),
+            actVsLastYear: ratio(actual, lastYear)
+          }
+        })
+      }
+
+      if (payload.has_monthly[i]) {
+        const monthlyBase = offset + periods.length * 3
+        row.monthly = {}
+        for (let m = 1; m <= 12; m++) {
+          row.monthly[m] = {
+            actual: data[monthlyBase + m - 1] / 100,
+            budget: data[monthlyBase + 12 + m - 1] / 100
+          }
+        }
+      }
+      rows[i] = row
+    }
+
+    return { ...response, dashboard_data: rows }
+  }
+
   async getDirectRevenueData(filters = {}) {
     return this.request('yearly_income_statement.api.get_direct_revenue_data', {
       method: 'POST',
@@ -124,6 +280,73 @@ class ApiService {
     })
   }
 
+  /**
+   * Get one page of GL entries behind a dashboard cell
+   * @param {Object} filters - company, account, cost_center and fiscal_year + month or from_date/to_date
+   * @param {string|null} cursor - next_cursor from the previous page
+   * @param {number} pageSize - Rows per page (server caps at 500)
+   * @returns {Promise<Object>} { gl_entries, has_more, next_cursor }
+   */
+  async getGlDrilldown(filters = {}, cursor = null, pageSize = 100) {
+    return this.request('yearly_income_statement.api.get_gl_drilldown', {
+      method: 'POST',
+      body: JSON.stringify({ filters, cursor, page_size: pageSize })
+    })
+  }
+
+  /**
+   * Break the GL behind a dashboard cell down by voucher type, party and cost center
+   * @param {Object} filters - Same filters as getGlDrilldown
+   * @param {number} topN - Contributors per dimension before the "Other" bucket
+   * @returns {Promise<Object>} { breakdown: { voucher_type, party, cost_center }, total }
+   */
+  async getCellBreakdown(filters = {}, topN = 10) {
+    return this.request('yearly_income_statement.api.get_cell_breakdown', {
+      method: 'POST',
+      body: JSON.stringify({ filters, top_n: topN })
+    })
+  }
+
+  /**
+   * Get the lines furthest from budget for the current month and YTD
+   * @param {Object} filters - Dashboard filters, optionally with section / report_class
+   * @param {number} topN - Lines per ranking
+   * @param {string} direction - 'over', 'under' or 'any'
+   * @returns {Promise<Object>} { ranking: { currentMonth, yearToDate } } with by_amount / by_percentage lists
+   */
+  async getVarianceRanking(filters = {}, topN = 20, direction = 'over') {
+    return this.request('yearly_income_statement.api.get_variance_ranking', {
+      method: 'POST',
+      body: JSON.stringify({ filters, top_n: topN, direction })
+    })
+  }
+
+  /**
+   * Get forecast actuals per account for a forecast mode, to patch the forecast column
+   * @param {Object} filters - Dashboard filters
+   * @param {string} mode - 'seasonal' or 'holt_winters'
+   * @returns {Promise<Object>} { forecasts: { account: amount }, elapsed_months }
+   */
+  async getForecastProjection(filters = {}, mode = 'seasonal') {
+    return this.request('yearly_income_statement.api.get_forecast_projection', {
+      method: 'POST',
+      body: JSON.stringify({ filters, mode })
+    })
+  }
+
+  /**
+   * Get Monte Carlo year-end ranges (P10/P50/P90) per section and for net profit
+   * @param {Object} filters - Dashboard filters
+   * @param {Object} options - { paths, seed } (seed makes results reproducible)
+   * @returns {Promise<Object>} { groups: [{ group, ytd_actual, expected, p10, p50, p90 }] }
+   */
+  async getForecastSimulation(filters = {}, { paths = 5000, seed = null } = {}) {
+    return this.request('yearly_income_statement.api.get_forecast_simulation', {
+      method: 'POST',
+      body: JSON.stringify({ filters, paths, seed })
+    })
+  }
+
   // Filter Data Endpoints
   async getCompanies() {
     return this.request('yearly_income_statement.api.get_companies')
@@ -256,6 +479,137 @@ class ApiService {
     return response
   }
 
+  /**
+   * Download the dashboard as an XLSX in the management pack layout.
+   * The browser handles the file response directly, so nothing is buffered here.
+   */
+  downloadManagementPack(filters = {}) {
+    this.download('yearly_income_statement.exports.export_management_pack', { filters })
+  }
+
+  /**
+   * Download GL entries (with report_class and root_type) for a date range or
+   * fiscal year as 'csv' or 'ndjson', streamed by the server.
+   */
+  downloadGlEntries(filters = {}, format = 'csv') {
+    this.download('yearly_income_statement.exports.export_gl_entries', { filters, format })
+  }
+
+  /**
+   * Download the aggregated dashboard rows as 'csv' or 'ndjson'.
+   */
+  downloadDashboardRows(filters = {}, format = 'csv') {
+    this.download('yearly_income_statement.exports.export_dashboard_rows', { filters, format })
+  }
+
+  /**
+   * Queue a management pack per cost center plus a consolidated one.
+   * @returns {Promise<Object>} { job_id, event } - follow it with onManagementPackProgress
+   */
+  async generateManagementPacks(filters = {}) {
+    return this.request('yearly_income_statement.exports.enqueue_management_packs', {
+      method: 'POST',
+      body: JSON.stringify({ filters })
+    })
+  }
+
+  /**
+   * Receive { stage: 'computing'|'rendering'|'done'|'failed', done, total, file_url }
+   * for one pack job. Returns an unsubscribe function.
+   */
+  onManagementPackProgress(jobId, callback) {
+    return this.onRealtime('management_pack_progress', (message) => {
+      if (message?.job_id === jobId) callback(message)
+    })
+  }
+
+  /**
+   * Follow GL postings for the company (and fiscal year) a dashboard shows.
+   * handler receives { company, fiscal_year, deltas: [[account, cost_center, month, amount, in_ytd]] }
+   * Returns an unsubscribe function.
+   */
+  subscribeGlDeltas(company, fiscalYear, handler) {
+    const socket = useSocket() || initSocket()
+    // gl_delta is published to the Company's document room; rejoin after reconnects
+    const join = () => socket.emit('doc_subscribe', 'Company', company)
+    const listener = (message) => {
+      if (message?.company !== company) return
+      if (fiscalYear && message.fiscal_year !== fiscalYear) return
+      handler(message)
+    }
+    join()
+    socket.on('connect', join)
+    socket.on('gl_delta', listener)
+    return () => {
+      socket.off('gl_delta', listener)
+      socket.off('connect', join)
+      socket.emit('doc_unsubscribe', 'Company', company)
+    }
+  }
+
+  /**
+   * Patch account rows in place with a gl_delta message.
+   * rowLists may share row objects; each row is patched once. Actuals move for
+   * YTD and forecast (postings up to today), the selected month and the monthly
+   * column, and the row's ratios are recomputed.
+   * @returns {number} Rows patched - 0 when the message does not touch this view
+   */
+  applyGlDeltas(message, rowLists, { costCenter = '', month = '' } = {}) {
+    const rowsByAccount = new Map()
+    for (const rows of rowLists) {
+      for (const row of rows || []) {
+        if (!row?.account || (row.type && row.type !== 'account')) continue
+        if (!rowsByAccount.has(row.account)) rowsByAccount.set(row.account, new Set())
+        rowsByAccount.get(row.account).add(row)
+      }
+    }
+
+    const ratio = (numerator, denominator) => (
+      denominator ? Math.round((numerator / denominator) * 1000) / 10 : 'N/A'
+    )
+    const bump = (period, amount) => {
+      if (!period) return
+      period.actual = (Number(period.actual) || 0) + amount
+      period.actBudThisYear = ratio(period.actual, Number(period.budget) || 0)
+      period.actVsLastYear = ratio(period.actual, Number(period.lastYear) || 0)
+    }
+
+    let patched = 0
+    for (const [account, deltaCostCenter, deltaMonth, amount, inYtd] of message?.deltas || []) {
+      if (costCenter && deltaCostCenter !== costCenter) continue
+      for (const row of rowsByAccount.get(account) || []) {
+        if (inYtd) {
+          bump(row.yearToDate, amount)
+          bump(row.forecast, amount)
+        }
+        if (month && Number(month) === deltaMonth) bump(row.currentMonth, amount)
+        const bucket = row.monthly?.[deltaMonth]
+        if (bucket) bucket.actual = (Number(bucket.actual) || 0) + amount
+        patched++
+      }
+    }
+    return patched
+  }
+
+  // Subscribe to a frappe.publish_realtime event; returns an unsubscribe function
+  onRealtime(event, handler) {
+    const socket = useSocket() || initSocket()
+    socket.on(event, handler)
+    return () => socket.off(event, handler)
+  }
+
+  // Navigate to a file endpoint so the browser streams it straight to disk
+  download(endpoint, params = {}) {
+    const query = new URLSearchParams(Object.entries(params).map(
+      ([key, value]) => [key, typeof value === 'object' ? JSON.stringify(value) : value]
+    ))
+    const a = document.createElement('a')
+    a.href = `${this.baseUrl}/${endpoint}?${query}`
+    document.body.appendChild(a)
+    a.click()
+    document.body.removeChild(a)
+  }
+
   // Data Transformation Methods - Updated for new backend structure
   transformDashboardData(response) {
     if (!response || !response.dashboard_data) {
@@ -4,6 +4,8 @@ from frappe.utils import flt, getdate, add_months, get_first_day, get_last_day,
 from datetime import datetime, timedelta
 import json
 
+from yearly_income_statement.forecasting import build_pair_matrix, safe_divide, trend_forecast
+
 
 @frappe.whitelist()
 def get_historical_data(filters=None):
@@ -209,67 +211,45 @@ def get_forecast_calculations(filters=None):
 
 def calculate_forecast_trends(current_data, previous_data):
 	"""
-	Calculate forecast based on trends
+	Calculate forecast based on trends, for all (account, cost_center) pairs at once
 	"""
-	forecast_data = []
-	
-	# Create lookup dictionaries
-	current_budget = {}
-	current_actual = {}
-	previous_budget = {}
-	previous_actual = {}
-	
-	# Process current year data
-	for item in current_data['budget_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		current_budget[key] = flt(item.get('budget_amount', 0))
-	
-	for item in current_data['actual_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		current_actual[key] = flt(item.get('net_amount', 0))
-	
-	# Process previous year data
-	for item in previous_data['budget_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		previous_budget[key] = flt(item.get('budget_amount', 0))
-	
-	for item in previous_data['actual_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		previous_actual[key] = flt(item.get('net_amount', 0))
-	
-	# Calculate forecasts
-	all_keys = set(list(current_budget.keys()) + list(current_actual.keys()))
-	
-	for key in all_keys:
-		account, cost_center = key.split('_', 1) if '_' in key else (key, '')
-		
-		current_budget_amount = current_budget.get(key, 0)
-		current_actual_amount = current_actual.get(key, 0)
-		previous_budget_amount = previous_budget.get(key, 0)
-		previous_actual_amount = previous_actual.get(key, 0)
-		
-		# Calculate growth rate
-		growth_rate = 0
-		if previous_actual_amount and previous_actual_amount != 0:
-			growth_rate = (current_actual_amount - previous_actual_amount) / previous_actual_amount
-		
-		# Calculate forecast (simple trend-based)
-		forecast_budget = current_budget_amount * (1 + growth_rate)
-		forecast_actual = current_actual_amount * (1 + growth_rate)
-		
-		forecast_data.append({
+	pairs, values = build_pair_matrix([
+		('current_budget', current_data['budget_data'], 'budget_amount'),
+		('current_actual', current_data['actual_data'], 'net_amount'),
+		('previous_budget', previous_data['budget_data'], 'budget_amount'),
+		('previous_actual', previous_data['actual_data'], 'net_amount'),
+	], key_series=('current_budget', 'current_actual'))
+	
+	# Calculate growth rate and simple trend-based forecast
+	growth_rate, forecast_budget, forecast_actual = trend_forecast(
+		values['current_budget'], values['current_actual'], values['previous_actual']
+	)
+	
+	columns = zip(
+		pairs,
+		forecast_budget.tolist(),
+		forecast_actual.tolist(),
+		(growth_rate * 100).tolist(),  # Convert to percentage
+		values['current_budget'].tolist(),
+		values['current_actual'].tolist(),
+		values['previous_budget'].tolist(),
+		values['previous_actual'].tolist(),
+		strict=True
+	)
+	return [
+		{
 			'account': account,
 			'cost_center': cost_center,
-			'forecast_budget': forecast_budget,
-			'forecast_actual': forecast_actual,
-			'growth_rate': growth_rate * 100,  # Convert to percentage
-			'current_budget': current_budget_amount,
-			'current_actual': current_actual_amount,
-			'previous_budget': previous_budget_amount,
-			'previous_actual': previous_actual_amount
-		})
-	
-	return forecast_data
+			'forecast_budget': f_budget,
+			'forecast_actual': f_actual,
+			'growth_rate': growth,
+			'current_budget': c_budget,
+			'current_actual': c_actual,
+			'previous_budget': p_budget,
+			'previous_actual': p_actual
+		}
+		for (account, cost_center), f_budget, f_actual, growth, c_budget, c_actual, p_budget, p_actual in columns
+	]
 
 
 @frappe.whitelist()
@@ -301,115 +281,79 @@ def combine_dashboard_data(historical_data, ytd_data, forecast_data, filters):
 	"""
 	comprehensive_data = []
 	
-	# Get all unique accounts and cost centers
-	all_accounts = set()
-	
-	# Collect accounts from all data sources
-	for data_source in [historical_data['current_year'], historical_data['previous_year'], ytd_data]:
-		for item in data_source['budget_data'] + data_source['actual_data']:
-			all_accounts.add(item.get('account'))
-	
-	# Create lookup dictionaries
-	current_budget = {}
-	current_actual = {}
-	previous_budget = {}
-	previous_actual = {}
-	ytd_budget = {}
-	ytd_actual = {}
-	forecast_budget = {}
-	forecast_actual = {}
-	
-	# Process current year data
-	for item in historical_data['current_year']['budget_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		current_budget[key] = flt(item.get('budget_amount', 0))
-	
-	for item in historical_data['current_year']['actual_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		current_actual[key] = flt(item.get('net_amount', 0))
-	
-	# Process previous year data
-	for item in historical_data['previous_year']['budget_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		previous_budget[key] = flt(item.get('budget_amount', 0))
-	
-	for item in historical_data['previous_year']['actual_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		previous_actual[key] = flt(item.get('net_amount', 0))
-	
-	# Process YTD data
-	for item in ytd_data['ytd_budget_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		ytd_budget[key] = flt(item.get('ytd_budget_amount', 0))
-	
-	for item in ytd_data['ytd_actual_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		ytd_actual[key] = flt(item.get('net_amount', 0))
-	
-	# Process forecast data
-	for item in forecast_data['forecast_data']:
-		key = f"{item.get('account')}_{item.get('cost_center', '')}"
-		forecast_budget[key] = flt(item.get('forecast_budget', 0))
-		forecast_actual[key] = flt(item.get('forecast_actual', 0))
+	# Load every series into vectors aligned on (account, cost_center)
+	pairs, values = build_pair_matrix([
+		('current_budget', historical_data['current_year']['budget_data'], 'budget_amount'),
+		('current_actual', historical_data['current_year']['actual_data'], 'net_amount'),
+		('previous_budget', historical_data['previous_year']['budget_data'], 'budget_amount'),
+		('previous_actual', historical_data['previous_year']['actual_data'], 'net_amount'),
+		('ytd_budget', ytd_data['ytd_budget_data'], 'ytd_budget_amount'),
+		('ytd_actual', ytd_data['ytd_actual_data'], 'net_amount'),
+		('forecast_budget', forecast_data['forecast_data'], 'forecast_budget'),
+		('forecast_actual', forecast_data['forecast_data'], 'forecast_actual'),
+	])
+	pair_index = {pair: i for i, pair in enumerate(pairs)}
+	
+	# Calculate ratios
+	ratios = {
+		'current_act_bud': safe_divide(values['current_actual'], values['current_budget'], 100),
+		'previous_act_bud': safe_divide(values['previous_actual'], values['previous_budget'], 100),
+		'ytd_act_bud': safe_divide(values['ytd_actual'], values['ytd_budget'], 100),
+		'forecast_act_bud': safe_divide(values['forecast_actual'], values['forecast_budget'], 100),
+		# Year-over-year ratios
+		'current_vs_previous': safe_divide(values['current_actual'], values['previous_actual'], 100),
+		'ytd_current_vs_previous': safe_divide(values['ytd_actual'], values['previous_actual'], 100),
+		'forecast_current_vs_previous': safe_divide(values['forecast_actual'], values['previous_actual'], 100),
+	}
+	values = {name: column.tolist() for name, column in values.items()}
+	ratios = {name: column.tolist() for name, column in ratios.items()}
+	
+	# Index cost centers per account in one pass over the budget/actual sources
+	cost_centers_by_account = {}
+	for rows in (
+		historical_data['current_year']['budget_data'], historical_data['current_year']['actual_data'],
+		historical_data['previous_year']['budget_data'], historical_data['previous_year']['actual_data'],
+		ytd_data['ytd_budget_data'], ytd_data['ytd_actual_data'],
+	):
+		for item in rows:
+			cost_centers_by_account.setdefault(item.get('account'), {})[item.get('cost_center') or ''] = None
+	
+	# Load account names in one query
+	account_names = dict(frappe.get_all(
+		"Account",
+		filters={"name": ["in", list(cost_centers_by_account)]},
+		fields=["name", "account_name"],
+		as_list=True
+	)) if cost_centers_by_account else {}
 	
 	# Build comprehensive dashboard data
-	for account in all_accounts:
-		account_doc = frappe.get_doc("Account", account)
-		
-		# Get cost centers for this account
-		cost_centers = set()
-		for data_source in [historical_data['current_year'], historical_data['previous_year'], ytd_data]:
-			for item in data_source['budget_data'] + data_source['actual_data']:
-				if item.get('account') == account:
-					cost_centers.add(item.get('cost_center', ''))
-		
+	for account, cost_centers in cost_centers_by_account.items():
 		for cost_center in cost_centers:
-			key = f"{account}_{cost_center}"
-			
-			# Get values for all periods
-			current_budget_amount = current_budget.get(key, 0)
-			current_actual_amount = current_actual.get(key, 0)
-			previous_budget_amount = previous_budget.get(key, 0)
-			previous_actual_amount = previous_actual.get(key, 0)
-			ytd_budget_amount = ytd_budget.get(key, 0)
-			ytd_actual_amount = ytd_actual.get(key, 0)
-			forecast_budget_amount = forecast_budget.get(key, 0)
-			forecast_actual_amount = forecast_actual.get(key, 0)
-			
-			# Calculate ratios
-			current_act_bud = (current_actual_amount / current_budget_amount * 100) if current_budget_amount else 0
-			previous_act_bud = (previous_actual_amount / previous_budget_amount * 100) if previous_budget_amount else 0
-			ytd_act_bud = (ytd_actual_amount / ytd_budget_amount * 100) if ytd_budget_amount else 0
-			forecast_act_bud = (forecast_actual_amount / forecast_budget_amount * 100) if forecast_budget_amount else 0
-			
-			# Calculate year-over-year ratios
-			current_vs_previous = (current_actual_amount / previous_actual_amount * 100) if previous_actual_amount else 0
-			ytd_current_vs_previous = (ytd_actual_amount / previous_actual_amount * 100) if previous_actual_amount else 0
-			forecast_current_vs_previous = (forecast_actual_amount / previous_actual_amount * 100) if previous_actual_amount else 0
+			i = pair_index[(account, cost_center)]
 			
 			row = {
 				'account': account,
-				'account_name': account_doc.account_name,
+				'account_name': account_names.get(account, account),
 				'cost_center': cost_center,
 				# Last Year
-				'last_year_budget': previous_budget_amount,
-				'last_year_actual': previous_actual_amount,
-				'last_year_act_bud': previous_act_bud,
+				'last_year_budget': values['previous_budget'][i],
+				'last_year_actual': values['previous_actual'][i],
+				'last_year_act_bud': ratios['previous_act_bud'][i],
 				# This Year
-				'this_year_budget': current_budget_amount,
-				'this_year_actual': current_actual_amount,
-				'this_year_act_bud': current_act_bud,
-				'this_year_vs_last_year': current_vs_previous,
+				'this_year_budget': values['current_budget'][i],
+				'this_year_actual': values['current_actual'][i],
+				'this_year_act_bud': ratios['current_act_bud'][i],
+				'this_year_vs_last_year': ratios['current_vs_previous'][i],
 				# YTD
-				'ytd_budget': ytd_budget_amount,
-				'ytd_actual': ytd_actual_amount,
-				'ytd_act_bud': ytd_act_bud,
-				'ytd_vs_last_year': ytd_current_vs_previous,
+				'ytd_budget': values['ytd_budget'][i],
+				'ytd_actual': values['ytd_actual'][i],
+				'ytd_act_bud': ratios['ytd_act_bud'][i],
+				'ytd_vs_last_year': ratios['ytd_current_vs_previous'][i],
 				# Forecast
-				'forecast_budget': forecast_budget_amount,
-				'forecast_actual': forecast_actual_amount,
-				'forecast_act_bud': forecast_act_bud,
-				'forecast_vs_last_year': forecast_current_vs_previous
+				'forecast_budget': values['forecast_budget'][i],
+				'forecast_actual': values['forecast_actual'][i],
+				'forecast_act_bud': ratios['forecast_act_bud'][i],
+				'forecast_vs_last_year': ratios['forecast_current_vs_previous'][i]
 			}
 			
 			comprehensive_data.append(row)
@@ -2,8 +2,32 @@ import frappe
 from frappe import _
 from frappe.utils import flt, getdate, add_months, get_first_day, get_last_day, add_years, today
 from datetime import datetime, timedelta
+import contextlib
+import functools
+import hashlib
+import heapq
 import json
 import re
+import time
+
+from yearly_income_statement.dashboard_core import (
+    AMOUNT_KEYS,
+    DASHBOARD_GL_PERIODS,
+    PERIOD_KEYS,
+    build_dashboard_rows,
+    build_period_list,
+    build_summary_data,
+    calculate_account_financial_data,
+    clamp_ytd_end,
+    compute_section_and_flags,
+    filter_accounts_hierarchy,
+    get_report_windows,
+    pre_aggregate_gl_entries,
+    safe_ratio,
+)
+from yearly_income_statement.metrics import increment, observe_job, record_cache
+from yearly_income_statement.profiling import profiled_report
+from yearly_income_statement.tracing import report_trace, trace_stage, trace_summary
 
 # Row types for structured data
 ROW_TYPES = {
@@ -15,18 +39,95 @@ ROW_TYPES = {
     'TOTAL': 'total'
 }
 
-def safe_ratio(numerator, denominator, default='N/A'):
-    """Helper function to safely calculate ratios with error handling"""
-    if not denominator or denominator == 0:
-        return default
+# Filter keys that select a collapsed tree view instead of the flat dashboard
+TREE_VIEW_KEYS = ('depth', 'expand_node')
+ROLLUP_ROOT = '__root__'
+ROLLUP_META = '__meta__'
+ROLLUP_CACHE_TTL = 600
+
+# Saved dashboard views are pre-computed by tasks.warm_saved_dashboard_views; entries
+# are only served for their own data version, so the TTL just bounds abandoned views
+WARM_DASHBOARD_TTL = 2 * 24 * 3600
+
+# Identical report computations in flight on different workers are coalesced
+# (single_flight): one worker computes while the others wait for its result
+SINGLE_FLIGHT_LOCK_TTL = 300
+SINGLE_FLIGHT_WAIT_SEC = 60
+SINGLE_FLIGHT_RESULT_TTL = 30
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+DRILLDOWN_PAGE_SIZE = 100
+DRILLDOWN_MAX_PAGE_SIZE = 500
+
+# Dimensions a dashboard cell can be broken down by, and their GL Entry columns
+BREAKDOWN_DIMENSIONS = {
+    'voucher_type': ('voucher_type',),
+    'party': ('party_type', 'party'),
+    'cost_center': ('cost_center',)
+}
+BREAKDOWN_TOP_N = 10
+
+VARIANCE_TOP_N = 20
+VARIANCE_DIRECTIONS = ('over', 'under', 'any')
+
+# 'budget' is the default YTD actual + remaining budget forecast built in dashboard_core.build_account_row
+FORECAST_MODES = ('budget', 'seasonal', 'holt_winters')
+MONTHLY_HISTORY_MONTHS = 24
+FORECAST_CACHE_TTL = 3600
+
+SIMULATION_PATHS = 5000
+SIMULATION_MAX_PATHS = 50000
+SIMULATION_PERCENTILES = (10, 50, 90)
+
+# Reports that can run as background jobs (start_report_job), with progress
+# published as REPORT_JOB_EVENT and results kept in the cache for REPORT_JOB_RESULT_TTL
+REPORT_JOB_METHODS = ('get_dashboard_data', 'get_forecast_simulation', 'get_variance_ranking')
+REPORT_JOB_EVENT = 'report_job_progress'
+REPORT_JOB_TIMEOUT = 1500
+REPORT_JOB_RESULT_TTL = 1800
+REPORT_JOB_INLINE_BYTES = 256 * 1024
+
+# Columnar payload layout: descriptive row fields (the repetitive ones dictionary-encoded)
+COLUMNAR_ROW_FIELDS = (
+    'type', 'category', 'account', 'root_type', 'report_class', 'section',
+    'indent', 'is_group', 'is_direct', 'has_children'
+)
+COLUMNAR_DICT_FIELDS = ('type', 'root_type', 'report_class', 'section')
+
+@contextlib.contextmanager
+def shared_report_aggregation():
+    """Share source data between the dashboards computed inside the block.
+
+    Used when one job computes the same report for many cost centers: account
+    lists, classification maps and budgets are loaded once, and each GL
+    window is read once for all cost centers and partitioned in memory.
+    """
+    previous = frappe.flags.shared_report_aggregation
+    frappe.flags.shared_report_aggregation = {}
     try:
-        ratio = (numerator / denominator) * 100
-        return round(ratio, 1)
-    except (TypeError, ValueError, ZeroDivisionError):
-        return default
+        yield
+    finally:
+        frappe.flags.shared_report_aggregation = previous
+
+def get_shared(key, loader):
+    """loader(), evaluated once per shared_report_aggregation block (every call outside one)"""
+    shared = frappe.flags.shared_report_aggregation
+    if shared is None:
+        return loader()
+    if key not in shared:
+        shared[key] = loader()
+    return shared[key]
 
 def build_include_in_gross_map(company: str) -> dict[str, int]:
     """Return {account_name: 0/1} where 1 if the account OR any ancestor has include_in_gross."""
+    return get_shared(('include_in_gross', company), lambda: load_include_in_gross_map(company))
+
+def load_include_in_gross_map(company):
     rows = frappe.db.sql("""
         SELECT a.name,
                MAX(COALESCE(p.include_in_gross, 0)) AS inc_gross_any_parent
@@ -40,6 +141,10 @@ def build_include_in_gross_map(company: str) -> dict[str, int]:
 
 def build_report_class_direct_map(reporting_framework=None):
     """Return mapping of report_class -> is_direct (bool). Optionally filter by framework."""
+    return get_shared(('report_class_direct', reporting_framework),
+                      lambda: load_report_class_direct_map(reporting_framework))
+
+def load_report_class_direct_map(reporting_framework=None):
     try:
         if reporting_framework:
             rows = frappe.db.sql(
@@ -70,121 +175,6 @@ def build_report_class_direct_map(reporting_framework=None):
         return {}
 
 
-def compute_section_and_flags(acc, inc_gross_map, report_class_direct_map=None):
-    """Determine section and cost-of-sales flags using ERPNext-native semantics augmented with report_class.is_direct."""
-    if report_class_direct_map is None:
-        report_class_direct_map = {}
-
-    root = (acc.get("root_type") or "").strip()
-    acct_type = (acc.get("account_type") or "").strip()
-    inc_gross = bool(inc_gross_map.get(acc["name"], 0))
-    report_class = (acc.get("report_class") or "").strip()
-
-    # Hotel-specific cost of sales report classes
-    HOTEL_COS_CLASSES = {"Food", "Beverage", "Room", "Other Costs", "Cost of Sales"}
-
-    # Report class direct flag (from doctype)
-    rc_is_direct = bool(report_class_direct_map.get(report_class, False))
-
-
-
-    # Determine if this is a cost of sales account
-    is_cost_of_sales = (
-        root == "Expense" and (
-            inc_gross or
-            acct_type in {"Cost of Goods Sold", "Direct Expenses", "Cost of Sales"} or
-            report_class in HOTEL_COS_CLASSES or
-            rc_is_direct  # treat expense classes marked direct as cost of sales/direct expenses
-        )
-    )
-
-    # Define specific expense categories for proper classification
-    SALARY_EXPENSE_CLASSES = {
-        "Salaries & Wages", "Salary", "Wages", "Payroll"
-    }
-
-    PAYROLL_BURDEN_CLASSES = {
-        "Payroll Burden", "Burden", "Statutory", "Employer",
-        "Social Security", "Provident Fund", "Pension", "SSNIT",
-        "Gratuity", "Severance", "Vacation Pay", "Sick Pay"
-    }
-
-    DIRECT_OPERATIONAL_CLASSES = {
-        "Direct Expenses", "Operational", "Maintenance", "Utilities", "Supplies"
-    }
-
-    # Administrative and overhead expenses (should be Indirect)
-    ADMINISTRATIVE_CLASSES = {
-        "Administrative Expenses", "Admin", "Overhead", "Office",
-        "Marketing", "Advertising", "Professional Fees", "Depreciation",
-        "Amortization", "Insurance", "Rent", "Taxes", "Miscellaneous"
-    }
-
-    # Determine if this is a salary/wages expense
-    is_salary_expense = (
-        root == "Expense" and
-        not is_cost_of_sales and
-        (report_class in SALARY_EXPENSE_CLASSES or
-         "salary" in report_class.lower() or
-         "wage" in report_class.lower())
-    )
-
-    # Determine if this is a payroll burden expense
-    is_payroll_burden = (
-        root == "Expense" and
-        not is_cost_of_sales and
-        any(keyword.lower() in report_class.lower() for keyword in
-            ["burden", "statutory", "employer", "social security", "provident",
-             "pension", "ssnit", "gratuity", "severance", "vacation", "sick"])
-    )
-
-    # Determine if this is a direct operational expense
-    is_direct_operational = (
-        root == "Expense" and
-        not is_cost_of_sales and
-        (rc_is_direct or report_class in DIRECT_OPERATIONAL_CLASSES)
-    )
-
-    # Determine if this is an administrative/overhead expense (Indirect)
-    is_administrative = (
-        root == "Expense" and
-        not is_cost_of_sales and
-        any(keyword.lower() in report_class.lower() for keyword in
-            ["administrative", "admin", "overhead", "office", "marketing",
-             "insurance", "rent", "depreciation", "amortization"])
-    )
-
-    # Determine if this is direct revenue
-    is_direct_revenue = (
-        root == "Income" and (
-            rc_is_direct or
-            report_class in {"Room", "Food", "Beverage", "Spa", "Conference", "Pool", "Gym", "Direct Revenue", "Other Revenue"}
-        )
-    )
-
-    # Return appropriate section and flags
-    if root == "Income":
-        if is_direct_revenue:
-            return "Direct Revenue", True
-        else:
-            return "Indirect Revenue", False
-    elif root == "Expense":
-        if is_cost_of_sales:
-            return "Cost of Sales", True
-        elif is_salary_expense:
-            return "Salaries & Wages", True
-        elif is_payroll_burden:
-            return "Payroll Burden", True
-        elif is_direct_operational:
-            return "Direct Expenses", True
-        elif is_administrative:
-            return "Indirect Expenses", True
-        else:
-            # Only truly uncategorized expenses should default to Indirect Expenses
-            return "Indirect Expenses", False
-    else:
-        return "Other", False
-
 def get_previous_fiscal_year(current_fiscal_year):
     """Get the previous fiscal year name"""
     try:
@@ -204,6 +194,11 @@ def get_previous_fiscal_year(current_fiscal_year):
 
 def get_all_accounts(company, root_type):
     """True ERPNext tree: keep parent_account, lft, rgt. Include report_class."""
+    accounts = get_shared(('accounts', company, root_type), lambda: load_all_accounts(company, root_type))
+    # Callers annotate account rows in place (indent), so hand out copies
+    return [frappe._dict(a) for a in accounts]
+
+def load_all_accounts(company, root_type):
     return frappe.db.sql("""
         SELECT
             name,
@@ -225,19 +220,15 @@ def get_all_accounts(company, root_type):
         ORDER BY lft
     """, (company, root_type), as_dict=1)
 
-def get_gl_entries_for_period(company, from_date, to_date, additional_filters=None):
-    """Get GL entries for a specific period with Account join to carry report_class and root_type"""
-    filters = {
+def get_gl_entries_query(company, from_date, to_date, additional_filters=None):
+    """SQL and parameters selecting GL entries for a period, joined with Account for report_class and root_type"""
+    params = {
         'company': company,
-        'posting_date': ['between', [from_date, to_date]],
-        'is_cancelled': 0
+        'from_date': from_date,
+        'to_date': to_date,
+        **(additional_filters or {})
     }
-    
-    if additional_filters:
-        filters.update(additional_filters)
-    
-    # Always join with Account to get report_class and root_type
-    gl_entries = frappe.db.sql("""
+    query = """
         SELECT 
             gl.name,
             gl.account,
@@ -266,416 +257,411 @@ def get_gl_entries_for_period(company, from_date, to_date, additional_filters=No
         WHERE gl.company = %(company)s
           AND gl.posting_date BETWEEN %(from_date)s AND %(to_date)s
           AND gl.is_cancelled = 0
-    """ + 
-        (" AND gl.cost_center = %(cost_center)s" if additional_filters and additional_filters.get('cost_center') else "") +
-    """
+    """ + (
+        " AND gl.cost_center = %(cost_center)s" if additional_filters and additional_filters.get('cost_center') else ""
+    ) + """
         ORDER BY gl.posting_date, gl.name
-    """, {
-        'company': company,
-        'from_date': from_date,
-        'to_date': to_date,
-        **additional_filters
-    } if additional_filters else {
-        'company': company,
-        'from_date': from_date,
-        'to_date': to_date
-    }, as_dict=1)
-    
-    return gl_entries
-
-def pre_aggregate_gl_entries(gl_entries):
-    """Pre-aggregate GL entries per account per period to avoid double-counting"""
-    aggregated = {}
-    
-    for entry in gl_entries:
-        account = entry.get('account')
-        if not account:
-            continue
-            
-        # Create key for this account
-        if account not in aggregated:
-            aggregated[account] = {
-                'debit': 0,
-                'credit': 0,
-                'net_amount': 0
-            }
-        
-        # Sum up debits and credits
-        aggregated[account]['debit'] += entry.get('debit', 0)
-        aggregated[account]['credit'] += entry.get('credit', 0)
-    
-    # Calculate net amounts
-    for account_data in aggregated.values():
-        account_data['net_amount'] = account_data['debit'] - account_data['credit']
-    
-    return aggregated
-
-def aggregate_monthly_amounts(gl_entries):
-    """Aggregate GL entries by account and posting month (1-12) for the fiscal period provided in gl_entries.
-    Returns: { account_name: { month_number: amount } }
     """
-    monthly_map = {}
-    for entry in gl_entries or []:
-        try:
-            account = entry.get('account')
-            if not account:
-                continue
-            posting_month = getdate(entry.get('posting_date')).month
-            account_map = monthly_map.setdefault(account, {})
-            account_map[posting_month] = account_map.get(posting_month, 0) + (entry.get('debit', 0) - entry.get('credit', 0))
-        except Exception:
-            # Skip malformed entries
-            continue
-    # Convert to absolute values to match dashboard presentation
-    for account, by_month in monthly_map.items():
-        for m in list(by_month.keys()):
-            by_month[m] = abs(by_month[m])
-    return monthly_map
-
-def get_cost_centers_with_children(cost_centers):
-    """Get cost center and its children (mimics ERPNext's function)"""
-    if not isinstance(cost_centers, list):
-        cost_centers = [d.strip() for d in cost_centers.strip().split(",") if d]
-    
-    all_cost_centers = []
-    for d in cost_centers:
-        if frappe.db.exists("Cost Center", d):
-            lft, rgt = frappe.db.get_value("Cost Center", d, ["lft", "rgt"])
-            children = frappe.get_all("Cost Center", filters={"lft": [">=", lft], "rgt": ["<=", rgt]})
-            all_cost_centers += [c.name for c in children]
-        else:
-            frappe.throw(_("Cost Center: {0} does not exist").format(d))
-    
-    return list(set(all_cost_centers))
+    return query, params
 
-def get_budget_data(fiscal_year, account, cost_center=None):
-    """Get budget data for an account"""
-    conditions = ["b.fiscal_year = %s", "ba.account = %s"]
-    params = [fiscal_year, account]
+def get_gl_entries_for_period(company, from_date, to_date, additional_filters=None):
+    """Get GL entries for a specific period with Account join to carry report_class and root_type"""
+    cost_center = (additional_filters or {}).get('cost_center')
+    if frappe.flags.shared_report_aggregation is not None:
+        entries, by_cost_center = get_shared(
+            ('gl', company, str(from_date), str(to_date)),
+            lambda: load_partitioned_gl_entries(company, from_date, to_date)
+        )
+        return by_cost_center.get(cost_center, []) if cost_center else entries
+
+    query, params = get_gl_entries_query(company, from_date, to_date, additional_filters)
+    return frappe.db.sql(query, params, as_dict=1)
+
+def load_partitioned_gl_entries(company, from_date, to_date):
+    """All cost centers' GL entries for a window, plus the same entries keyed by cost center"""
+    query, params = get_gl_entries_query(company, from_date, to_date)
+    entries = frappe.db.sql(query, params, as_dict=1)
+    by_cost_center = {}
+    for entry in entries:
+        by_cost_center.setdefault(entry.get('cost_center'), []).append(entry)
+    return entries, by_cost_center
+
+def get_budget_map(fiscal_year, cost_center=None):
+    """Get budget amounts for every account in one query: {account: budget_amount}"""
+    if frappe.flags.shared_report_aggregation is not None:
+        by_cost_center = get_shared(('budgets', fiscal_year), lambda: load_budgets_by_cost_center(fiscal_year))
+        return by_cost_center.get(cost_center or None, {})
+
+    conditions = ["b.fiscal_year = %s"]
+    params = [fiscal_year]
     
     if cost_center:
         conditions.append("b.cost_center = %s")
         params.append(cost_center)
     
-    sql = """
-        SELECT SUM(ba.budget_amount) as budget_amount
+    rows = frappe.db.sql("""
+        SELECT ba.account, SUM(ba.budget_amount) as budget_amount
         FROM `tabBudget Account` ba
         INNER JOIN `tabBudget` b ON ba.parent = b.name
         WHERE {}
-    """.format(" AND ".join(conditions))
-    
-    result = frappe.db.sql(sql, params, as_dict=1)
-    return result[0]['budget_amount'] if result and result[0]['budget_amount'] else 0
-
-def calculate_account_financial_data(account, current_gl_entries, prev_gl_entries, ytd_gl_entries, 
-                                   ytd_last_year_gl_entries, current_month_gl_entries, 
-                                   current_month_last_year_gl_entries, fiscal_year, prev_fiscal_year,
-                                   from_date, to_date, ytd_end_date, selected_cost_center, selected_month):
-    """Calculate financial data for an account using pre-fetched GL entries"""
-    
-    account_code = account['name']
-    account_type = account['root_type']
-    
-    # Get current year actual data from pre-fetched GL entries
-    current_actual_amount = 0
-    for entry in current_gl_entries:
-        if entry['account'] == account_code:
-            current_actual_amount += entry['net_amount']
-    
-    # Get current year budget
-    current_budget_amount = get_budget_data(fiscal_year, account_code, selected_cost_center)
-    
-    # Get previous year data from pre-fetched GL entries
-    prev_actual_amount = 0
-    for entry in prev_gl_entries:
-        if entry['account'] == account_code:
-            prev_actual_amount += entry['net_amount']
-    
-    prev_budget_amount = get_budget_data(prev_fiscal_year, account_code, selected_cost_center)
-    
-    # Calculate YTD data from pre-fetched GL entries
-    ytd_actual_amount = 0
-    for entry in ytd_gl_entries:
-        if entry['account'] == account_code:
-            ytd_actual_amount += entry['net_amount']
-    
-    # Calculate YTD budget (proportional)
-    days_elapsed = (getdate(ytd_end_date) - getdate(from_date)).days
-    total_days = (getdate(to_date) - getdate(from_date)).days
-    ytd_budget_amount = current_budget_amount * (days_elapsed / total_days) if total_days > 0 else 0
-    
-    # Get YTD last year data from pre-fetched GL entries
-    ytd_last_year_amount = 0
-    for entry in ytd_last_year_gl_entries:
-        if entry['account'] == account_code:
-            ytd_last_year_amount += entry['net_amount']
-    
-    # Calculate current month data if month is selected
-    current_month_budget_amount = 0
-    current_month_actual_amount = 0
-    current_month_last_year_amount = 0
-    
-    if selected_month and selected_month.strip() and current_month_gl_entries:
-        # Current month budget (proportional)
-        month_ratio = 1/12
-        current_month_budget_amount = current_budget_amount * month_ratio
-        
-        # Current month actual from pre-fetched GL entries
-        for entry in current_month_gl_entries:
-            if entry['account'] == account_code:
-                current_month_actual_amount += entry['net_amount']
-        
-        # Current month last year from pre-fetched GL entries
-        for entry in current_month_last_year_gl_entries:
-            if entry['account'] == account_code:
-                current_month_last_year_amount += entry['net_amount']
-    
-    # Forecast calculations: Forecast = YTD Actual + Remaining Budget
-    remaining_budget_amount = max(current_budget_amount - ytd_budget_amount, 0)
-    forecast_actual = ytd_actual_amount + remaining_budget_amount
-    forecast_budget = current_budget_amount
-    
-    return {
-        'currentMonth': {
-            'lastYear': current_month_last_year_amount,
-            'budget': current_month_budget_amount,
-            'actual': current_month_actual_amount,
-            'actBudThisYear': safe_ratio(current_month_actual_amount, current_month_budget_amount),
-            'actVsLastYear': safe_ratio(current_month_actual_amount, current_month_last_year_amount)
-        },
-        'yearToDate': {
-            'lastYear': ytd_last_year_amount,
-            'budget': ytd_budget_amount,
-            'actual': ytd_actual_amount,
-            'actBudThisYear': safe_ratio(ytd_actual_amount, ytd_budget_amount),
-            'actVsLastYear': safe_ratio(ytd_actual_amount, ytd_last_year_amount)
-        },
-        'forecast': {
-            'lastYear': prev_actual_amount,
-            'budget': forecast_budget,
-            'actual': forecast_actual,
-            'actBudThisYear': safe_ratio(forecast_actual, forecast_budget),
-            'actVsLastYear': safe_ratio(forecast_actual, prev_actual_amount)
-        }
-    }
-
-def filter_accounts_hierarchy(accounts, depth=20):
-    """Filter accounts using ERPNext's hierarchy approach"""
-    parent_children_map = {}
-    accounts_by_name = {}
-    
-    for d in accounts:
-        accounts_by_name[d['name']] = d
-        parent_key = d.get('parent_account') or None
-        parent_children_map.setdefault(parent_key, []).append(d)
-    
-    filtered_accounts = []
-    
-    def add_to_list(parent, level):
-        if level < depth:
-            children = parent_children_map.get(parent) or []
-            # Sort by lft to maintain tree order
-            children.sort(key=lambda x: x.get('lft', 0))
-            
-            for child in children:
-                child['indent'] = level
-                filtered_accounts.append(child)
-                add_to_list(child['name'], level + 1)
-    
-    add_to_list(None, 0)
-    return filtered_accounts, accounts_by_name, parent_children_map
+        GROUP BY ba.account
+    """.format(" AND ".join(conditions)), params, as_dict=1)
+    return {r['account']: r['budget_amount'] or 0 for r in rows}
 
-def get_accounts_with_hierarchy(accounts, gl_entries):
-    """Organize accounts using ERPNext's hierarchical approach"""
-    # Filter accounts to create proper hierarchy
-    filtered_accounts, accounts_by_name, parent_children_map = filter_accounts_hierarchy(accounts)
-    
-    # Add GL entries to each account
-    for account in filtered_accounts:
-        account_name = account['name']
-        account_entries = [entry for entry in gl_entries if entry.get('account') == account_name]
-        account['gl_entries'] = account_entries
-    
-    return filtered_accounts, accounts_by_name, parent_children_map
-
-def process_account_data(account, ytd_gl_entries, ytd_last_year_gl_entries, 
-                        current_month_gl_entries, current_month_last_year_gl_entries,
-                        ytd_budget_entries, current_month_budget_entries,
-                        forecast_budget_entries, forecast_actual_entries,
-                        monthly_actuals_map=None, fiscal_year=None, selected_cost_center=None):
-    """Process a single account and return formatted data using pre-aggregated GL entries"""
-    account_name = account['name']
-    
-    # Pre-aggregate GL entries for each period to avoid double-counting
-    ytd_aggregated = pre_aggregate_gl_entries(ytd_gl_entries)
-    ytd_last_year_aggregated = pre_aggregate_gl_entries(ytd_last_year_gl_entries)
-    current_month_aggregated = pre_aggregate_gl_entries(current_month_gl_entries)
-    current_month_last_year_aggregated = pre_aggregate_gl_entries(current_month_last_year_gl_entries)
-    
-    # Get aggregated data for this specific account
-    ytd_data = ytd_aggregated.get(account_name, {'net_amount': 0})
-    ytd_last_year_data = ytd_last_year_aggregated.get(account_name, {'net_amount': 0})
-    current_month_data = current_month_aggregated.get(account_name, {'net_amount': 0})
-    current_month_last_year_data = current_month_last_year_aggregated.get(account_name, {'net_amount': 0})
-    
-    # Calculate amounts from pre-aggregated GL entries
-    ytd_actual = abs(ytd_data['net_amount'])
-    ytd_last_year = abs(ytd_last_year_data['net_amount'])
-    current_month_actual = abs(current_month_data['net_amount'])
-    current_month_last_year = abs(current_month_last_year_data['net_amount'])
-    
-    # Budget entries: compute annual budget and derive YTD/current month proportions
-    annual_budget = 0
+def load_budgets_by_cost_center(fiscal_year):
+    """{cost_center: {account: budget}} for a fiscal year, with all cost centers summed under None"""
+    rows = frappe.db.sql("""
+        SELECT b.cost_center, ba.account, SUM(ba.budget_amount) as budget_amount
+        FROM `tabBudget Account` ba
+        INNER JOIN `tabBudget` b ON ba.parent = b.name
+        WHERE b.fiscal_year = %s
+        GROUP BY b.cost_center, ba.account
+    """, (fiscal_year,), as_dict=1)
+    by_cost_center = {None: {}}
+    for r in rows:
+        amount = r['budget_amount'] or 0
+        by_cost_center.setdefault(r['cost_center'], {})[r['account']] = amount
+        by_cost_center[None][r['account']] = by_cost_center[None].get(r['account'], 0) + amount
+    return by_cost_center
+
+def make_filters_cache_key(prefix, filters, exclude=()):
+    """Stable cache key for a filter dict (key order and excluded keys do not matter)"""
+    normalized = {k: v for k, v in (filters or {}).items() if k not in exclude and v not in (None, '')}
+    digest = hashlib.md5(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()
+    return f"yearly_income_statement:{prefix}:{digest}"
+
+def get_ytd_end_date(fy_doc):
+    """Today, clamped to the fiscal year"""
+    return clamp_ytd_end(fy_doc.year_start_date, fy_doc.year_end_date, getdate(today()))
+
+def get_data_version(filters):
+    """Cheap fingerprint of everything a report for `filters` is computed from.
+
+    Combines the GL watermark (latest GL Entry change, which also moves on
+    cancellation), the company's Account tree and Budget versions, Report
+    Classes, and today's date (YTD windows end today). Only MAX() lookups over
+    the modified index or small master tables are used, so it is safe to call
+    before any aggregation.
+    """
+    company = (filters or {}).get('company', 'Western Serene Atlantic Hotel Ltd')
+    row = frappe.db.sql("""
+        SELECT
+            (SELECT MAX(modified) FROM `tabGL Entry`) AS gl_watermark,
+            (SELECT MAX(modified) FROM `tabAccount` WHERE company = %(company)s) AS account_version,
+            (SELECT MAX(modified) FROM `tabBudget` WHERE company = %(company)s) AS budget_version,
+            (SELECT MAX(modified) FROM `tabReport Classes`) AS report_class_version
+    """, {'company': company}, as_dict=1)[0]
+    parts = [str(row.get(k) or '') for k in ('gl_watermark', 'account_version', 'budget_version', 'report_class_version')]
+    parts.append(str(today()))
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+@contextlib.contextmanager
+def data_version_scope():
+    """Compute each company's data version once inside the block.
+
+    Opened by the outermost report wrapper (conditional_report_response) so the
+    ETag, warm cache and single-flight lookups of one request share a single
+    get_data_version query. A nested scope reuses the outer one.
+    """
+    if frappe.flags.data_versions is not None:
+        yield
+        return
+    frappe.flags.data_versions = {}
     try:
-        if fiscal_year:
-            annual_budget = get_budget_data(fiscal_year, account_name, selected_cost_center)
-    except Exception:
-        annual_budget = 0
-
-    # Simple proportional budgets
-    ytd_budget = 0
-    current_month_budget = 0
+        yield
+    finally:
+        frappe.flags.data_versions = None
+
+def get_scoped_data_version(filters):
+    """get_data_version, evaluated once per company in a data_version_scope (every call outside one)"""
+    versions = frappe.flags.data_versions
+    if versions is None:
+        return get_data_version(filters)
+    company = (filters or {}).get('company', 'Western Serene Atlantic Hotel Ltd')
+    if company not in versions:
+        versions[company] = get_data_version(filters)
+    return versions[company]
+
+def parse_if_none_match(header):
+    """Return the set of entity tags listed in an If-None-Match header"""
+    tags = set()
+    for tag in (header or '').split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag.strip('"'))
+    return tags
+
+def conditional_report_response(fn):
+    """Serve a report endpoint conditionally on its data version.
+
+    The ETag is derived from the endpoint, its arguments and get_data_version.
+    A request whose If-None-Match carries the current ETag gets a 304 before
+    any aggregation runs. The data version is read once for the whole request
+    (see data_version_scope). Nested calls (section endpoints calling
+    get_dashboard_data) and calls outside an HTTP request pass straight through.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if frappe.flags.in_conditional_report or not getattr(frappe.local, 'request', None):
+            return fn(*args, **kwargs)
+
+        with data_version_scope():
+            filters = kwargs.get('filters', args[0] if args else None)
+            if isinstance(filters, str):
+                filters = json.loads(filters)
+            try:
+                etag = make_filters_cache_key(fn.__name__, {
+                    **(filters or {}),
+                    '_args': {k: v for k, v in kwargs.items() if k not in ('filters', 'cmd')},
+                    '_version': get_scoped_data_version(filters)
+                }).rsplit(':', 1)[-1]
+            except Exception as e:
+                frappe.log_error(f"Error computing data version for {fn.__name__}: {str(e)}")
+                return fn(*args, **kwargs)
+
+            response_headers = getattr(frappe.local, 'response_headers', None)
+            if response_headers is not None:
+                response_headers['ETag'] = f'"{etag}"'
+                response_headers['Cache-Control'] = 'private, no-cache'
+
+            if etag in parse_if_none_match(frappe.get_request_header('If-None-Match')):
+                frappe.local.response['http_status_code'] = 304
+                return None
+
+            frappe.flags.in_conditional_report = True
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                frappe.flags.in_conditional_report = False
+
+    return wrapper
+
+def get_warm_dashboard_cache_key(filters):
+    return make_filters_cache_key('warm_dashboard', filters)
+
+def get_warm_dashboard_entry(filters):
+    """{'version', 'result'} last stored for `filters` by the saved view warmer, or None"""
+    return frappe.cache().get_value(get_warm_dashboard_cache_key(filters))
+
+def get_warm_dashboard_data(filters):
+    """Pre-warmed get_dashboard_data result, if it was computed for the current data version"""
+    if frappe.flags.warming_dashboard_views or frappe.flags.profiling_report:
+        return None
+    entry = get_warm_dashboard_entry(filters)
+    if not entry:
+        record_cache('warm_dashboard', 'miss')
+        return None
+    if entry.get('version') != get_scoped_data_version(filters):
+        record_cache('warm_dashboard', 'stale')
+        return None
+    record_cache('warm_dashboard', 'hit')
+    return entry['result']
+
+def store_warm_dashboard_data(filters, version, result):
+    """Swap in a freshly computed result for `filters`.
+
+    The entry is complete before it is written and replaces the previous one in
+    a single SET, so readers get either the old or the new result, never a
+    partial one. `version` must be the data version read before computing.
+    """
+    frappe.cache().set_value(
+        get_warm_dashboard_cache_key(filters),
+        {'version': version, 'result': result},
+        expires_in_sec=WARM_DASHBOARD_TTL
+    )
+
+def single_flight(prefix, filters, compute):
+    """Run compute() once across workers for identical in-flight requests.
+
+    The first worker to take the Redis lock for (prefix, filters, data version)
+    computes, keeps the result briefly and announces it on a channel; the others
+    subscribe and return that result. A waiter computes on its own if the
+    leader fails or no result arrives within SINGLE_FLIGHT_WAIT_SEC.
+    """
+    if frappe.flags.profiling_report:
+        return compute()
+
+    cache = frappe.cache()
     try:
-        # YTD proportion based on actual months elapsed from ytd_gl_entries
-        ytd_months = set()
-        for e in ytd_gl_entries or []:
-            if e.get('account') == account_name:
-                ytd_months.add(getdate(e.get('posting_date')).month)
-        months_elapsed = len(ytd_months) if ytd_months else 0
-        ytd_budget = (annual_budget / 12.0) * months_elapsed if months_elapsed > 0 else 0
-        current_month_budget = (annual_budget / 12.0)
-    except Exception:
-        pass
-    
-    # Calculate forecast as YTD actual + remaining budget
-    remaining_budget = max(annual_budget - ytd_budget, 0)
-    forecast_actual = ytd_actual + remaining_budget
-    forecast_budget = annual_budget
-
-    # Build monthly map: actuals from monthly_actuals_map, budgets as annual/12
-    monthly_budget_value = (annual_budget / 12.0) if annual_budget else 0
-    monthly = {}
-    account_monthly_actuals = (monthly_actuals_map or {}).get(account_name, {})
-    for m in range(1, 13):
-        monthly[m] = {
-            'actual': float(account_monthly_actuals.get(m, 0) or 0),
-            'budget': float(monthly_budget_value)
-        }
-    
-    return {
-        'type': 'account',
-        'category': account.get('account_name', account_name),
-        'account': account_name,
-        'root_type': account.get('root_type'),
-        'currentMonth': {
-            'lastYear': current_month_last_year,
-            'budget': current_month_budget,
-            'actual': current_month_actual,
-            'actBudThisYear': safe_ratio(current_month_actual, current_month_budget),
-            'actVsLastYear': safe_ratio(current_month_actual, current_month_last_year)
-        },
-        'yearToDate': {
-            'lastYear': ytd_last_year,
-            'budget': ytd_budget,
-            'actual': ytd_actual,
-            'actBudThisYear': safe_ratio(ytd_actual, ytd_budget),
-            'actVsLastYear': safe_ratio(ytd_actual, ytd_last_year)
-        },
-        'forecast': {
-            'lastYear': ytd_last_year,
-            'budget': forecast_budget,
-            'actual': forecast_actual,
-            'actBudThisYear': safe_ratio(forecast_actual, forecast_budget),
-            'actVsLastYear': safe_ratio(forecast_actual, ytd_last_year)
-        },
-        'monthly': monthly
-    }
+        key = make_filters_cache_key(f'single_flight:{prefix}', {**(filters or {}), '_version': get_scoped_data_version(filters)})
+        lock_key = cache.make_key(f'{key}:lock')
+        token = frappe.generate_hash(length=12)
+        is_leader = cache.set(lock_key, token, nx=True, ex=SINGLE_FLIGHT_LOCK_TTL)
+    except Exception as e:
+        frappe.log_error(f"Error coalescing {prefix}, computing directly: {str(e)}")
+        return compute()
 
-def calculate_section_total(accounts, total_label, root_type):
-    """Calculate total for a section of accounts"""
-    total_data = {
-        'currentMonth': {'lastYear': 0, 'budget': 0, 'actual': 0},
-        'yearToDate': {'lastYear': 0, 'budget': 0, 'actual': 0}, 
-        'forecast': {'lastYear': 0, 'budget': 0, 'actual': 0}
-    }
-    
-    # Sum up all non-group accounts
-    for account in accounts:
-        if not account.get('is_group'):
-            # This would need to aggregate the processed account data
-            # For now, return a placeholder
-            pass
-    
-    return {
-        'type': 'total',
-        'category': total_label,
-        'root_type': root_type,
-        'currentMonth': total_data['currentMonth'],
-        'yearToDate': total_data['yearToDate'],
-        'forecast': total_data['forecast']
-    }
+    if is_leader:
+        increment('single_flight_total', {'role': 'leader'})
+        try:
+            result = compute()
+            cache.set_value(f'{key}:result', result, expires_in_sec=SINGLE_FLIGHT_RESULT_TTL)
+            return result
+        finally:
+            cache.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            cache.publish(cache.make_key(f'{key}:done'), 1)
+
+    result, fallback_reason = wait_for_single_flight(cache, key)
+    if result is not None:
+        increment('single_flight_total', {'role': 'follower'})
+        return result
+    increment('single_flight_total', {'role': 'fallback', 'reason': fallback_reason})
+    return compute()
+
+def wait_for_single_flight(cache, key):
+    """(leader's result for `key`, None), or (None, reason) if the leader failed or SINGLE_FLIGHT_WAIT_SEC passed"""
+    trace_stage('single_flight_wait')
+    pubsub = cache.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(cache.make_key(f'{key}:done'))
+    try:
+        deadline = time.monotonic() + SINGLE_FLIGHT_WAIT_SEC
+        while True:
+            # Checked after subscribing so a leader finishing in between is not missed;
+            # expires=True bypasses the request-local cache, which would pin a miss
+            result = cache.get_value(f'{key}:result', expires=True)
+            if result is not None:
+                return result, None
+            # RedisWrapper.exists makes the key itself, so it gets the bare name
+            if not cache.exists(f'{key}:lock'):
+                # The lock is released after the result is stored: read it once more
+                result = cache.get_value(f'{key}:result', expires=True)
+                return (result, None) if result is not None else (None, 'leader_failed')
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None, 'timeout'
+            pubsub.get_message(timeout=min(remaining, 1))
+    finally:
+        pubsub.close()
+
+def publish_report_progress(stage, percent, **extra):
+    """Publish a stage of the report job running in this process (no-op outside a job)"""
+    job_id = frappe.flags.report_job_id
+    if not job_id:
+        return
+    frappe.publish_realtime(
+        REPORT_JOB_EVENT,
+        {'job_id': job_id, 'stage': stage, 'progress': percent, **extra},
+        user=frappe.session.user
+    )
 
-def create_header_row(category):
-    """Create a header row for a main category"""
-    return {
-        'type': ROW_TYPES['HEADER'],
-        'category': category.replace('_', ' ').title()
-    }
+def get_report_job_cache_key(job_id):
+    return f"yearly_income_statement:report_job:{job_id}"
 
-def create_sub_header_row(sub_category):
-    """Create a sub-header row for a sub-category"""
-    return {
-        'type': ROW_TYPES['SUB_HEADER'],
-        'category': sub_category
-    }
+@frappe.whitelist()
+def start_report_job(method='get_dashboard_data', filters=None, options=None):
+    """Run a heavy report in the background instead of in the web request.
 
-def create_total_row(category, totals_data):
-    """Create a total row for a category"""
-    return {
-        'type': ROW_TYPES['TOTAL'],
-        'category': f"TOTAL {category.replace('_', ' ').title()}",
-        'currentMonth': totals_data.get('currentMonth', {}),
-        'yearToDate': totals_data.get('yearToDate', {}),
-        'forecast': totals_data.get('forecast', {})
-    }
+    Returns a job id at once. The job publishes REPORT_JOB_EVENT messages to
+    the user (stage and progress), ending with 'done' - carrying the result
+    inline when it is small, and always its cache key for get_report_job_result -
+    or 'failed'.
+    """
+    if method not in REPORT_JOB_METHODS:
+        frappe.throw(_("Report {0} cannot run as a background job").format(method))
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    if isinstance(options, str):
+        options = json.loads(options)
+
+    job_id = f"report::{frappe.generate_hash(length=12)}"
+    frappe.enqueue(
+        'yearly_income_statement.api.run_report_job',
+        queue='long',
+        timeout=REPORT_JOB_TIMEOUT,
+        job_id=job_id,
+        method=method,
+        kwargs={**(options or {}), 'filters': filters or {}},
+        report_job_id=job_id
+    )
+    return {'job_id': job_id, 'event': REPORT_JOB_EVENT}
 
-def calculate_category_totals(accounts, current_gl_entries, prev_gl_entries, ytd_gl_entries, 
-                             ytd_last_year_gl_entries, current_month_gl_entries, current_month_last_year_gl_entries,
-                             fiscal_year, prev_fiscal_year, from_date, to_date, ytd_end_date, 
-                             selected_cost_center, selected_month):
-    """Calculate totals for a category of accounts using pre-fetched GL entries"""
-    totals = {
-        'currentMonth': {'lastYear': 0, 'budget': 0, 'actual': 0, 'actBudThisYear': 0, 'actVsLastYear': 0},
-        'yearToDate': {'lastYear': 0, 'budget': 0, 'actual': 0, 'actBudThisYear': 0, 'actVsLastYear': 0},
-        'forecast': {'lastYear': 0, 'budget': 0, 'actual': 0, 'actBudThisYear': 0, 'actVsLastYear': 0}
-    }
-    
-    for account in accounts:
-        account_data = calculate_account_financial_data(
-            account, current_gl_entries, prev_gl_entries, ytd_gl_entries,
-            ytd_last_year_gl_entries, current_month_gl_entries, current_month_last_year_gl_entries,
-            fiscal_year, prev_fiscal_year, from_date, to_date, ytd_end_date,
-            selected_cost_center, selected_month
+def run_report_job(method, kwargs, report_job_id):
+    """Background job body for start_report_job"""
+    frappe.flags.report_job_id = report_job_id
+    try:
+        publish_report_progress('started', 0)
+        with observe_job(method):
+            result = globals()[method](**kwargs)
+
+        cache_key = get_report_job_cache_key(report_job_id)
+        frappe.cache().set_value(
+            cache_key, {'user': frappe.session.user, 'result': result},
+            expires_in_sec=REPORT_JOB_RESULT_TTL
         )
-        
-        # Sum up all values
-        for period in ['currentMonth', 'yearToDate', 'forecast']:
-            for field in ['lastYear', 'budget', 'actual']:
-                totals[period][field] += account_data[period][field]
-    
-    # Calculate ratios for totals
-    for period in ['currentMonth', 'yearToDate', 'forecast']:
-        totals[period]['actBudThisYear'] = safe_ratio(totals[period]['actual'], totals[period]['budget'])
-        totals[period]['actVsLastYear'] = safe_ratio(totals[period]['actual'], totals[period]['lastYear'])
-    
-    return totals
+        inline = len(frappe.as_json(result, indent=None)) <= REPORT_JOB_INLINE_BYTES
+        publish_report_progress('done', 100, cache_key=cache_key, result=result if inline else None)
+    except Exception as e:
+        frappe.log_error(f"Error in report job {method}: {str(e)}")
+        publish_report_progress('failed', 100, error=str(e))
+        raise
+    finally:
+        frappe.flags.report_job_id = None
+
+@frappe.whitelist()
+def get_report_job_result(job_id):
+    """Result of a finished start_report_job job, for the user who started it"""
+    cached = frappe.cache().get_value(get_report_job_cache_key(job_id))
+    if not cached or cached.get('user') != frappe.session.user:
+        return {'success': False, 'error': _('Report job result not found or expired')}
+    return {'success': True, 'result': cached['result']}
 
 @frappe.whitelist()
-def get_dashboard_data(filters=None):
-    """Get comprehensive dashboard data using ERPNext's logic"""
+@profiled_report
+@conditional_report_response
+def get_dashboard_data(filters=None, payload_format=None, with_timings=None):
+    """Get comprehensive dashboard data using ERPNext's logic.
+
+    Pass payload_format='columnar' for the compact encoding produced by
+    to_columnar_payload (decoded by decodeColumnarDashboard in services/api.js).
+    System Managers can pass with_timings=1 to get the per-stage trace
+    (see tracing.py) back as `_timings`. A `forecast_mode` filter (one of
+    FORECAST_MODES) patches the forecast column of the budget-mode result.
+    """
     if filters is None:
         filters = {}
-    
+
+    if payload_format == 'columnar':
+        return to_columnar_payload(get_dashboard_data(filters, with_timings=with_timings))
+
+    # Collapsed tree / drill-down requests are served from cached rollups
+    if any(filters.get(k) for k in TREE_VIEW_KEYS):
+        return get_dashboard_tree_view(filters)
+
+    # The forecast mode is applied to the cached budget-mode result, so switching
+    # it never misses the warm or single-flight caches
+    forecast_mode = filters.get('forecast_mode') or 'budget'
+    if forecast_mode not in FORECAST_MODES:
+        frappe.throw(_("Unknown forecast mode: {0}").format(forecast_mode))
+    base_filters = {k: v for k, v in filters.items() if k != 'forecast_mode'}
+
+    with report_trace('get_dashboard_data', filters) as trace:
+        # Saved dashboard views are kept warm by tasks.warm_saved_dashboard_views
+        trace_stage('warm_cache')
+        result = get_warm_dashboard_data(base_filters)
+        if result is None:
+            result = single_flight('dashboard_data', base_filters, lambda: compute_dashboard_data(base_filters))
+        if forecast_mode != 'budget' and result.get('dashboard_data'):
+            trace_stage('forecast')
+            rows = [
+                {**row, 'forecast': dict(row['forecast'])} if row.get('type') in (ROW_TYPES['ACCOUNT'], ROW_TYPES['TOTAL']) else row
+                for row in result['dashboard_data']
+            ]
+            result = {**result, 'dashboard_data': apply_forecast_mode(rows, base_filters, forecast_mode), 'filters': filters}
+
+    if with_timings and 'System Manager' in frappe.get_roles():
+        result = {**result, '_timings': trace_summary(trace)}
+    return result
+
+def compute_dashboard_data(filters):
+    """Flat dashboard rows, summary and period list for `filters` (see get_dashboard_data).
+
+    This is the I/O layer: it loads fiscal years, accounts, classification
+    maps, GL windows and budgets, and hands them to
+    dashboard_core.build_dashboard_rows.
+    """
+    trace_stage('fiscal_years')
     # Extract filter parameters
     fiscal_year = filters.get('fiscal_year', '2025')
     selected_cost_center = filters.get('cost_center', '')
@@ -690,10 +676,6 @@ def get_dashboard_data(filters=None):
         frappe.log_error(f"ERROR getting fiscal year: {str(e)}")
         return {'dashboard_data': [], 'filters': filters}
     
-    # Set default dates based on fiscal year
-    from_date = filters.get('from_date', str(fy_doc.year_start_date))
-    to_date = filters.get('to_date', str(fy_doc.year_end_date))
-    
     # Get previous fiscal year
     try:
         prev_fiscal_year = get_previous_fiscal_year(fiscal_year)
@@ -702,425 +684,554 @@ def get_dashboard_data(filters=None):
         frappe.log_error(f"ERROR getting previous fiscal year: {str(e)}")
         return {'dashboard_data': [], 'filters': filters}
     
-    # Calculate date ranges
+    # Calculate the GL windows (current month ones only if a month is selected)
     try:
-        from_date = getdate(from_date)
-        to_date = getdate(to_date)
-        prev_from_date = getdate(prev_fy_doc.year_start_date)
-        prev_to_date = getdate(prev_fy_doc.year_end_date)
+        windows = get_report_windows(
+            fiscal_year, fy_doc.year_start_date, fy_doc.year_end_date,
+            prev_fy_doc.year_start_date, prev_fy_doc.year_end_date, getdate(today()),
+            month=selected_month, from_date=filters.get('from_date'), to_date_=filters.get('to_date')
+        )
     except Exception as e:
         frappe.log_error(f"ERROR calculating date ranges: {str(e)}")
         return {'dashboard_data': [], 'filters': filters}
     
-    # Calculate current month date range if month is selected
-    current_month_from_date = None
-    current_month_to_date = None
-    if selected_month and selected_month.strip():
-        try:
-            month_num = int(selected_month)
-            year_num = int(fiscal_year)
-            current_month_from_date = get_first_day(f"{year_num}-{month_num:02d}-01")
-            current_month_to_date = get_last_day(f"{year_num}-{month_num:02d}-01")
-        except Exception:
-            pass
-    
-    # Calculate YTD end date
-    try:
-        from frappe.utils import today
-        today_date = getdate(today())
-        fy_start = getdate(fy_doc.year_start_date)
-        fy_end = getdate(fy_doc.year_end_date)
-        
-        if fy_start <= today_date <= fy_end:
-            ytd_end_date = today_date
-        elif today_date > fy_end:
-            ytd_end_date = fy_end
-        else:
-            ytd_end_date = fy_start
-    except Exception as e:
-        frappe.log_error(f"ERROR calculating YTD end date: {str(e)}")
-        return {'dashboard_data': [], 'filters': filters}
-    
     # STEP 1: Get ALL accounts and report class map
+    trace_stage('accounts')
     try:
         income_accounts = get_all_accounts(company, 'Income')
         expense_accounts = get_all_accounts(company, 'Expense')
-        all_accounts = income_accounts + expense_accounts
         
         # Filter accounts by reporting framework if specified
         if reporting_framework:
             allowed_report_classes = get_report_classes_by_framework(reporting_framework)
             income_accounts = filter_accounts_by_report_classes(income_accounts, allowed_report_classes)
             expense_accounts = filter_accounts_by_report_classes(expense_accounts, allowed_report_classes)
-            all_accounts = income_accounts + expense_accounts
         
         # Build include_in_gross map and report_class direct map (used in classification)
+        trace_stage('classification')
         inc_gross_map = build_include_in_gross_map(company)
         report_class_direct_map = build_report_class_direct_map(reporting_framework)
     except Exception as e:
         frappe.log_error(f"ERROR getting accounts: {str(e)}")
         return {'dashboard_data': [], 'filters': filters}
     
-    # STEP 2: Pre-fetch GL entries
-    current_gl_entries = get_gl_entries_for_period(
-        company, from_date, to_date,
-        {'cost_center': selected_cost_center} if selected_cost_center else None
-    )
-    prev_gl_entries = get_gl_entries_for_period(
-        company, prev_from_date, prev_to_date,
-        {'cost_center': selected_cost_center} if selected_cost_center else None
-    )
-    ytd_gl_entries = get_gl_entries_for_period(
-        company, from_date, ytd_end_date,
-        {'cost_center': selected_cost_center} if selected_cost_center else None
-    )
-    ytd_last_year_from_date = prev_from_date
-    ytd_last_year_to_date = add_years(ytd_end_date, -1) if selected_month and selected_month.strip() else prev_to_date
-    ytd_last_year_gl_entries = get_gl_entries_for_period(
-        company, ytd_last_year_from_date, ytd_last_year_to_date,
-        {'cost_center': selected_cost_center} if selected_cost_center else None
-    )
-    current_month_gl_entries = []
-    current_month_last_year_gl_entries = []
-    if selected_month and selected_month.strip() and current_month_from_date and current_month_to_date:
-        current_month_gl_entries = get_gl_entries_for_period(
-            company, current_month_from_date, current_month_to_date,
-            {'cost_center': selected_cost_center} if selected_cost_center else None
-        )
-        current_month_last_year_from_date = add_years(current_month_from_date, -1)
-        current_month_last_year_to_date = add_years(current_month_to_date, -1)
-        current_month_last_year_gl_entries = get_gl_entries_for_period(
-            company, current_month_last_year_from_date, current_month_last_year_to_date,
-            {'cost_center': selected_cost_center} if selected_cost_center else None
-        )
+    publish_report_progress('accounts', 10)
+
+    # STEP 2: Pre-fetch the GL windows build_dashboard_rows reads
+    gl_filters = {'cost_center': selected_cost_center} if selected_cost_center else None
+    gl_entries = {}
+    for period in DASHBOARD_GL_PERIODS:
+        if windows[period] is None:
+            gl_entries[period] = []
+            continue
+        trace_stage(f'gl:{period}')
+        gl_entries[period] = get_gl_entries_for_period(company, *windows[period], gl_filters)
     
-    # STEP 3: Build monthly actuals map for the full fiscal year to support monthly columns
-    monthly_actuals_map = aggregate_monthly_amounts(current_gl_entries)
+    publish_report_progress('gl_entries', 40)
 
-    # STEP 4: Organize accounts using hierarchy and classify using report_class_direct_map
+    # STEP 3: Budgets for the fiscal year
+    trace_stage('budgets')
+    budget_map = get_budget_map(fiscal_year, selected_cost_center)
+
+    publish_report_progress('budgets', 60)
+
+    # STEP 4: Aggregation, hierarchy, classification and rows, all in dashboard_core
+    trace_stage('rows')
     try:
-        income_hierarchy, income_by_name, income_parent_map = get_accounts_with_hierarchy(income_accounts, current_gl_entries)
-        expense_hierarchy, expense_by_name, expense_parent_map = get_accounts_with_hierarchy(expense_accounts, current_gl_entries)
+        structured_dashboard_data = build_dashboard_rows(
+            income_accounts, expense_accounts, gl_entries,
+            inc_gross_map, report_class_direct_map, budget_map
+        )
     except Exception as e:
-        frappe.log_error(f"ERROR in account hierarchy organization: {str(e)}")
+        frappe.log_error(f"ERROR building dashboard rows: {str(e)}")
         return {'dashboard_data': [], 'filters': filters}
 
-    structured_dashboard_data = []
-
-    # STEP 1: Process Direct Revenue
-    direct_revenue_accounts = []
-    indirect_revenue_accounts = []
-    for account in income_hierarchy:
-        section, is_direct = compute_section_and_flags(account, inc_gross_map, report_class_direct_map)
-        if section == "Direct Revenue":
-            direct_revenue_accounts.append(account)
-        elif section == "Indirect Revenue":
-            indirect_revenue_accounts.append(account)
-
-    if direct_revenue_accounts:
-        structured_dashboard_data.append({
-            'type': 'header', 'category': 'Direct Revenue', 'account': 'HEADER_Direct_Revenue',
-            'root_type': 'Income', 'is_group': True, 'indent': 0, 'section': 'Direct Revenue'
-        })
-        direct_revenue_by_class = {}
-        for account in direct_revenue_accounts:
-            rc = account.get('report_class', '')
-            direct_revenue_by_class.setdefault(rc, []).append(account)
-        for report_class, accounts in direct_revenue_by_class.items():
-            if not accounts:
-                continue
-            structured_dashboard_data.append({
-                'type': 'sub_header', 'category': report_class, 'account': f'SUB_HEADER_{report_class}',
-                'root_type': 'Income', 'is_group': True, 'indent': 1, 'section': 'Direct Revenue'
-            })
-            for account in accounts:
-                account_row = process_account_data(
-                    account, ytd_gl_entries, ytd_last_year_gl_entries,
-                    current_month_gl_entries, current_month_last_year_gl_entries,
-                    [], [], [], [],
-                    monthly_actuals_map, fiscal_year, selected_cost_center
-                )
-                if account_row:
-                    account_row['indent'] = account.get('indent', 1) + 2
-                    account_row['section'] = 'Direct Revenue'
-                    account_row['is_direct'] = True
-                    account_row['report_class'] = report_class
-                    structured_dashboard_data.append(account_row)
-        direct_revenue_total = calculate_section_total(direct_revenue_accounts, 'TOTAL DIRECT REVENUE', 'Income')
-        if direct_revenue_total:
-            direct_revenue_total['section'] = 'Direct Revenue'
-            structured_dashboard_data.append(direct_revenue_total)
-
-    # STEP 2: Process Cost of Sales and other expenses remain unchanged but pass report_class_direct_map too
-    cost_of_sales_accounts = []
-    direct_expense_accounts = []
-    indirect_expense_accounts = []
-    for account in expense_hierarchy:
-        section, is_direct = compute_section_and_flags(account, inc_gross_map, report_class_direct_map)
-
-
-
-        if section == "Cost of Sales":
-            cost_of_sales_accounts.append(account)
-        elif section == "Direct Expenses":
-            direct_expense_accounts.append(account)
-        elif section == "Indirect Expenses":
-            indirect_expense_accounts.append(account)
-
-    # Add Cost of Sales section
-    if cost_of_sales_accounts:
-        structured_dashboard_data.append({
-            'type': 'header',
-            'category': 'Cost of Sales',
-            'account': 'HEADER_Cost_of_Sales',
-            'root_type': 'Expense',
-            'is_group': True,
-            'indent': 0,
-            'section': 'Cost of Sales'
-        })
-        
-        # Group by report_class
-        cos_by_class = {}
-        for account in cost_of_sales_accounts:
-            report_class = account.get('report_class', '')
-            if report_class not in cos_by_class:
-                cos_by_class[report_class] = []
-            cos_by_class[report_class].append(account)
-        
-        # Process each report_class
-        for report_class, accounts in cos_by_class.items():
-            if not accounts:
-                continue
-                
-            structured_dashboard_data.append({
-                'type': 'sub_header',
-                'category': report_class,
-                'account': f'SUB_HEADER_{report_class}',
-                'root_type': 'Expense',
-                'is_group': True,
-                'indent': 1,
-                'section': 'Cost of Sales'
-            })
-            
-            # Process accounts in this report_class
-            for account in accounts:
-                account_row = process_account_data(
-                    account, ytd_gl_entries, ytd_last_year_gl_entries,
-                    current_month_gl_entries, current_month_last_year_gl_entries,
-                    [], [], [], [],
-                    monthly_actuals_map, fiscal_year, selected_cost_center
-                )
-                if account_row:
-                    account_row['indent'] = account.get('indent', 1) + 2
-                    account_row['section'] = 'Cost of Sales'
-                    account_row['is_direct'] = True
-                    account_row['report_class'] = report_class
-                    structured_dashboard_data.append(account_row)
-        
-        # Add Cost of Sales total
-        if cost_of_sales_accounts:
-            cos_total = calculate_section_total(cost_of_sales_accounts, 'TOTAL COST OF SALES', 'Expense')
-            if cos_total:
-                cos_total['section'] = 'Cost of Sales'
-                structured_dashboard_data.append(cos_total)
-    
-    # STEP 3: Process Direct Expenses (excluding cost of sales)
-    if direct_expense_accounts:
-        structured_dashboard_data.append({
-            'type': 'header',
-            'category': 'Direct Expenses',
-            'account': 'HEADER_Direct_Expenses',
-            'root_type': 'Expense',
-            'is_group': True,
-            'indent': 0,
-            'section': 'Direct Expenses'
-        })
-        
-        # Group by report_class
-        direct_exp_by_class = {}
-        for account in direct_expense_accounts:
-            report_class = account.get('report_class', '')
-            if report_class not in direct_exp_by_class:
-                direct_exp_by_class[report_class] = []
-            direct_exp_by_class[report_class].append(account)
-        
-        # Process each report_class
-        for report_class, accounts in direct_exp_by_class.items():
-            if not accounts:
-                continue
-                
-            structured_dashboard_data.append({
-                'type': 'sub_header',
-                'category': report_class,
-                'account': f'SUB_HEADER_{report_class}',
-                'root_type': 'Expense',
-                'is_group': True,
-                'indent': 1,
-                'section': 'Direct Expenses'
-            })
-            
-            # Process accounts in this report_class
-            for account in accounts:
-                account_row = process_account_data(
-                    account, ytd_gl_entries, ytd_last_year_gl_entries,
-                    current_month_gl_entries, current_month_last_year_gl_entries,
-                    [], [], [], [],
-                    monthly_actuals_map, fiscal_year, selected_cost_center
-                )
-                if account_row:
-                    account_row['indent'] = account.get('indent', 1) + 2
-                    account_row['section'] = 'Direct Expenses'
-                    account_row['is_direct'] = True
-                    account_row['report_class'] = report_class
-                    structured_dashboard_data.append(account_row)
-        
-        # Add Direct Expenses total
-        if direct_expense_accounts:
-            direct_exp_total = calculate_section_total(direct_expense_accounts, 'TOTAL DIRECT EXPENSES', 'Expense')
-            if direct_exp_total:
-                direct_exp_total['section'] = 'Direct Expenses'
-                structured_dashboard_data.append(direct_exp_total)
-    
-    # STEP 4: Process Indirect Revenue
-    if indirect_revenue_accounts:
-        structured_dashboard_data.append({
-            'type': 'header',
-            'category': 'Indirect Revenue',
-            'account': 'HEADER_Indirect_Revenue',
-            'root_type': 'Income',
-            'is_group': True,
-            'indent': 0,
-            'section': 'Indirect Revenue'
-        })
-        
-        # Group by report_class
-        indirect_rev_by_class = {}
-        for account in indirect_revenue_accounts:
-            report_class = account.get('report_class', '')
-            if report_class not in indirect_rev_by_class:
-                indirect_rev_by_class[report_class] = []
-            indirect_rev_by_class[report_class].append(account)
-        
-        # Process each report_class
-        for report_class, accounts in indirect_rev_by_class.items():
-            if not accounts:
-                continue
-                
-            structured_dashboard_data.append({
-                'type': 'sub_header',
-                'category': report_class,
-                'account': f'SUB_HEADER_{report_class}',
-                'root_type': 'Income',
-                'is_group': True,
-                'indent': 1,
-                'section': 'Indirect Revenue'
-            })
-            
-            # Process accounts in this report_class
-            for account in accounts:
-                account_row = process_account_data(
-                    account, ytd_gl_entries, ytd_last_year_gl_entries,
-                    current_month_gl_entries, current_month_last_year_gl_entries,
-                    [], [], [], [],
-                    monthly_actuals_map, fiscal_year, selected_cost_center
-                )
-                if account_row:
-                    account_row['indent'] = account.get('indent', 1) + 2
-                    account_row['section'] = 'Indirect Revenue'
-                    account_row['is_direct'] = False
-                    account_row['report_class'] = report_class
-                    structured_dashboard_data.append(account_row)
-        
-        # Add Indirect Revenue total
-        if indirect_revenue_accounts:
-            indirect_rev_total = calculate_section_total(indirect_revenue_accounts, 'TOTAL INDIRECT REVENUE', 'Income')
-            if indirect_rev_total:
-                indirect_rev_total['section'] = 'Indirect Revenue'
-                structured_dashboard_data.append(indirect_rev_total)
-    
-    # STEP 5: Process Indirect Expenses
-    if indirect_expense_accounts:
-        structured_dashboard_data.append({
-            'type': 'header',
-            'category': 'Indirect Expenses',
-            'account': 'HEADER_Indirect_Expenses',
-            'root_type': 'Expense',
-            'is_group': True,
-            'indent': 0,
-            'section': 'Indirect Expenses'
-        })
-        
-        # Group by report_class
-        indirect_exp_by_class = {}
-        for account in indirect_expense_accounts:
-            report_class = account.get('report_class', '')
-            if report_class not in indirect_exp_by_class:
-                indirect_exp_by_class[report_class] = []
-            indirect_exp_by_class[report_class].append(account)
-        
-        # Process each report_class
-        for report_class, accounts in indirect_exp_by_class.items():
-            if not accounts:
-                continue
-                
-            structured_dashboard_data.append({
-                'type': 'sub_header',
-                'category': report_class,
-                'account': f'SUB_HEADER_{report_class}',
-                'root_type': 'Expense',
-                'is_group': True,
-                'indent': 1,
-                'section': 'Indirect Expenses'
-            })
-            
-            # Process accounts in this report_class
-            for account in accounts:
-                account_row = process_account_data(
-                    account, ytd_gl_entries, ytd_last_year_gl_entries,
-                    current_month_gl_entries, current_month_last_year_gl_entries,
-                    [], [], [], [],
-                    monthly_actuals_map, fiscal_year, selected_cost_center
-                )
-                if account_row:
-                    account_row['indent'] = account.get('indent', 1) + 2
-                    account_row['section'] = 'Indirect Expenses'
-                    account_row['is_direct'] = False
-                    account_row['report_class'] = report_class
-                    structured_dashboard_data.append(account_row)
-        
-        # Add Indirect Expenses total
-        if indirect_expense_accounts:
-            indirect_exp_total = calculate_section_total(indirect_expense_accounts, 'TOTAL INDIRECT EXPENSES', 'Expense')
-            if indirect_exp_total:
-                indirect_exp_total['section'] = 'Indirect Expenses'
-                structured_dashboard_data.append(indirect_exp_total)
+    publish_report_progress('rows', 70)
     
     return {
         'dashboard_data': structured_dashboard_data,
         'filters': filters,
-        'period_list': [
-            {'key': 'currentMonth', 'label': 'Current Month', 'from_date': str(current_month_from_date) if current_month_from_date else '', 'to_date': str(current_month_to_date) if current_month_to_date else ''},
-            {'key': 'yearToDate', 'label': 'Year to Date', 'from_date': str(from_date), 'to_date': str(ytd_end_date)},
-            {'key': 'forecast', 'label': 'Forecast', 'from_date': str(from_date), 'to_date': str(to_date)}
+        'company': company,
+        'fiscal_year': fiscal_year,
+        'period_list': build_period_list(windows),
+        'summary_data': build_summary_data(structured_dashboard_data)
+    }
+
+def empty_rollup_values():
+    """Zeroed period and monthly amounts for a rollup node"""
+    return {
+        **{period: {field: 0 for field in AMOUNT_KEYS} for period in PERIOD_KEYS},
+        'monthly': {m: {'actual': 0, 'budget': 0} for m in range(1, 13)}
+    }
+
+def add_into_rollup(target, row):
+    """Add the period and monthly amounts of `row` into `target` in place"""
+    for period in PERIOD_KEYS:
+        source = row.get(period) or {}
+        for field in AMOUNT_KEYS:
+            target[period][field] += flt(source.get(field))
+    for m, values in (row.get('monthly') or {}).items():
+        bucket = target['monthly'][int(m)]
+        bucket['actual'] += flt(values.get('actual'))
+        bucket['budget'] += flt(values.get('budget'))
+
+def set_rollup_ratios(values):
+    """Recompute the percentage columns of a rollup from its summed amounts"""
+    for period in PERIOD_KEYS:
+        p = values[period]
+        p['actBudThisYear'] = safe_ratio(p['actual'], p['budget'])
+        p['actVsLastYear'] = safe_ratio(p['actual'], p['lastYear'])
+
+def build_subtree_rollups(accounts, rows_by_account):
+    """Roll account rows up the tree.
+
+    `accounts` must be in lft order (see filter_accounts_hierarchy). Walking it
+    backwards visits every child before its parent, so each subtree total is
+    complete when it is added to the parent. Returns {parent_or_root: [node, ...]}
+    with children kept in lft order.
+    """
+    filtered_accounts = filter_accounts_hierarchy(accounts)[0]
+    rollups = {}
+    child_counts = {}
+
+    for account in reversed(filtered_accounts):
+        name = account['name']
+        values = rollups.setdefault(name, empty_rollup_values())
+        row = rows_by_account.get(name)
+        if row:
+            add_into_rollup(values, row)
+        parent = account.get('parent_account')
+        if parent:
+            add_into_rollup(rollups.setdefault(parent, empty_rollup_values()), values)
+            child_counts[parent] = child_counts.get(parent, 0) + 1
+
+    nodes_by_parent = {}
+    for account in filtered_accounts:
+        name = account['name']
+        values = rollups[name]
+        set_rollup_ratios(values)
+        row = rows_by_account.get(name) or {}
+        nodes_by_parent.setdefault(account.get('parent_account') or ROLLUP_ROOT, []).append({
+            'type': ROW_TYPES['ACCOUNT'],
+            'account': name,
+            'category': account.get('account_name', name),
+            'root_type': account.get('root_type'),
+            'report_class': account.get('report_class', ''),
+            'section': row.get('section'),
+            'is_group': bool(account.get('is_group')),
+            'indent': account.get('indent', 0),
+            'has_children': child_counts.get(name, 0) > 0,
+            **values
+        })
+    return nodes_by_parent
+
+def ensure_dashboard_rollups(filters):
+    """Build (once per filter set) and cache subtree rollups, returning the cache key.
+
+    Rollups are stored in a Redis hash keyed by parent account so a drill-down
+    only reads that parent's children. The meta field is written last, which
+    marks the hash as complete for concurrent readers.
+    """
+    base_filters = {k: v for k, v in filters.items() if k not in TREE_VIEW_KEYS}
+    key = make_filters_cache_key('dashboard_rollup', {**base_filters, '_version': get_scoped_data_version(base_filters)})
+    cache = frappe.cache()
+    if cache.hget(key, ROLLUP_META):
+        record_cache('dashboard_rollup', 'hit')
+        return key
+    record_cache('dashboard_rollup', 'miss')
+
+    response = get_dashboard_data(base_filters)
+    rows_by_account = {
+        row['account']: row for row in response.get('dashboard_data', [])
+        if row.get('type') == ROW_TYPES['ACCOUNT']
+    }
+    company = base_filters.get('company', 'Western Serene Atlantic Hotel Ltd')
+
+    nodes_by_parent = {}
+    for root_type in ('Income', 'Expense'):
+        for parent, nodes in build_subtree_rollups(get_all_accounts(company, root_type), rows_by_account).items():
+            nodes_by_parent.setdefault(parent, []).extend(nodes)
+
+    for parent, nodes in nodes_by_parent.items():
+        cache.hset(key, parent, nodes)
+    cache.hset(key, ROLLUP_META, {'period_list': response.get('period_list', [])})
+    cache.expire(cache.make_key(key), ROLLUP_CACHE_TTL)
+    return key
+
+@frappe.whitelist()
+@profiled_report
+@conditional_report_response
+def get_dashboard_tree_view(filters=None):
+    """Collapsed P&L tree served from cached subtree rollups.
+
+    `depth` (1, 2, 3...) returns every node down to that tree level in
+    pre-order; `expand_node` returns only the direct children of one account.
+    """
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    filters = filters or {}
+
+    try:
+        key = ensure_dashboard_rollups(filters)
+    except Exception as e:
+        frappe.log_error(f"Error building dashboard rollups: {str(e)}")
+        return {'dashboard_data': [], 'filters': filters}
+
+    cache = frappe.cache()
+    meta = cache.hget(key, ROLLUP_META) or {}
+    expand_node = filters.get('expand_node')
+
+    if expand_node:
+        rows = cache.hget(key, expand_node) or []
+    else:
+        depth = max(int(filters.get('depth') or 1), 1)
+        rows = []
+        stack = list(reversed(cache.hget(key, ROLLUP_ROOT) or []))
+        while stack:
+            node = stack.pop()
+            rows.append(node)
+            if node['has_children'] and node['indent'] + 1 < depth:
+                stack.extend(reversed(cache.hget(key, node['account']) or []))
+
+    return {
+        'dashboard_data': rows,
+        'filters': filters,
+        'period_list': meta.get('period_list', []),
+        'expand_node': expand_node or None
+    }
+
+def get_monthly_matrix(company, fiscal_year, cost_center=None):
+    """Account x month matrix of net GL amounts, cached per data version.
+
+    Columns run from MONTHLY_HISTORY_MONTHS before the fiscal year start to the
+    fiscal year end, one per calendar month, loaded with a single grouped query.
+    Returns {'accounts': [...], 'matrix': ndarray, 'history_months': int}.
+    """
+    import numpy as np
+
+    filters = {'company': company, 'fiscal_year': fiscal_year, 'cost_center': cost_center}
+    key = make_filters_cache_key('monthly_matrix', {**filters, '_version': get_scoped_data_version(filters)})
+    cached = frappe.cache().get_value(key)
+    record_cache('monthly_matrix', 'hit' if cached is not None else 'miss')
+    if cached is not None:
+        return cached
+
+    fy_doc = frappe.get_doc("Fiscal Year", fiscal_year)
+    fy_start = get_first_day(fy_doc.year_start_date)
+    start = add_months(fy_start, -MONTHLY_HISTORY_MONTHS)
+    end = getdate(fy_doc.year_end_date)
+    n_months = MONTHLY_HISTORY_MONTHS + 12
+
+    conditions = [
+        "gl.company = %(company)s",
+        "gl.posting_date BETWEEN %(from_date)s AND %(to_date)s",
+        "gl.is_cancelled = 0"
+    ]
+    if cost_center:
+        conditions.append("gl.cost_center = %(cost_center)s")
+    rows = frappe.db.sql("""
+        SELECT gl.account, YEAR(gl.posting_date) AS year, MONTH(gl.posting_date) AS month,
+               SUM(gl.debit - gl.credit) AS amount
+        FROM `tabGL Entry` gl
+        WHERE {}
+        GROUP BY gl.account, YEAR(gl.posting_date), MONTH(gl.posting_date)
+    """.format(" AND ".join(conditions)), {
+        'company': company, 'from_date': start, 'to_date': end, 'cost_center': cost_center
+    }, as_dict=1)
+
+    account_index = {}
+    row_idx, col_idx, amounts = [], [], []
+    for r in rows:
+        col = (r['year'] - start.year) * 12 + (r['month'] - start.month)
+        if 0 <= col < n_months:
+            row_idx.append(account_index.setdefault(r['account'], len(account_index)))
+            col_idx.append(col)
+            amounts.append(flt(r['amount']))
+
+    matrix = np.zeros((len(account_index), n_months))
+    np.add.at(matrix, (np.asarray(row_idx, dtype=np.intp), np.asarray(col_idx, dtype=np.intp)), amounts)
+
+    result = {'accounts': list(account_index), 'matrix': matrix, 'history_months': MONTHLY_HISTORY_MONTHS}
+    frappe.cache().set_value(key, result, expires_in_sec=FORECAST_CACHE_TTL)
+    return result
+
+def get_forecast_projections(filters, mode):
+    """Year-end forecast per account for a non-budget forecast mode, memoized per data version.
+
+    Months up to the last one closed by the YTD end date are actuals; the rest
+    are projected for all accounts at once from the cached monthly matrix, so
+    switching mode never re-queries the GL. Returns {'forecasts': {account: amount},
+    'elapsed_months': int} with amounts as absolute values like the dashboard rows.
+    """
+    from yearly_income_statement.forecasting import holt_winters_forecast, seasonal_run_rate_forecast
+
+    if mode not in FORECAST_MODES or mode == 'budget':
+        frappe.throw(_("Unknown forecast mode: {0}").format(mode))
+
+    company = filters.get('company', 'Western Serene Atlantic Hotel Ltd')
+    fiscal_year = filters.get('fiscal_year', '2025')
+    cost_center = filters.get('cost_center') or None
+    base = {'company': company, 'fiscal_year': fiscal_year, 'cost_center': cost_center}
+    key = make_filters_cache_key('forecast_projection', {**base, 'mode': mode, '_version': get_scoped_data_version(base)})
+    cached = frappe.cache().get_value(key)
+    record_cache('forecast_projection', 'hit' if cached is not None else 'miss')
+    if cached is not None:
+        return cached
+
+    fy_doc = frappe.get_doc("Fiscal Year", fiscal_year)
+    ytd_end_date = get_ytd_end_date(fy_doc)
+    fy_start = get_first_day(fy_doc.year_start_date)
+    elapsed = sum(1 for i in range(12) if get_last_day(add_months(fy_start, i)) <= ytd_end_date)
+
+    data = get_monthly_matrix(company, fiscal_year, cost_center)
+    matrix = data['matrix']
+    history = data['history_months']
+    current = matrix[:, history:history + 12]
+    ytd = current[:, :elapsed].sum(axis=1)
+
+    if elapsed == 12 or not len(data['accounts']):
+        totals = ytd
+    elif mode == 'holt_winters':
+        projected = holt_winters_forecast(matrix[:, :history + elapsed], 12 - elapsed)
+        totals = ytd + projected.sum(axis=1)
+    else:
+        prior = matrix[:, history - 12:history]
+        totals = ytd + seasonal_run_rate_forecast(current, prior, elapsed)
+
+    result = {
+        'forecasts': dict(zip(data['accounts'], [abs(v) for v in totals.tolist()], strict=True)),
+        'elapsed_months': elapsed
+    }
+    frappe.cache().set_value(key, result, expires_in_sec=FORECAST_CACHE_TTL)
+    return result
+
+def get_account_sections(company, reporting_framework=None):
+    """{account: (section, root_type)} using the dashboard's classification"""
+    inc_gross_map = build_include_in_gross_map(company)
+    report_class_direct_map = build_report_class_direct_map(reporting_framework)
+    allowed_report_classes = get_report_classes_by_framework(reporting_framework) if reporting_framework else None
+
+    sections = {}
+    for root_type in ('Income', 'Expense'):
+        accounts = get_all_accounts(company, root_type)
+        if allowed_report_classes:
+            accounts = filter_accounts_by_report_classes(accounts, allowed_report_classes)
+        for account in accounts:
+            section, _is_direct = compute_section_and_flags(account, inc_gross_map, report_class_direct_map)
+            sections[account['name']] = (section, root_type)
+    return sections
+
+def simulate_year_end(filters, paths, seed=None):
+    """P10/P50/P90 year-end outcomes per section and for net profit.
+
+    Accounts are collapsed into section groups (and a net profit group) with a
+    signed weight matrix before simulating, so the cost is groups x paths x
+    remaining months whatever the size of the chart. Each group's expectation is
+    the seasonal run-rate path; its noise is resampled from centred year-over-year
+    monthly deviations in the cached multi-year monthly matrix.
+    """
+    import numpy as np
+
+    from yearly_income_statement.forecasting import monte_carlo_year_end, seasonal_run_rate_path
+
+    company = filters.get('company', 'Western Serene Atlantic Hotel Ltd')
+    fiscal_year = filters.get('fiscal_year', '2025')
+    cost_center = filters.get('cost_center') or None
+
+    fy_doc = frappe.get_doc("Fiscal Year", fiscal_year)
+    ytd_end_date = get_ytd_end_date(fy_doc)
+    fy_start = get_first_day(fy_doc.year_start_date)
+    elapsed = sum(1 for i in range(12) if get_last_day(add_months(fy_start, i)) <= ytd_end_date)
+
+    data = get_monthly_matrix(company, fiscal_year, cost_center)
+    sections = get_account_sections(company, filters.get('reporting_framework'))
+
+    # Signed weights: revenue is reported as -net (credit), expenses as +net
+    group_names = []
+    entries = []
+    for col, account in enumerate(data['accounts']):
+        if account not in sections:
+            continue
+        section, root_type = sections[account]
+        if section not in group_names:
+            group_names.append(section)
+        entries.append((group_names.index(section), col, -1.0 if root_type == 'Income' else 1.0))
+    weights = np.zeros((len(group_names) + 1, len(data['accounts'])))
+    for row, col, sign in entries:
+        weights[row, col] = sign
+        weights[-1, col] = -1.0  # net profit = -(sum of all P&L nets)
+    group_names.append('Net Profit')
+
+    matrix = data['matrix']
+    history = data['history_months']
+    current = matrix[:, history:history + 12]
+    prior = matrix[:, history - 12:history]
+    observed = matrix[:, :history + elapsed]
+
+    ytd = weights @ current[:, :elapsed].sum(axis=1)
+    expected = weights @ seasonal_run_rate_path(current, prior, elapsed)
+    deviations = weights @ (observed[:, 12:] - observed[:, :-12])
+    deviations = deviations - deviations.mean(axis=1, keepdims=True) if deviations.shape[1] else deviations
+
+    outcomes = monte_carlo_year_end(ytd, expected, deviations, paths, np.random.default_rng(seed))
+    bands = np.percentile(outcomes, SIMULATION_PERCENTILES, axis=1)
+
+    return {
+        'groups': [
+            {
+                'group': name,
+                'ytd_actual': float(ytd[i]),
+                'expected': float(ytd[i] + expected[i].sum()),
+                **{f"p{p}": float(bands[j, i]) for j, p in enumerate(SIMULATION_PERCENTILES)}
+            }
+            for i, name in enumerate(group_names)
         ],
-        'summary_data': {
-            'total_income': sum([row.get('total', 0) for row in structured_dashboard_data if row.get('root_type') == 'Income' and row.get('type') == 'account']),
-            'total_expenses': sum([row.get('total', 0) for row in structured_dashboard_data if row.get('root_type') == 'Expense' and row.get('type') == 'account']),
-            'net_profit': sum([row.get('total', 0) for row in structured_dashboard_data if row.get('root_type') == 'Income' and row.get('type') == 'account']) - sum([row.get('total', 0) for row in structured_dashboard_data if row.get('root_type') == 'Expense' and row.get('type') == 'account'])
-        }
+        'paths': paths,
+        'elapsed_months': elapsed,
+        'history_samples': int(deviations.shape[1])
     }
 
-def is_report_class_direct(report_class_name):
-    """Check if a report class is marked as direct"""
+@frappe.whitelist()
+@profiled_report
+@conditional_report_response
+def get_forecast_simulation(filters=None, paths=None, seed=None):
+    """Monte Carlo year-end ranges (P10/P50/P90) per section and for net profit.
+
+    Pass `seed` for reproducible results. Results are cached per data version,
+    filters, path count and seed.
+    """
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    filters = filters or {}
+
+    try:
+        paths = min(max(int(paths or SIMULATION_PATHS), 100), SIMULATION_MAX_PATHS)
+        seed = int(seed) if seed not in (None, '') else None
+        key = make_filters_cache_key('forecast_simulation', {
+            **filters, 'paths': paths, 'seed': seed, '_version': get_scoped_data_version(filters)
+        })
+        result = frappe.cache().get_value(key)
+        record_cache('forecast_simulation', 'hit' if result is not None else 'miss')
+        if result is None:
+            result = simulate_year_end(filters, paths, seed)
+            frappe.cache().set_value(key, result, expires_in_sec=FORECAST_CACHE_TTL)
+        return {'success': True, **result}
+    except Exception as e:
+        frappe.log_error(f"Error in get_forecast_simulation: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+def apply_forecast_mode(rows, filters, mode):
+    """Replace forecast actuals of dashboard account rows with a forecast mode's projection.
+
+    Section total rows are re-summed from their account rows. Rows are updated
+    in place, so pass copies of cached rows.
+    """
+    forecasts = get_forecast_projections(filters, mode)['forecasts']
+    section_actual = 0.0
+    for row in rows:
+        if row.get('type') == ROW_TYPES['ACCOUNT']:
+            forecast = row['forecast']
+            forecast['actual'] = forecasts.get(row['account'], 0.0)
+            section_actual += forecast['actual']
+        elif row.get('type') == ROW_TYPES['TOTAL']:
+            forecast = row['forecast']
+            forecast['actual'] = section_actual
+            section_actual = 0.0
+        else:
+            continue
+        forecast['actBudThisYear'] = safe_ratio(forecast['actual'], forecast['budget'])
+        forecast['actVsLastYear'] = safe_ratio(forecast['actual'], forecast['lastYear'])
+    return rows
+
+@frappe.whitelist()
+@profiled_report
+@conditional_report_response
+def get_forecast_projection(filters=None, mode='seasonal'):
+    """Forecast actuals per account for one forecast mode (seasonal or holt_winters).
+
+    Lets the dashboard switch forecast mode by patching its forecast column
+    instead of reloading; results come from the memoized monthly matrix.
+    """
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    filters = filters or {}
+
     try:
-        # Query the Report Classes doctype to check is_direct flag
-        report_class = frappe.get_doc('Report Classes', report_class_name)
-        return bool(report_class.get('is_direct', 0))
+        result = get_forecast_projections(filters, mode)
+        return {'success': True, 'mode': mode, **result}
     except Exception as e:
-        frappe.log_error(f"Error checking report class {report_class_name}: {str(e)}")
-        return False
+        frappe.log_error(f"Error in get_forecast_projection: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+def to_columnar_payload(response):
+    """Encode dashboard rows as parallel arrays instead of one nested dict per row.
+
+    Descriptive fields become one array per name in `fields`; repetitive ones
+    (COLUMNAR_DICT_FIELDS) hold indexes into `dictionaries`. All amounts go into
+    one row-major matrix of integer cents with a column per `value_fields` entry.
+    Ratio columns are not sent; the decoder derives them from the amounts the
+    same way safe_ratio does. `has_amounts` / `has_monthly` flag the rows that
+    carry period and monthly values (header rows carry neither).
+    """
+    rows = response.get('dashboard_data') or []
+    value_fields = [f"{period}.{field}" for period in PERIOD_KEYS for field in AMOUNT_KEYS]
+    value_fields += [f"monthly.{kind}.{m}" for kind in ('actual', 'budget') for m in range(1, 13)]
+
+    dictionaries = {field: [] for field in COLUMNAR_DICT_FIELDS}
+    dictionary_index = {field: {} for field in COLUMNAR_DICT_FIELDS}
+    columns = []
+    for field in COLUMNAR_ROW_FIELDS:
+        if field in dictionary_index:
+            index = dictionary_index[field]
+            column = []
+            for row in rows:
+                value = row.get(field)
+                if value not in index:
+                    index[value] = len(dictionaries[field])
+                    dictionaries[field].append(value)
+                column.append(index[value])
+        else:
+            column = [row.get(field) for row in rows]
+        columns.append(column)
+
+    has_amounts = []
+    has_monthly = []
+    values = []
+    for row in rows:
+        has_amounts.append(1 if any(period in row for period in PERIOD_KEYS) else 0)
+        for period in PERIOD_KEYS:
+            amounts = row.get(period) or {}
+            values.extend(round(flt(amounts.get(field)) * 100) for field in AMOUNT_KEYS)
+        monthly = row.get('monthly') or {}
+        has_monthly.append(1 if monthly else 0)
+        months = [monthly.get(m) or monthly.get(str(m)) or {} for m in range(1, 13)]
+        values.extend(round(flt(v.get('actual')) * 100) for v in months)
+        values.extend(round(flt(v.get('budget')) * 100) for v in months)
+
+    return {
+        **{k: v for k, v in response.items() if k != 'dashboard_data'},
+        'dashboard_data': {
+            'format': 'columnar',
+            'length': len(rows),
+            'fields': list(COLUMNAR_ROW_FIELDS),
+            'dictionaries': dictionaries,
+            'columns': columns,
+            'has_amounts': has_amounts,
+            'has_monthly': has_monthly,
+            'value_fields': value_fields,
+            'values': {'unit': 'cents', 'shape': [len(rows), len(value_fields)], 'data': values}
+        }
+    }
 
 @frappe.whitelist()
+@profiled_report
+@conditional_report_response
 def get_direct_revenue_data(filters=None):
     """Get Direct Revenue data specifically"""
     try:
@@ -1158,6 +1269,8 @@ def get_direct_revenue_data(filters=None):
         return []
 
 @frappe.whitelist()
+@profiled_report
+@conditional_report_response
 def get_cost_of_sales_data(filters=None):
     """Get Cost of Sales data specifically"""
     try:
@@ -1195,6 +1308,8 @@ def get_cost_of_sales_data(filters=None):
         return []
 
 @frappe.whitelist()
+@profiled_report
+@conditional_report_response
 def get_indirect_expenses_data(filters=None):
     """Get indirect expenses data using multiple filtering strategies"""
     try:
@@ -1221,6 +1336,30 @@ def get_indirect_expenses_data(filters=None):
         company = filters.get('company')
         if company:
             expense_accounts = get_all_accounts(company, 'Expense')
+
+            # GL windows and budgets are the same for every account, so they are
+            # fetched and aggregated per account once here rather than inside the loop
+            gl_filters = {'cost_center': filters.get('cost_center')}
+            year_aggregated = pre_aggregate_gl_entries(get_gl_entries_for_period(
+                company,
+                filters.get('from_date'),
+                getdate(filters.get('to_date')),
+                gl_filters
+            ))
+            last_year_aggregated = pre_aggregate_gl_entries(get_gl_entries_for_period(
+                company,
+                add_years(getdate(filters.get('from_date')), -1),
+                add_years(getdate(filters.get('to_date')), -1),
+                gl_filters
+            ))
+            budget_map = get_budget_map(filters.get('fiscal_year'), filters.get('cost_center'))
+            aggregates = {
+                'previous_year': last_year_aggregated,
+                'ytd': year_aggregated,
+                'ytd_last_year': last_year_aggregated,
+                'current_month': year_aggregated,
+                'current_month_last_year': last_year_aggregated
+            }
             
             # Filter for indirect expenses using multiple criteria
             indirect_by_criteria = []
@@ -1237,50 +1376,13 @@ def get_indirect_expenses_data(filters=None):
                 if not is_direct:
                     # Get the GL data for this account
                     account_data = calculate_account_financial_data(
-                        acc, 
-                        get_gl_entries_for_period(
-                            company, 
-                            filters.get('from_date'),
-                            filters.get('to_date'),
-                            {'cost_center': filters.get('cost_center')}
-                        ),
-                        get_gl_entries_for_period(
-                            company, 
-                            add_years(getdate(filters.get('from_date')), -1),
-                            add_years(getdate(filters.get('to_date')), -1),
-                            {'cost_center': filters.get('cost_center')}
-                        ),
-                        get_gl_entries_for_period(
-                            company, 
-                            filters.get('from_date'),
-                            getdate(filters.get('to_date')),
-                            {'cost_center': filters.get('cost_center')}
-                        ),
-                        get_gl_entries_for_period(
-                            company, 
-                            add_years(getdate(filters.get('from_date')), -1),
-                            add_years(getdate(filters.get('to_date')), -1),
-                            {'cost_center': filters.get('cost_center')}
-                        ),
-                        get_gl_entries_for_period(
-                            company, 
-                            filters.get('from_date'),
-                            getdate(filters.get('to_date')),
-                            {'cost_center': filters.get('cost_center')}
-                        ),
-                        get_gl_entries_for_period(
-                            company, 
-                            add_years(getdate(filters.get('from_date')), -1),
-                            add_years(getdate(filters.get('to_date')), -1),
-                            {'cost_center': filters.get('cost_center')}
-                        ),
-                        filters.get('fiscal_year'),
-                        get_previous_fiscal_year(filters.get('fiscal_year')),
+                        acc,
+                        aggregates,
+                        budget_map.get(acc['name'], 0),
                         filters.get('from_date'),
                         filters.get('to_date'),
-                        getdate(filters.get('to_date')),
-                        filters.get('cost_center'),
-                        filters.get('month')
+                        filters.get('to_date'),
+                        with_current_month=bool((filters.get('month') or '').strip())
                     )
                     
                     if account_data:
@@ -1450,24 +1552,6 @@ def filter_accounts_by_report_classes(accounts, allowed_report_classes):
     
     return filtered_accounts
 
-def map_report_class_to_section(root_type, report_class):
-    """Map (root_type, report_class) to Section for proper P&L structure"""
-    if root_type == 'Income':
-        return 'Revenue'
-    
-    if root_type == 'Expense':
-        # Map expense report_classes to sections
-        if report_class in ['Food', 'Beverage', 'Other Costs']:
-            return 'Direct Expenses'
-        elif report_class == 'Payroll Burden':
-            return 'Payroll Burden'
-        elif report_class in ['Finance', 'Administration', 'Marketing', 'Expense']:
-            return 'Other Expenses'
-        else:
-            return 'Other Expenses'  # Default fallback
-    
-    return 'Other'  # Fallback for unknown types
-
 @frappe.whitelist()
 def get_report_classes_api():
     """Get all available report classes for the frontend"""
@@ -1492,6 +1576,8 @@ def get_report_classes_api():
         }
 
 @frappe.whitelist()
+@profiled_report
+@conditional_report_response
 def get_summary_data(filters=None):
     """Get summary data for the dashboard"""
     if isinstance(filters, str):
@@ -1516,6 +1602,315 @@ def get_summary_data(filters=None):
         'filters': filters
     }
 
+def variance_entry(row, period):
+    """Budget variance of one dashboard account row for a period, or None without a budget"""
+    values = row.get(period) or {}
+    budget = flt(values.get('budget'))
+    actual = flt(values.get('actual'))
+    variance = actual - budget
+    return {
+        'account': row.get('account'),
+        'category': row.get('category'),
+        'section': row.get('section'),
+        'report_class': row.get('report_class'),
+        'root_type': row.get('root_type'),
+        'budget': budget,
+        'actual': actual,
+        'variance': variance,
+        'variance_pct': round(variance / budget * 100, 1) if budget else None
+    }
+
+def rank_variances(entries, key, top_n, direction):
+    """Heap-select the top_n entries by `key`: most over budget, most under, or largest magnitude"""
+    entries = [e for e in entries if e[key] is not None]
+    if direction == 'over':
+        return heapq.nlargest(top_n, (e for e in entries if e[key] > 0), key=lambda e: e[key])
+    if direction == 'under':
+        return heapq.nsmallest(top_n, (e for e in entries if e[key] < 0), key=lambda e: e[key])
+    return heapq.nlargest(top_n, entries, key=lambda e: abs(e[key]))
+
+@frappe.whitelist()
+@profiled_report
+@conditional_report_response
+def get_variance_ranking(filters=None, top_n=None, direction='over'):
+    """The lines furthest from budget for the current month and YTD.
+
+    Built on the per-account dashboard aggregates (one GL pass, one bulk
+    budget query) and ranked with heap selection, so only top_n entries are
+    ever ordered. Optional `section` and `report_class` filters narrow the
+    candidates; `direction` is over (default), under or any.
+    """
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    filters = filters or {}
+
+    try:
+        top_n = max(int(top_n or VARIANCE_TOP_N), 1)
+        if direction not in VARIANCE_DIRECTIONS:
+            frappe.throw(_("direction must be one of {0}").format(", ".join(VARIANCE_DIRECTIONS)))
+
+        sections = filters.get('section')
+        report_classes = filters.get('report_class')
+        sections = {sections} if isinstance(sections, str) else set(sections or [])
+        report_classes = {report_classes} if isinstance(report_classes, str) else set(report_classes or [])
+        base_filters = {k: v for k, v in filters.items() if k not in ('section', 'report_class')}
+
+        rows = [
+            row for row in get_dashboard_data(base_filters).get('dashboard_data', [])
+            if row.get('type') == ROW_TYPES['ACCOUNT']
+            and (not sections or row.get('section') in sections)
+            and (not report_classes or row.get('report_class') in report_classes)
+        ]
+
+        ranking = {}
+        for period in ('currentMonth', 'yearToDate'):
+            entries = [variance_entry(row, period) for row in rows]
+            ranking[period] = {
+                'by_amount': rank_variances(entries, 'variance', top_n, direction),
+                'by_percentage': rank_variances(entries, 'variance_pct', top_n, direction)
+            }
+
+        return {
+            'success': True,
+            'ranking': ranking,
+            'direction': direction,
+            'candidates': len(rows),
+            'filters': filters
+        }
+    except Exception as e:
+        frappe.log_error(f"Error in get_variance_ranking: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+def get_fiscal_month_range(fiscal_year, month):
+    """Return (first_day, last_day) of calendar month `month` inside the fiscal year"""
+    fy_doc = frappe.get_doc("Fiscal Year", fiscal_year)
+    start = get_first_day(fy_doc.year_start_date)
+    for i in range(12):
+        month_start = add_months(start, i)
+        if month_start.month == int(month):
+            return month_start, get_last_day(month_start)
+    frappe.throw(_("Month {0} is not part of Fiscal Year {1}").format(month, fiscal_year))
+
+def get_account_and_descendants(account):
+    """Return the account itself, or every account under it when it is a group"""
+    lft, rgt, is_group = frappe.db.get_value("Account", account, ["lft", "rgt", "is_group"])
+    if not is_group:
+        return [account]
+    return frappe.db.sql_list("""
+        SELECT name FROM `tabAccount`
+        WHERE lft >= %s AND rgt <= %s AND is_group = 0
+    """, (lft, rgt))
+
+def resolve_drilldown_window(filters):
+    """Return (from_date, to_date) for a drill-down: an explicit range or a fiscal month"""
+    if filters.get('from_date') and filters.get('to_date'):
+        return getdate(filters['from_date']), getdate(filters['to_date'])
+    if filters.get('fiscal_year') and filters.get('month'):
+        return get_fiscal_month_range(filters['fiscal_year'], filters['month'])
+    if filters.get('fiscal_year'):
+        fy_doc = frappe.get_doc("Fiscal Year", filters['fiscal_year'])
+        return getdate(fy_doc.year_start_date), getdate(fy_doc.year_end_date)
+    frappe.throw(_("Either from_date and to_date or fiscal_year is required"))
+
+def get_drilldown_conditions(filters):
+    """WHERE conditions and params selecting the GL entries behind one dashboard cell"""
+    from_date, to_date = resolve_drilldown_window(filters)
+    accounts = get_account_and_descendants(filters['account'])
+    params = {
+        'company': filters.get('company', 'Western Serene Atlantic Hotel Ltd'),
+        'accounts': accounts,
+        'from_date': from_date,
+        'to_date': to_date
+    }
+    if len(accounts) == 1:
+        account_condition = "gl.account = %(account)s"
+        params['account'] = accounts[0]
+    elif accounts:
+        account_condition = "gl.account IN %(accounts)s"
+    else:
+        # A group without leaf accounts has no GL entries (and IN () is not valid SQL)
+        account_condition = "1 = 0"
+    conditions = [
+        "gl.company = %(company)s",
+        account_condition,
+        "gl.posting_date BETWEEN %(from_date)s AND %(to_date)s",
+        "gl.is_cancelled = 0"
+    ]
+    if filters.get('cost_center'):
+        conditions.append("gl.cost_center = %(cost_center)s")
+        params['cost_center'] = filters['cost_center']
+    return conditions, params, from_date, to_date
+
+@frappe.whitelist()
+def get_gl_drilldown(filters=None, cursor=None, page_size=None):
+    """One page of GL entries behind a dashboard cell, keyset-paginated.
+
+    Pages are ordered by (posting_date, name) and continue strictly after
+    `cursor` ("<posting_date>|<name>", the previous page's next_cursor), so no
+    page re-reads the rows before it. For a leaf account this is a range scan
+    of page_size rows on (account, posting_date, name), however deep the user
+    scrolls. A group account's entries are spread over many accounts, so its
+    pages walk (company, posting_date, name) in order and skip other accounts'
+    rows: no sort, but more rows read when the group is a small share of the
+    company's postings. No total count is computed; follow next_cursor while
+    has_more is true.
+    """
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    filters = filters or {}
+
+    try:
+        if not filters.get('account'):
+            return {'success': False, 'error': 'account is required'}
+
+        conditions, params, from_date, to_date = get_drilldown_conditions(filters)
+        page_size = max(min(int(page_size or DRILLDOWN_PAGE_SIZE), DRILLDOWN_MAX_PAGE_SIZE), 1)
+        if not params['accounts']:
+            return {
+                'success': True,
+                'gl_entries': [],
+                'has_more': False,
+                'next_cursor': None,
+                'from_date': str(from_date),
+                'to_date': str(to_date)
+            }
+        params['limit'] = page_size + 1
+        if cursor:
+            after_date, after_name = cursor.split('|', 1)
+            conditions.append(
+                "(gl.posting_date > %(after_date)s OR (gl.posting_date = %(after_date)s AND gl.name > %(after_name)s))"
+            )
+            params['after_date'] = getdate(after_date)
+            params['after_name'] = after_name
+
+        entries = frappe.db.sql("""
+            SELECT
+                gl.name,
+                gl.posting_date,
+                gl.account,
+                gl.debit,
+                gl.credit,
+                gl.voucher_type,
+                gl.voucher_no,
+                gl.cost_center,
+                gl.party_type,
+                gl.party,
+                gl.remarks
+            FROM `tabGL Entry` gl {}
+            WHERE {}
+            ORDER BY gl.posting_date, gl.name
+            LIMIT %(limit)s
+        """.format(
+            # IN over several accounts cannot be read in (posting_date, name) order from the account index
+            "FORCE INDEX (company_posting_date_name_index)" if len(params['accounts']) > 1 else "",
+            " AND ".join(conditions)
+        ), params, as_dict=1)
+
+        has_more = len(entries) > page_size
+        entries = entries[:page_size]
+        next_cursor = f"{entries[-1]['posting_date']}|{entries[-1]['name']}" if has_more else None
+
+        return {
+            'success': True,
+            'gl_entries': entries,
+            'has_more': has_more,
+            'next_cursor': next_cursor,
+            'from_date': str(from_date),
+            'to_date': str(to_date)
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+def get_gl_breakdown(columns, conditions, params, top_n):
+    """Net amount per distinct value of `columns`, largest top_n first, rest folded into one row.
+
+    Ranking and the "other" bucket are computed in SQL, so at most top_n + 1
+    rows come back regardless of how many GL entries match.
+    """
+    ranked_cols = ", ".join(f"gl.{c}" for c in columns)
+    # GROUP BY resolves bare names to ranked.* columns first, so group on the expressions
+    buckets = [f"CASE WHEN ranked.rn <= %(top_n)s THEN ranked.{c} END" for c in columns]
+    bucket_cols = ", ".join(f"{b} AS {c}" for b, c in zip(buckets, columns, strict=True))
+    return frappe.db.sql("""
+        SELECT
+            {bucket_cols},
+            ranked.rn > %(top_n)s AS is_other,
+            SUM(ranked.amount) AS amount,
+            SUM(ranked.debit) AS debit,
+            SUM(ranked.credit) AS credit,
+            SUM(ranked.entries) AS entries
+        FROM (
+            SELECT
+                {ranked_cols},
+                SUM(gl.debit - gl.credit) AS amount,
+                SUM(gl.debit) AS debit,
+                SUM(gl.credit) AS credit,
+                COUNT(*) AS entries,
+                ROW_NUMBER() OVER (ORDER BY ABS(SUM(gl.debit - gl.credit)) DESC) AS rn
+            FROM `tabGL Entry` gl
+            WHERE {conditions}
+            GROUP BY {ranked_cols}
+        ) ranked
+        GROUP BY is_other, {group_cols}
+        ORDER BY is_other, ABS(SUM(ranked.amount)) DESC
+    """.format(
+        bucket_cols=bucket_cols,
+        ranked_cols=ranked_cols,
+        conditions=" AND ".join(conditions),
+        group_cols=", ".join(buckets)
+    ), {**params, 'top_n': top_n}, as_dict=1)
+
+@frappe.whitelist()
+def get_cell_breakdown(filters=None, dimensions=None, top_n=None):
+    """Break the GL behind one dashboard cell down by voucher type, party and cost center.
+
+    Takes the same filters as get_gl_drilldown. Each requested dimension
+    returns its top_n contributors by absolute net amount plus an "Other"
+    row (is_other = 1) for the remainder.
+    """
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    if isinstance(dimensions, str):
+        dimensions = json.loads(dimensions) if dimensions.startswith('[') else [dimensions]
+    filters = filters or {}
+
+    try:
+        if not filters.get('account'):
+            return {'success': False, 'error': 'account is required'}
+
+        conditions, params, from_date, to_date = get_drilldown_conditions(filters)
+        top_n = max(int(top_n or BREAKDOWN_TOP_N), 1)
+
+        breakdown = {}
+        for dimension in dimensions or list(BREAKDOWN_DIMENSIONS):
+            if dimension not in BREAKDOWN_DIMENSIONS:
+                frappe.throw(_("Unknown breakdown dimension: {0}").format(dimension))
+            rows = get_gl_breakdown(BREAKDOWN_DIMENSIONS[dimension], conditions, params, top_n)
+            for row in rows:
+                row['is_other'] = bool(row['is_other'])
+                if row['is_other']:
+                    row[BREAKDOWN_DIMENSIONS[dimension][-1]] = _('Other')
+            breakdown[dimension] = rows
+
+        return {
+            'success': True,
+            'breakdown': breakdown,
+            'total': sum(flt(r['amount']) for r in next(iter(breakdown.values()), [])),
+            'from_date': str(from_date),
+            'to_date': str(to_date)
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
 @frappe.whitelist()
 def get_gl_entries_with_report_class_api(filters=None):
     """Get GL entries with their report classes for frontend consumption"""
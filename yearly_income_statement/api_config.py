@@ -51,7 +51,9 @@ API_ENDPOINTS = {
         "method": "GET",
         "description": "Get combined dashboard data with budget, actual, and forecast",
         "parameters": {
-            "filters": "JSON object with company, fiscal_year, cost_center"
+            "filters": "JSON object with company, fiscal_year, cost_center, optional forecast_mode (budget, seasonal, holt_winters)",
+            "payload_format": "Optional 'columnar' for parallel arrays plus an integer-cents value matrix (decode with decodeColumnarDashboard)",
+            "with_timings": "Optional 1 (System Manager only) to add a _timings block: wall/DB time, queries and rows per stage"
         },
         "returns": {
             "dashboard_data": "Array of processed dashboard rows",
@@ -59,6 +61,21 @@ API_ENDPOINTS = {
         }
     },
     
+    "get_dashboard_tree_view": {
+        "url": "/api/method/yearly_income_statement.api.get_dashboard_tree_view",
+        "method": "POST",
+        "description": "Get the P&L collapsed to a tree depth, or one node's children, from cached subtree rollups",
+        "parameters": {
+            "filters": "JSON object with company, fiscal_year, cost_center, month and either depth (1, 2, 3...) or expand_node (account name)"
+        },
+        "returns": {
+            "dashboard_data": "Rolled-up account rows with indent and has_children",
+            "period_list": "Period definitions",
+            "expand_node": "Expanded account, if any",
+            "filters": "Applied filters"
+        }
+    },
+    
     "get_comprehensive_dashboard_data": {
         "url": "/api/method/yearly_income_statement.advanced_api.get_comprehensive_dashboard_data",
         "method": "GET",
@@ -141,6 +158,169 @@ API_ENDPOINTS = {
         }
     },
     
+    # Drill-down Endpoints
+    "get_gl_drilldown": {
+        "url": "/api/method/yearly_income_statement.api.get_gl_drilldown",
+        "method": "POST",
+        "description": "Keyset-paginated GL entries for one account (or group) and period",
+        "parameters": {
+            "filters": "JSON object with company, account, cost_center and either fiscal_year + month or from_date + to_date",
+            "cursor": "next_cursor from the previous page (omit for the first page)",
+            "page_size": "Rows per page, default 100, max 500"
+        },
+        "returns": {
+            "gl_entries": "GL entries ordered by posting_date, name",
+            "has_more": "Whether another page exists",
+            "next_cursor": "Cursor for the next page"
+        }
+    },
+    
+    "get_cell_breakdown": {
+        "url": "/api/method/yearly_income_statement.api.get_cell_breakdown",
+        "method": "POST",
+        "description": "Top-N breakdown of one account and period by voucher type, party and cost center, with an Other bucket",
+        "parameters": {
+            "filters": "Same as get_gl_drilldown",
+            "dimensions": "Optional list of voucher_type, party, cost_center (default all)",
+            "top_n": "Contributors per dimension, default 10"
+        },
+        "returns": {
+            "breakdown": "Rows per dimension with amount, debit, credit, entries and is_other",
+            "total": "Net amount of the cell"
+        }
+    },
+    
+    "get_variance_ranking": {
+        "url": "/api/method/yearly_income_statement.api.get_variance_ranking",
+        "method": "POST",
+        "description": "Top-N lines by budget variance (amount and percentage) for the current month and YTD",
+        "parameters": {
+            "filters": "Dashboard filters plus optional section and report_class (string or list)",
+            "top_n": "Lines per ranking, default 20",
+            "direction": "over (default), under or any"
+        },
+        "returns": {
+            "ranking": "currentMonth and yearToDate, each with by_amount and by_percentage lists",
+            "candidates": "Number of account rows considered"
+        }
+    },
+    
+    "get_forecast_projection": {
+        "url": "/api/method/yearly_income_statement.api.get_forecast_projection",
+        "method": "POST",
+        "description": "Year-end forecast per account from prior-year seasonality and run rate, or Holt-Winters",
+        "parameters": {
+            "filters": "JSON object with company, fiscal_year, cost_center",
+            "mode": "seasonal (default) or holt_winters"
+        },
+        "returns": {
+            "forecasts": "Map of account to forecast actual",
+            "elapsed_months": "Closed fiscal months used as actuals"
+        }
+    },
+    
+    "get_forecast_simulation": {
+        "url": "/api/method/yearly_income_statement.api.get_forecast_simulation",
+        "method": "POST",
+        "description": "Monte Carlo year-end outcomes per section and for net profit from resampled monthly deviations",
+        "parameters": {
+            "filters": "JSON object with company, fiscal_year, cost_center, reporting_framework",
+            "paths": "Simulated paths, default 5000, max 50000",
+            "seed": "Optional integer seed for reproducible results"
+        },
+        "returns": {
+            "groups": "Per section and Net Profit: ytd_actual, expected, p10, p50, p90",
+            "elapsed_months": "Closed fiscal months used as actuals",
+            "history_samples": "Monthly deviations available for resampling"
+        }
+    },
+    
+    "export_management_pack": {
+        "url": "/api/method/yearly_income_statement.exports.export_management_pack",
+        "method": "GET",
+        "description": "Download the dashboard as an XLSX in the Mgt Pack.xlsx Income Statement layout",
+        "parameters": {
+            "filters": "JSON object with company, fiscal_year, month, cost_center, reporting_framework"
+        },
+        "returns": {
+            "file": "Management Pack - <company> - <fiscal year>.xlsx with period blocks, monthly columns, section totals and net profit"
+        }
+    },
+    
+    "export_gl_entries": {
+        "url": "/api/method/yearly_income_statement.exports.export_gl_entries",
+        "method": "GET",
+        "description": "Stream GL entries with report_class and root_type from an unbuffered cursor",
+        "parameters": {
+            "filters": "JSON object with company, cost_center and from_date/to_date or fiscal_year (optionally month)",
+            "format": "csv (default) or ndjson"
+        },
+        "returns": {
+            "file": "Chunked CSV or NDJSON download, one GL entry per row"
+        }
+    },
+    
+    "export_dashboard_rows": {
+        "url": "/api/method/yearly_income_statement.exports.export_dashboard_rows",
+        "method": "GET",
+        "description": "Stream the aggregated dashboard rows, flattened to one record per row",
+        "parameters": {
+            "filters": "JSON object with company, fiscal_year, month, cost_center, reporting_framework",
+            "format": "csv (default) or ndjson"
+        },
+        "returns": {
+            "file": "Chunked CSV or NDJSON download with period amounts and month_<n>_actual/budget columns"
+        }
+    },
+    
+    "enqueue_management_packs": {
+        "url": "/api/method/yearly_income_statement.exports.enqueue_management_packs",
+        "method": "POST",
+        "description": "Queue management packs for every cost center plus a consolidated pack, zipped into a private File",
+        "parameters": {
+            "filters": "JSON object with company, fiscal_year, month, reporting_framework (cost_center is iterated)"
+        },
+        "returns": {
+            "job_id": "Identifier carried by the progress events",
+            "event": "Realtime event name (management_pack_progress): stage, done, total, and file_url once done"
+        }
+    },
+    
+    "start_report_job": {
+        "url": "/api/method/yearly_income_statement.api.start_report_job",
+        "method": "POST",
+        "description": "Run get_dashboard_data, get_forecast_simulation or get_variance_ranking as a background job",
+        "parameters": {
+            "method": "Report to run, default get_dashboard_data",
+            "filters": "Filters passed to the report",
+            "options": "Other keyword arguments of the report (e.g. paths, seed, top_n)"
+        },
+        "returns": {
+            "job_id": "Identifier carried by the progress events",
+            "event": "Realtime event name (report_job_progress): stage, progress, and on 'done' cache_key plus result when under 256 KB"
+        }
+    },
+    
+    "get_report_job_result": {
+        "url": "/api/method/yearly_income_statement.api.get_report_job_result",
+        "method": "POST",
+        "description": "Fetch the cached result of a finished report job (kept 30 minutes, only for the user who started it)",
+        "parameters": {
+            "job_id": "Job id returned by start_report_job"
+        },
+        "returns": {
+            "result": "The report's return value"
+        }
+    },
+    
+    "get_metrics": {
+        "url": "/api/method/yearly_income_statement.metrics.get_metrics",
+        "method": "GET",
+        "description": "Prometheus text exposition of endpoint latency, payload bytes, queries, GL rows, cache results and job durations (System Manager)",
+        "parameters": {},
+        "returns": "text/plain; version=0.0.4 (also written to the site config path yearly_income_statement_metrics_textfile by the scheduler)"
+    },
+    
     # Filter Data Endpoints
     "get_companies": {
         "url": "/api/method/yearly_income_statement.api.get_companies",
@@ -287,4 +467,8 @@ ERROR_CODES = {
     "INVALID_COST_CENTER": "Cost center not found",
     "DATABASE_ERROR": "Database error occurred",
     "PERMISSION_DENIED": "Permission denied to access data"
-} 
\ No newline at end of file
+} 
+# Request parameters accepted by every report endpoint (decorated with profiled_report)
+REPORT_REQUEST_FLAGS = {
+    "_profile": "1 (System Manager only) to run under cProfile and tracemalloc; the result links the saved pstats dump and summary under _profile"
+}
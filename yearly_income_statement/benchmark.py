@@ -0,0 +1,758 @@
+import calendar
+import importlib
+import inspect
+import json
+import math
+import platform
+import random
+import statistics
+import subprocess
+from datetime import date, timedelta
+
+import frappe
+from frappe import _
+from frappe.utils import now_datetime
+
+import yearly_income_statement
+from yearly_income_statement.tracing import report_trace, trace_summary
+
+# Hotel chart of accounts: (root_type, group, report_class, include_in_gross,
+# leaf accounts, annual amount per leaf for one cost center)
+HOTEL_CHART = (
+	(
+		"Income",
+		"Rooms Revenue",
+		"Room",
+		1,
+		(
+			"Room Revenue - Standard",
+			"Room Revenue - Deluxe",
+			"Room Revenue - Suites",
+			"Room Revenue - Long Stay",
+			"No-Show and Cancellation Revenue",
+		),
+		2_400_000,
+	),
+	(
+		"Income",
+		"Food Revenue",
+		"Food",
+		1,
+		("Restaurant Food", "Room Service Food", "Banquet Food", "Breakfast"),
+		900_000,
+	),
+	(
+		"Income",
+		"Beverage Revenue",
+		"Beverage",
+		1,
+		("Bar Beverage", "Restaurant Beverage", "Minibar", "Banquet Beverage"),
+		500_000,
+	),
+	(
+		"Income",
+		"Other Operating Revenue",
+		"Other Revenue",
+		0,
+		("Spa Revenue", "Laundry Revenue", "Parking Revenue", "Telephone and Internet"),
+		150_000,
+	),
+	(
+		"Expense",
+		"Cost of Food",
+		"Food",
+		1,
+		("Food Cost - Restaurant", "Food Cost - Banquets", "Staff Meals"),
+		320_000,
+	),
+	(
+		"Expense",
+		"Cost of Beverage",
+		"Beverage",
+		1,
+		("Beverage Cost - Bar", "Beverage Cost - Minibar"),
+		140_000,
+	),
+	(
+		"Expense",
+		"Rooms Expenses",
+		"Room",
+		1,
+		("Guest Supplies", "Linen and Laundry", "Travel Agent Commission", "Reservation Fees"),
+		260_000,
+	),
+	(
+		"Expense",
+		"Salaries and Wages",
+		"Expense",
+		0,
+		(
+			"Salaries - Rooms",
+			"Salaries - F&B",
+			"Salaries - Administration",
+			"Salaries - Maintenance",
+			"Casual Labour",
+		),
+		600_000,
+	),
+	(
+		"Expense",
+		"Payroll Burden",
+		"Payroll Burden",
+		0,
+		("Social Security", "Pension Contributions", "Staff Medical", "Staff Training"),
+		150_000,
+	),
+	(
+		"Expense",
+		"Administrative and General",
+		"Administration",
+		0,
+		("Office Supplies", "Professional Fees", "Bank Charges", "Insurance", "IT and Software"),
+		90_000,
+	),
+	(
+		"Expense",
+		"Sales and Marketing",
+		"Marketing",
+		0,
+		("Advertising", "Online Distribution", "Loyalty Programme"),
+		80_000,
+	),
+	(
+		"Expense",
+		"Property Operations",
+		"Other Costs",
+		0,
+		("Repairs and Maintenance", "Electricity", "Water", "Gas and Fuel"),
+		120_000,
+	),
+	("Expense", "Finance Costs", "Finance", 0, ("Interest Expense", "Foreign Exchange Loss"), 60_000),
+)
+DIRECT_REPORT_CLASSES = ("Room", "Food", "Beverage")
+
+# Outlets, and the report classes mostly posted to each
+HOTEL_COST_CENTERS = (
+	("Rooms", ("Room",)),
+	("Restaurant", ("Food", "Beverage")),
+	("Bar", ("Beverage",)),
+	("Banquets", ("Food", "Beverage")),
+	("Spa", ("Other Revenue",)),
+	("Administration", ("Administration", "Marketing", "Finance", "Other Costs")),
+)
+PREFERRED_COST_CENTER_SHARE = 0.8
+
+# Hotel seasonality, January to December
+MONTH_FACTORS = (0.75, 0.8, 0.95, 1.0, 1.05, 1.1, 1.25, 1.3, 1.05, 0.95, 0.85, 0.95)
+ANNUAL_GROWTH = 0.06
+BUDGET_NOISE = 0.05
+
+GL_CHUNK_ROWS = 10_000
+GL_NAME_PREFIX = "BENCH"
+PARTY_POOL = 500
+CLEARING_ACCOUNT = "Benchmark Clearing"
+
+BENCHMARK_MODULES = ("yearly_income_statement.api", "yearly_income_statement.advanced_api")
+# Whitelisted endpoints that are not timed, with the reason recorded in the report
+BENCHMARK_SKIP = {
+	"start_report_job": "enqueues a background job",
+	"get_report_job_result": "reads the result of a finished background job",
+}
+# App caches cleared before each endpoint so its first run is cold
+BENCHMARK_CACHE_PREFIXES = (
+	"warm_dashboard",
+	"dashboard_rollup",
+	"monthly_matrix",
+	"forecast_projection",
+	"forecast_simulation",
+	"single_flight",
+)
+BENCHMARK_REPEAT = 5
+
+
+def generate_hotel_dataset(
+	company,
+	gl_entries=100_000,
+	years=3,
+	end_year=None,
+	cost_centers=None,
+	accounts_multiplier=1,
+	seed=42,
+	replace=False,
+	progress=None,
+):
+	"""Create a synthetic hotel company for benchmarking, or regenerate its data.
+
+	Builds the chart in HOTEL_CHART (report classes, include_in_gross and
+	account groups), the outlet cost centers, calendar fiscal years ending
+	`end_year` and a budget per outlet and year. Then `gl_entries` GL rows
+	are bulk-inserted in GL_CHUNK_ROWS chunks: balanced two-line vouchers
+	against a clearing account, with hotel seasonality, yearly growth and
+	seeded noise, so a given seed always produces the same dataset.
+	`accounts_multiplier` repeats every leaf account to scale the chart.
+
+	Existing masters are reused, but benchmark GL entries and budgets are
+	never appended to: if the company already has them this throws, unless
+	`replace` is set, in which case they are deleted and generated again.
+	"""
+	progress = progress or (lambda message: None)
+	rng = random.Random(seed)
+	end_year = end_year or now_datetime().year
+	fiscal_years = [str(year) for year in range(end_year - years + 1, end_year + 1)]
+
+	abbr = ensure_company(company)
+	ensure_report_classes()
+	ensure_fiscal_years(fiscal_years)
+	leaves = ensure_hotel_chart(company, accounts_multiplier)
+	outlets = ensure_cost_centers(company, cost_centers or len(HOTEL_COST_CENTERS))
+	clearing_account = ensure_account(company, CLEARING_ACCOUNT, get_root_account(company, "Asset"), "Asset")
+	progress(f"{len(leaves)} accounts, {len(outlets)} cost centers, fiscal years {', '.join(fiscal_years)}")
+
+	gl_prefix = f"{GL_NAME_PREFIX}-{abbr}-"
+	if frappe.db.exists("GL Entry", {"company": company, "name": ["like", f"{gl_prefix}%"]}):
+		if not replace:
+			frappe.throw(
+				_("{0} already has benchmark GL entries; pass replace to regenerate them").format(company)
+			)
+		frappe.db.delete("GL Entry", {"company": company, "name": ["like", f"{gl_prefix}%"]})
+		frappe.db.delete("Budget Account", {"parent": ["like", f"{gl_prefix}%"]})
+		frappe.db.delete("Budget", {"company": company, "name": ["like", f"{gl_prefix}%"]})
+		frappe.db.commit()
+
+	insert_budgets(company, gl_prefix, leaves, outlets, fiscal_years, rng)
+	frappe.db.commit()
+
+	written = 0
+	for rows in iter_gl_chunks(
+		company, gl_prefix, leaves, outlets, clearing_account, fiscal_years, gl_entries, rng
+	):
+		frappe.db.bulk_insert("GL Entry", GL_FIELDS, rows, chunk_size=GL_CHUNK_ROWS)
+		frappe.db.commit()
+		written += len(rows)
+		progress(f"{written:,} / {gl_entries:,} GL entries")
+	return {"company": company, "gl_entries": written, "accounts": len(leaves), "cost_centers": len(outlets)}
+
+
+def ensure_company(company):
+	if not frappe.db.exists("Company", company):
+		abbr = "".join(word[0] for word in company.split() if word[0].isalnum()).upper()[:5] or "BH"
+		frappe.get_doc(
+			{
+				"doctype": "Company",
+				"company_name": company,
+				"abbr": abbr,
+				"default_currency": "USD",
+				"country": "United States",
+				"create_chart_of_accounts_based_on": "Standard Template",
+				"chart_of_accounts": "Standard",
+			}
+		).insert(ignore_permissions=True)
+	return frappe.db.get_value("Company", company, "abbr")
+
+
+def ensure_report_classes():
+	for report_class in {group[2] for group in HOTEL_CHART}:
+		if not frappe.db.exists("Report Classes", report_class):
+			frappe.get_doc(
+				{
+					"doctype": "Report Classes",
+					"class_name": report_class,
+					"is_direct": 1 if report_class in DIRECT_REPORT_CLASSES else 0,
+				}
+			).insert(ignore_permissions=True, ignore_mandatory=True)
+
+
+def ensure_fiscal_years(fiscal_years):
+	for year in fiscal_years:
+		if not frappe.db.exists("Fiscal Year", year):
+			frappe.get_doc(
+				{
+					"doctype": "Fiscal Year",
+					"year": year,
+					"year_start_date": f"{year}-01-01",
+					"year_end_date": f"{year}-12-31",
+				}
+			).insert(ignore_permissions=True)
+
+
+def get_root_account(company, root_type):
+	return frappe.db.get_value(
+		"Account", {"company": company, "root_type": root_type, "is_group": 1}, "name", order_by="lft asc"
+	)
+
+
+def ensure_account(company, account_name, parent_account, root_type, is_group=0, **fields):
+	name = frappe.db.get_value("Account", {"company": company, "account_name": account_name})
+	if name:
+		return name
+	return (
+		frappe.get_doc(
+			{
+				"doctype": "Account",
+				"company": company,
+				"account_name": account_name,
+				"parent_account": parent_account,
+				"root_type": root_type,
+				"is_group": is_group,
+				**fields,
+			}
+		)
+		.insert(ignore_permissions=True)
+		.name
+	)
+
+
+def ensure_hotel_chart(company, accounts_multiplier=1):
+	"""Leaf accounts as dicts with name, root_type, report_class and annual amount"""
+	leaves = []
+	for root_type, group, report_class, include_in_gross, accounts, annual_amount in HOTEL_CHART:
+		group_name = ensure_account(
+			company,
+			group,
+			get_root_account(company, root_type),
+			root_type,
+			is_group=1,
+			report_class=report_class,
+			include_in_gross=include_in_gross,
+		)
+		for copy in range(1, accounts_multiplier + 1):
+			for account_name in accounts:
+				label = account_name if copy == 1 else f"{account_name} {copy}"
+				leaves.append(
+					{
+						"name": ensure_account(
+							company,
+							label,
+							group_name,
+							root_type,
+							report_class=report_class,
+							include_in_gross=include_in_gross,
+						),
+						"group": group,
+						"root_type": root_type,
+						"report_class": report_class,
+						"annual_amount": annual_amount / accounts_multiplier,
+					}
+				)
+	return leaves
+
+
+def ensure_cost_centers(company, count):
+	"""Outlet cost centers as dicts with name and the report classes they mostly carry"""
+	parent = frappe.db.get_value(
+		"Cost Center", {"company": company, "is_group": 1}, "name", order_by="lft asc"
+	)
+	outlets = []
+	for index in range(count):
+		label, report_classes = (
+			HOTEL_COST_CENTERS[index] if index < len(HOTEL_COST_CENTERS) else (f"Outlet {index + 1}", ())
+		)
+		name = frappe.db.get_value("Cost Center", {"company": company, "cost_center_name": label})
+		if not name:
+			name = (
+				frappe.get_doc(
+					{
+						"doctype": "Cost Center",
+						"cost_center_name": label,
+						"parent_cost_center": parent,
+						"company": company,
+						"is_group": 0,
+					}
+				)
+				.insert(ignore_permissions=True)
+				.name
+			)
+		outlets.append({"name": name, "report_classes": report_classes})
+	return outlets
+
+
+def pick_cost_center(leaf, outlets, rng):
+	preferred = [outlet for outlet in outlets if leaf["report_class"] in outlet["report_classes"]]
+	if preferred and rng.random() < PREFERRED_COST_CENTER_SHARE:
+		return rng.choice(preferred)["name"]
+	return rng.choice(outlets)["name"]
+
+
+def insert_budgets(company, name_prefix, leaves, outlets, fiscal_years, rng):
+	"""One submitted Budget per outlet and fiscal year, with a row per leaf account"""
+	timestamp = now_datetime()
+	budgets, budget_accounts = [], []
+	for year_index, fiscal_year in enumerate(fiscal_years):
+		growth = (1 + ANNUAL_GROWTH) ** year_index
+		for outlet in outlets:
+			budget_name = f"{name_prefix}BUDGET-{fiscal_year}-{outlet['name']}"
+			budgets.append(
+				(
+					budget_name,
+					timestamp,
+					timestamp,
+					"Administrator",
+					"Administrator",
+					1,
+					company,
+					"Cost Center",
+					outlet["name"],
+					fiscal_year,
+				)
+			)
+			for idx, leaf in enumerate(leaves, 1):
+				amount = (
+					leaf["annual_amount"]
+					* growth
+					* rng.uniform(1 - BUDGET_NOISE, 1 + BUDGET_NOISE)
+					/ len(outlets)
+				)
+				budget_accounts.append(
+					(
+						f"{budget_name}-{idx}",
+						timestamp,
+						timestamp,
+						"Administrator",
+						"Administrator",
+						1,
+						idx,
+						budget_name,
+						"Budget",
+						"accounts",
+						leaf["name"],
+						round(amount, 2),
+					)
+				)
+	frappe.db.bulk_insert(
+		"Budget",
+		(
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"docstatus",
+			"company",
+			"budget_against",
+			"cost_center",
+			"fiscal_year",
+		),
+		budgets,
+	)
+	frappe.db.bulk_insert(
+		"Budget Account",
+		(
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"docstatus",
+			"idx",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"account",
+			"budget_amount",
+		),
+		budget_accounts,
+	)
+
+
+GL_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"posting_date",
+	"account",
+	"cost_center",
+	"debit",
+	"credit",
+	"debit_in_account_currency",
+	"credit_in_account_currency",
+	"account_currency",
+	"against",
+	"party_type",
+	"party",
+	"voucher_type",
+	"voucher_no",
+	"fiscal_year",
+	"company",
+	"is_opening",
+	"is_cancelled",
+	"remarks",
+)
+
+
+def iter_gl_chunks(company, name_prefix, leaves, outlets, clearing_account, fiscal_years, gl_entries, rng):
+	"""Lists of GL Entry value tuples (GL_FIELDS order), GL_CHUNK_ROWS rows at a time"""
+	timestamp = now_datetime()
+	currency = frappe.get_cached_value("Company", company, "default_currency")
+	vouchers = gl_entries // 2
+	per_leaf_year = max(vouchers / (len(leaves) * len(fiscal_years)), 1)
+	month_cum_weights = [sum(MONTH_FACTORS[:month]) for month in range(1, 13)]
+
+	chunk = []
+	for sequence in range(vouchers):
+		year_index = rng.randrange(len(fiscal_years))
+		fiscal_year = fiscal_years[year_index]
+		month = rng.choices(range(1, 13), cum_weights=month_cum_weights)[0]
+		days = calendar.monthrange(int(fiscal_year), month)[1]
+		posting_date = date(int(fiscal_year), month, 1) + timedelta(days=rng.randrange(days))
+
+		leaf = rng.choice(leaves)
+		amount = (
+			leaf["annual_amount"]
+			/ per_leaf_year
+			* MONTH_FACTORS[month - 1]
+			* (1 + ANNUAL_GROWTH) ** year_index
+			* rng.lognormvariate(0, 0.35)
+			/ math.exp(0.35**2 / 2)
+		)
+		amount = round(amount, 2)
+		voucher_type, party_type, party = pick_voucher(leaf, rng)
+		voucher_no = f"{name_prefix}{voucher_type[:2].upper()}-{sequence:09d}"
+		is_income = leaf["root_type"] == "Income"
+		debit, credit = (0, amount) if is_income else (amount, 0)
+		cost_center = pick_cost_center(leaf, outlets, rng)
+
+		for line, (account, line_debit, line_credit, against) in enumerate(
+			((leaf["name"], debit, credit, clearing_account), (clearing_account, credit, debit, leaf["name"]))
+		):
+			chunk.append(
+				(
+					f"{name_prefix}{sequence * 2 + line:010d}",
+					timestamp,
+					timestamp,
+					"Administrator",
+					"Administrator",
+					1,
+					posting_date,
+					account,
+					cost_center,
+					line_debit,
+					line_credit,
+					line_debit,
+					line_credit,
+					currency,
+					against,
+					party_type if line else None,
+					party if line else None,
+					voucher_type,
+					voucher_no,
+					fiscal_year,
+					company,
+					"No",
+					0,
+					leaf["group"],
+				)
+			)
+		if len(chunk) >= GL_CHUNK_ROWS:
+			yield chunk
+			chunk = []
+	if chunk:
+		yield chunk
+
+
+def pick_voucher(leaf, rng):
+	"""(voucher_type, party_type, party) typical for postings to this account"""
+	if leaf["root_type"] == "Income":
+		if rng.random() < 0.7:
+			return "Sales Invoice", "Customer", f"Guest {rng.randrange(PARTY_POOL):03d}"
+		return "Journal Entry", None, None
+	if leaf["report_class"] in ("Expense", "Payroll Burden"):
+		return "Payroll Entry", None, None
+	if rng.random() < 0.75:
+		return "Purchase Invoice", "Supplier", f"Supplier {rng.randrange(PARTY_POOL // 5):03d}"
+	return "Journal Entry", None, None
+
+
+def get_benchmark_endpoints():
+	"""(key, function) for every whitelisted endpoint defined in BENCHMARK_MODULES"""
+	endpoints = []
+	for module_name in BENCHMARK_MODULES:
+		module = importlib.import_module(module_name)
+		for name, fn in vars(module).items():
+			if callable(fn) and fn in frappe.whitelisted and getattr(fn, "__module__", None) == module_name:
+				endpoints.append((f"{module_name.rsplit('.', 1)[-1]}.{name}", fn))
+	return endpoints
+
+
+def get_benchmark_context(company, fiscal_year=None, month=None):
+	"""Filters and arguments shared by every endpoint at one dataset scale"""
+	if not fiscal_year:
+		latest = frappe.db.sql(
+			"""
+			SELECT fiscal_year FROM `tabGL Entry`
+			WHERE company = %s AND is_cancelled = 0
+			ORDER BY posting_date DESC LIMIT 1
+		""",
+			(company,),
+		)
+		if not latest:
+			frappe.throw(_("{0} has no GL entries; run generate-hotel-dataset first").format(company))
+		fiscal_year = latest[0][0]
+	busiest_account = frappe.db.sql(
+		"""
+		SELECT gl.account FROM `tabGL Entry` gl
+		INNER JOIN `tabAccount` acc ON acc.name = gl.account
+		WHERE gl.company = %s AND gl.fiscal_year = %s AND acc.root_type = 'Income'
+		GROUP BY gl.account ORDER BY COUNT(*) DESC LIMIT 1
+	""",
+		(company, fiscal_year),
+	)
+	return {
+		"company": company,
+		"fiscal_year": fiscal_year,
+		"month": str(month or 6),
+		"account": busiest_account[0][0] if busiest_account else None,
+		"gl_entries": frappe.db.count("GL Entry", {"company": company}),
+		"accounts": frappe.db.count(
+			"Account", {"company": company, "root_type": ["in", ["Income", "Expense"]], "is_group": 0}
+		),
+		"cost_centers": frappe.db.count("Cost Center", {"company": company, "is_group": 0}),
+	}
+
+
+def get_benchmark_kwargs(endpoint, fn, context):
+	"""Arguments for one endpoint: the scale's filters plus whatever the endpoint needs on top"""
+	filters = {
+		"company": context["company"],
+		"fiscal_year": context["fiscal_year"],
+		"month": context["month"],
+	}
+	name = endpoint.rsplit(".", 1)[-1]
+	kwargs = {}
+	if name == "get_dashboard_tree_view":
+		filters["depth"] = 2
+	elif name in ("get_gl_drilldown", "get_cell_breakdown"):
+		filters["account"] = context["account"]
+	elif name == "get_forecast_simulation":
+		kwargs = {"paths": 1000, "seed": 1}
+	if "filters" in inspect.signature(fn).parameters:
+		kwargs["filters"] = filters
+	return kwargs
+
+
+def clear_report_caches():
+	cache = frappe.cache()
+	for prefix in BENCHMARK_CACHE_PREFIXES:
+		cache.delete_keys(f"yearly_income_statement:{prefix}:")
+	frappe.local.cache = {}
+
+
+def benchmark_endpoint(endpoint, fn, kwargs, repeat):
+	"""Cold run (app caches cleared) then repeat - 1 warm runs, each traced"""
+	clear_report_caches()
+	runs = []
+	result = None
+	error = None
+	for _run in range(repeat):
+		with report_trace(endpoint) as trace:
+			try:
+				result = fn(**kwargs)
+			except Exception as e:
+				error = str(e)
+		runs.append(trace_summary(trace))
+		frappe.db.rollback()
+		if error:
+			break
+
+	# Endpoints that catch their own exceptions report them as success: false or an error key
+	if error is None and isinstance(result, dict) and (result.get("success") is False or result.get("error")):
+		error = result.get("error") or "success: false"
+	warm = [run["wall_ms"] for run in runs[1:]] or [runs[0]["wall_ms"]]
+	return {
+		"cold_ms": runs[0]["wall_ms"],
+		"warm_ms": round(statistics.median(warm), 1),
+		"min_ms": min(run["wall_ms"] for run in runs),
+		"max_ms": max(run["wall_ms"] for run in runs),
+		"db_ms": runs[0]["db_ms"],
+		"queries": runs[0]["queries"],
+		"rows": runs[0]["rows"],
+		"payload_bytes": len(frappe.as_json(result, indent=None)) if error is None else None,
+		"error": error,
+	}
+
+
+def run_benchmark(
+	companies, fiscal_year=None, month=None, repeat=BENCHMARK_REPEAT, endpoints=None, progress=None
+):
+	"""Time every whitelisted endpoint of api.py and advanced_api.py at each dataset scale.
+
+	`companies` are benchmark companies of different sizes (see
+	generate_hotel_dataset). Returns the report written by the
+	benchmark-dashboard command; compare two with compare_benchmark_reports.
+	"""
+	progress = progress or (lambda message: None)
+	report = {
+		"generated_at": str(now_datetime()),
+		"app_version": yearly_income_statement.__version__,
+		"git_commit": get_git_commit(),
+		"frappe_version": frappe.__version__,
+		"python": platform.python_version(),
+		"repeat": repeat,
+		"skipped": BENCHMARK_SKIP,
+		"scales": [],
+	}
+	for company in companies:
+		context = get_benchmark_context(company, fiscal_year, month)
+		scale = {k: v for k, v in context.items() if k != "account"}
+		scale["endpoints"] = {}
+		for endpoint, fn in get_benchmark_endpoints():
+			name = endpoint.rsplit(".", 1)[-1]
+			if name in BENCHMARK_SKIP or (endpoints and name not in endpoints):
+				continue
+			timing = benchmark_endpoint(endpoint, fn, get_benchmark_kwargs(endpoint, fn, context), repeat)
+			scale["endpoints"][endpoint] = timing
+			progress(
+				f"{company} ({context['gl_entries']:,} GL): {endpoint} cold {timing['cold_ms']} ms, warm {timing['warm_ms']} ms"
+				+ (f" - {timing['error']}" if timing["error"] else "")
+			)
+		report["scales"].append(scale)
+	return report
+
+
+def compare_benchmark_reports(base, head, metric="warm_ms"):
+	"""[(company, gl_entries, endpoint, base value, head value, head / base)] for endpoints in both reports"""
+	base_scales = {scale["company"]: scale for scale in base.get("scales", [])}
+	rows = []
+	for scale in head.get("scales", []):
+		base_scale = base_scales.get(scale["company"])
+		if not base_scale:
+			continue
+		for endpoint, timing in scale["endpoints"].items():
+			before = base_scale["endpoints"].get(endpoint, {}).get(metric)
+			after = timing.get(metric)
+			if before is None or after is None:
+				continue
+			rows.append(
+				(
+					scale["company"],
+					scale["gl_entries"],
+					endpoint,
+					before,
+					after,
+					round(after / before, 2) if before else None,
+				)
+			)
+	return rows
+
+
+def get_git_commit():
+	try:
+		return (
+			subprocess.run(
+				["git", "rev-parse", "--short", "HEAD"],
+				cwd=frappe.get_app_path("yearly_income_statement"),
+				capture_output=True,
+				text=True,
+				timeout=5,
+			).stdout.strip()
+			or None
+		)
+	except Exception:
+		return None
+
+
+def write_report(report, path):
+	with open(path, "w") as f:
+		json.dump(report, f, indent=1, default=str)
@@ -0,0 +1,138 @@
+import json
+import sys
+
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command("generate-hotel-dataset")
+@click.option(
+	"--company", default="Benchmark Hotel Ltd", help="Company to create (existing masters are reused)"
+)
+@click.option("--gl-entries", default=100_000, type=int, help="GL entries to generate (100k to 10M)")
+@click.option("--years", default=3, type=int, help="Calendar fiscal years, ending this year")
+@click.option("--end-year", type=int, help="Last fiscal year (default: this year)")
+@click.option("--cost-centers", type=int, help="Outlet cost centers (default: 6)")
+@click.option(
+	"--accounts-multiplier", default=1, type=int, help="Repeat every leaf account to scale the chart"
+)
+@click.option("--seed", default=42, type=int, help="Random seed; the same seed gives the same dataset")
+@click.option("--replace", is_flag=True, help="Delete previously generated GL entries and budgets first")
+@pass_context
+def generate_hotel_dataset(
+	context, company, gl_entries, years, end_year, cost_centers, accounts_multiplier, seed, replace
+):
+	"""Generate a synthetic hotel company with budgets and GL entries for benchmarking"""
+	from yearly_income_statement.benchmark import generate_hotel_dataset
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		result = generate_hotel_dataset(
+			company,
+			gl_entries=gl_entries,
+			years=years,
+			end_year=end_year,
+			cost_centers=cost_centers,
+			accounts_multiplier=accounts_multiplier,
+			seed=seed,
+			replace=replace,
+			progress=click.echo,
+		)
+		click.echo(json.dumps(result))
+	finally:
+		frappe.destroy()
+
+
+@click.command("benchmark-dashboard")
+@click.option(
+	"--company",
+	"companies",
+	multiple=True,
+	required=True,
+	help="Benchmark company; repeat for each dataset scale",
+)
+@click.option("--fiscal-year", help="Fiscal year to report on (default: latest with GL entries)")
+@click.option("--month", help="Current month filter (default: 6)")
+@click.option("--repeat", default=5, type=int, help="Runs per endpoint: one cold, the rest warm")
+@click.option("--endpoint", "endpoints", multiple=True, help="Only time these endpoints")
+@click.option("--output", default="dashboard-benchmark.json", help="JSON report path")
+@pass_context
+def benchmark_dashboard(context, companies, fiscal_year, month, repeat, endpoints, output):
+	"""Time every whitelisted endpoint in api.py and advanced_api.py and write a JSON report"""
+	from yearly_income_statement.benchmark import run_benchmark, write_report
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		frappe.set_user("Administrator")
+		report = run_benchmark(
+			list(companies),
+			fiscal_year=fiscal_year,
+			month=month,
+			repeat=repeat,
+			endpoints=set(endpoints),
+			progress=click.echo,
+		)
+		write_report(report, output)
+		click.echo(f"Report written to {output}")
+	finally:
+		frappe.destroy()
+
+
+@click.command("compare-dashboard-benchmarks")
+@click.argument("base")
+@click.argument("head")
+@click.option(
+	"--metric",
+	default="warm_ms",
+	type=click.Choice(["cold_ms", "warm_ms", "queries", "rows", "payload_bytes"]),
+)
+def compare_dashboard_benchmarks(base, head, metric):
+	"""Compare two benchmark-dashboard reports, endpoint by endpoint"""
+	from yearly_income_statement.benchmark import compare_benchmark_reports
+
+	with open(base) as f:
+		base_report = json.load(f)
+	with open(head) as f:
+		head_report = json.load(f)
+	for company, gl_entries, endpoint, before, after, ratio in compare_benchmark_reports(
+		base_report, head_report, metric
+	):
+		click.echo(f"{company} ({gl_entries:,} GL)  {endpoint:<50} {before:>12} -> {after:>12}  x{ratio}")
+
+
+@click.command("check-query-budgets")
+@click.option("--small-company", help="Company with the smaller chart (default: generated fixture)")
+@click.option("--large-company", help="Company with the larger chart (default: generated fixture)")
+@click.option("--endpoint", "endpoints", multiple=True, help="Only check these endpoints")
+@click.option("--output", help="Also write the measurements to this JSON file")
+@pass_context
+def check_query_budgets(context, small_company, large_company, endpoints, output):
+	"""Fail when a report endpoint exceeds its query budget or its query count grows with the chart"""
+	from yearly_income_statement.query_budgets import check_query_budgets, ensure_budget_fixtures
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		frappe.set_user("Administrator")
+		if not (small_company and large_company):
+			small_company, large_company = ensure_budget_fixtures(progress=click.echo)
+		outcome = check_query_budgets(
+			small_company, large_company, endpoints=set(endpoints), progress=click.echo
+		)
+		if output:
+			with open(output, "w") as f:
+				json.dump(outcome, f, indent=1, default=str)
+	finally:
+		frappe.destroy()
+
+	for failure in outcome["failures"]:
+		click.secho(failure, fg="red")
+	if outcome["failures"]:
+		sys.exit(1)
+	click.secho(f"{len(outcome['results'])} endpoints within budget", fg="green")
+
+
+commands = [generate_hotel_dataset, benchmark_dashboard, compare_dashboard_benchmarks, check_query_budgets]
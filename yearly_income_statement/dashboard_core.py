@@ -0,0 +1,618 @@
+"""
+Pure computation core of the P&L dashboard.
+
+Everything here works on plain data: account rows (dicts ordered by lft), GL
+entries (dicts with account, debit, credit and posting_date), budget maps
+({account: annual budget}) and dates. Nothing reads from the database or
+the site, so the functions can be micro-benchmarked, fuzz-tested and run in
+process pools without a bench; api.compute_dashboard_data is the Frappe I/O
+layer that loads the inputs and calls them stage by stage.
+"""
+
+import calendar
+from datetime import date, datetime
+
+# Sections rendered on the dashboard, in display order: (section, root type, is_direct).
+# Accounts classified into any other section (Salaries & Wages, Payroll Burden)
+# are not shown.
+DASHBOARD_SECTIONS = (
+	("Direct Revenue", "Income", True),
+	("Cost of Sales", "Expense", True),
+	("Direct Expenses", "Expense", True),
+	("Indirect Revenue", "Income", False),
+	("Indirect Expenses", "Expense", False),
+)
+
+# Period columns of a dashboard row and the amounts in each
+PERIOD_KEYS = ("currentMonth", "yearToDate", "forecast")
+AMOUNT_KEYS = ("lastYear", "budget", "actual")
+
+# GL windows of one dashboard, in the order they are read
+GL_PERIODS = (
+	"full_year",
+	"previous_year",
+	"ytd",
+	"ytd_last_year",
+	"current_month",
+	"current_month_last_year",
+)
+
+# The GL_PERIODS build_dashboard_rows reads; the whole previous year is only
+# needed by calculate_account_financial_data
+DASHBOARD_GL_PERIODS = ("full_year", "ytd", "ytd_last_year", "current_month", "current_month_last_year")
+
+# Hotel-specific cost of sales report classes
+HOTEL_COS_CLASSES = {"Food", "Beverage", "Room", "Other Costs", "Cost of Sales"}
+
+# Define specific expense categories for proper classification
+SALARY_EXPENSE_CLASSES = {"Salaries & Wages", "Salary", "Wages", "Payroll"}
+
+DIRECT_OPERATIONAL_CLASSES = {"Direct Expenses", "Operational", "Maintenance", "Utilities", "Supplies"}
+
+DIRECT_REVENUE_CLASSES = {
+	"Room",
+	"Food",
+	"Beverage",
+	"Spa",
+	"Conference",
+	"Pool",
+	"Gym",
+	"Direct Revenue",
+	"Other Revenue",
+}
+
+PAYROLL_BURDEN_KEYWORDS = (
+	"burden",
+	"statutory",
+	"employer",
+	"social security",
+	"provident",
+	"pension",
+	"ssnit",
+	"gratuity",
+	"severance",
+	"vacation",
+	"sick",
+)
+
+ADMINISTRATIVE_KEYWORDS = (
+	"administrative",
+	"admin",
+	"overhead",
+	"office",
+	"marketing",
+	"insurance",
+	"rent",
+	"depreciation",
+	"amortization",
+)
+
+
+def to_date(value):
+	"""date from a date, datetime or ISO date string"""
+	if isinstance(value, datetime):
+		return value.date()
+	if isinstance(value, date):
+		return value
+	return date.fromisoformat(str(value)[:10])
+
+
+def add_years(value, years):
+	"""Same day `years` later; 29 February falls back to the 28th"""
+	value = to_date(value)
+	try:
+		return value.replace(year=value.year + years)
+	except ValueError:
+		return value.replace(year=value.year + years, day=28)
+
+
+def month_bounds(year, month):
+	"""(first day, last day) of a calendar month"""
+	return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def clamp_ytd_end(year_start, year_end, today):
+	"""Today, clamped to the fiscal year"""
+	today, year_start, year_end = to_date(today), to_date(year_start), to_date(year_end)
+	if year_start <= today <= year_end:
+		return today
+	elif today > year_end:
+		return year_end
+	return year_start
+
+
+def get_report_windows(
+	fiscal_year,
+	year_start,
+	year_end,
+	prev_year_start,
+	prev_year_end,
+	today,
+	month=None,
+	from_date=None,
+	to_date_=None,
+):
+	"""(from, to) date window of every GL_PERIODS entry, plus `ytd_end`.
+
+	`from_date`/`to_date_` narrow the current year (they default to the
+	fiscal year). The current month windows are None unless `month` (1-12)
+	is given; the month is taken in the calendar year named by `fiscal_year`,
+	so it is only resolved for calendar fiscal years.
+	"""
+	from_date = to_date(from_date or year_start)
+	to_date_ = to_date(to_date_ or year_end)
+	prev_from_date = to_date(prev_year_start)
+	prev_to_date = to_date(prev_year_end)
+	ytd_end = clamp_ytd_end(year_start, year_end, today)
+	has_month = bool(month and str(month).strip())
+
+	current_month = None
+	if has_month:
+		try:
+			current_month = month_bounds(int(fiscal_year), int(month))
+		except ValueError:
+			pass
+
+	return {
+		"full_year": (from_date, to_date_),
+		"previous_year": (prev_from_date, prev_to_date),
+		"ytd": (from_date, ytd_end),
+		"ytd_last_year": (prev_from_date, add_years(ytd_end, -1) if has_month else prev_to_date),
+		"current_month": current_month,
+		"current_month_last_year": (
+			(add_years(current_month[0], -1), add_years(current_month[1], -1)) if current_month else None
+		),
+		"ytd_end": ytd_end,
+	}
+
+
+def safe_ratio(numerator, denominator, default="N/A"):
+	"""Helper function to safely calculate ratios with error handling"""
+	if not denominator or denominator == 0:
+		return default
+	try:
+		ratio = (numerator / denominator) * 100
+		return round(ratio, 1)
+	except (TypeError, ValueError, ZeroDivisionError):
+		return default
+
+
+def compute_section_and_flags(acc, inc_gross_map, report_class_direct_map=None):
+	"""Determine section and cost-of-sales flags using ERPNext-native semantics augmented with report_class.is_direct."""
+	if report_class_direct_map is None:
+		report_class_direct_map = {}
+
+	root = (acc.get("root_type") or "").strip()
+	acct_type = (acc.get("account_type") or "").strip()
+	inc_gross = bool(inc_gross_map.get(acc["name"], 0))
+	report_class = (acc.get("report_class") or "").strip()
+	report_class_lower = report_class.lower()
+
+	# Report class direct flag (from doctype)
+	rc_is_direct = bool(report_class_direct_map.get(report_class, False))
+
+	if root == "Income":
+		if rc_is_direct or report_class in DIRECT_REVENUE_CLASSES:
+			return "Direct Revenue", True
+		return "Indirect Revenue", False
+
+	if root != "Expense":
+		return "Other", False
+
+	# Determine if this is a cost of sales account
+	if (
+		inc_gross
+		or acct_type in {"Cost of Goods Sold", "Direct Expenses", "Cost of Sales"}
+		or report_class in HOTEL_COS_CLASSES
+		or rc_is_direct  # treat expense classes marked direct as cost of sales/direct expenses
+	):
+		return "Cost of Sales", True
+	if (
+		report_class in SALARY_EXPENSE_CLASSES
+		or "salary" in report_class_lower
+		or "wage" in report_class_lower
+	):
+		return "Salaries & Wages", True
+	if any(keyword in report_class_lower for keyword in PAYROLL_BURDEN_KEYWORDS):
+		return "Payroll Burden", True
+	if report_class in DIRECT_OPERATIONAL_CLASSES:
+		return "Direct Expenses", True
+	if any(keyword in report_class_lower for keyword in ADMINISTRATIVE_KEYWORDS):
+		return "Indirect Expenses", True
+	# Only truly uncategorized expenses should default to Indirect Expenses
+	return "Indirect Expenses", False
+
+
+def classify_accounts(accounts, inc_gross_map, report_class_direct_map):
+	"""{section: [accounts]} in input order, via compute_section_and_flags"""
+	sections = {}
+	for account in accounts:
+		section, _is_direct = compute_section_and_flags(account, inc_gross_map, report_class_direct_map)
+		sections.setdefault(section, []).append(account)
+	return sections
+
+
+def pre_aggregate_gl_entries(gl_entries):
+	"""Pre-aggregate GL entries per account per period to avoid double-counting"""
+	aggregated = {}
+
+	for entry in gl_entries:
+		account = entry.get("account")
+		if not account:
+			continue
+
+		# Create key for this account
+		if account not in aggregated:
+			aggregated[account] = {"debit": 0, "credit": 0, "net_amount": 0}
+
+		# Sum up debits and credits
+		aggregated[account]["debit"] += entry.get("debit", 0)
+		aggregated[account]["credit"] += entry.get("credit", 0)
+
+	# Calculate net amounts
+	for account_data in aggregated.values():
+		account_data["net_amount"] = account_data["debit"] - account_data["credit"]
+
+	return aggregated
+
+
+def aggregate_monthly_amounts(gl_entries):
+	"""Aggregate GL entries by account and posting month (1-12) for the fiscal period provided in gl_entries.
+	Returns: { account_name: { month_number: amount } }
+	"""
+	monthly_map = {}
+	for entry in gl_entries or []:
+		try:
+			account = entry.get("account")
+			if not account:
+				continue
+			posting_month = to_date(entry.get("posting_date")).month
+			account_map = monthly_map.setdefault(account, {})
+			account_map[posting_month] = account_map.get(posting_month, 0) + (
+				entry.get("debit", 0) - entry.get("credit", 0)
+			)
+		except Exception:
+			# Skip malformed entries
+			continue
+	# Convert to absolute values to match dashboard presentation
+	for by_month in monthly_map.values():
+		for m in list(by_month.keys()):
+			by_month[m] = abs(by_month[m])
+	return monthly_map
+
+
+def build_period_aggregates(
+	ytd_gl_entries, ytd_last_year_gl_entries, current_month_gl_entries, current_month_last_year_gl_entries
+):
+	"""Aggregate each period's GL entries once per dashboard, for build_account_row"""
+	ytd_months = {}
+	for e in ytd_gl_entries or []:
+		account = e.get("account")
+		if account:
+			ytd_months.setdefault(account, set()).add(to_date(e.get("posting_date")).month)
+	return {
+		"ytd": pre_aggregate_gl_entries(ytd_gl_entries or []),
+		"ytd_last_year": pre_aggregate_gl_entries(ytd_last_year_gl_entries or []),
+		"current_month": pre_aggregate_gl_entries(current_month_gl_entries or []),
+		"current_month_last_year": pre_aggregate_gl_entries(current_month_last_year_gl_entries or []),
+		"ytd_months": ytd_months,
+	}
+
+
+def filter_accounts_hierarchy(accounts):
+	"""Filter accounts using ERPNext's hierarchy approach.
+
+	Single iterative pass over accounts already ordered by lft (as returned by
+	get_all_accounts): a parent always precedes its children, so indent and
+	reachability from a root are known when each account is visited.
+	Accounts whose parent was filtered out are dropped, as before.
+	"""
+	parent_children_map = {}
+	accounts_by_name = {}
+	filtered_accounts = []
+	indents = {}
+
+	for d in accounts:
+		accounts_by_name[d["name"]] = d
+		parent_key = d.get("parent_account") or None
+		parent_children_map.setdefault(parent_key, []).append(d)
+
+		if parent_key is None:
+			level = 0
+		elif parent_key in indents:
+			level = indents[parent_key] + 1
+		else:
+			continue
+		indents[d["name"]] = level
+		d["indent"] = level
+		filtered_accounts.append(d)
+
+	return filtered_accounts, accounts_by_name, parent_children_map
+
+
+def build_account_row(account, period_aggregates, annual_budget=0, monthly_actuals=None):
+	"""Dashboard row of one account from build_period_aggregates output and its annual budget.
+
+	Actuals are absolute net amounts. The YTD budget is annual / 12 per month
+	with YTD postings, the current month budget annual / 12, and the forecast
+	YTD actual plus the remaining budget.
+	"""
+	account_name = account["name"]
+
+	# Get aggregated data for this specific account
+	ytd_data = period_aggregates["ytd"].get(account_name, {"net_amount": 0})
+	ytd_last_year_data = period_aggregates["ytd_last_year"].get(account_name, {"net_amount": 0})
+	current_month_data = period_aggregates["current_month"].get(account_name, {"net_amount": 0})
+	current_month_last_year_data = period_aggregates["current_month_last_year"].get(
+		account_name, {"net_amount": 0}
+	)
+
+	# Calculate amounts from pre-aggregated GL entries
+	ytd_actual = abs(ytd_data["net_amount"])
+	ytd_last_year = abs(ytd_last_year_data["net_amount"])
+	current_month_actual = abs(current_month_data["net_amount"])
+	current_month_last_year = abs(current_month_last_year_data["net_amount"])
+
+	# Simple proportional budgets
+	annual_budget = annual_budget or 0
+	ytd_budget = 0
+	current_month_budget = 0
+	try:
+		# YTD proportion based on actual months elapsed from ytd_gl_entries
+		ytd_months = period_aggregates["ytd_months"].get(account_name)
+		months_elapsed = len(ytd_months) if ytd_months else 0
+		ytd_budget = (annual_budget / 12.0) * months_elapsed if months_elapsed > 0 else 0
+		current_month_budget = annual_budget / 12.0
+	except Exception:
+		pass
+
+	# Calculate forecast as YTD actual + remaining budget
+	remaining_budget = max(annual_budget - ytd_budget, 0)
+	forecast_actual = ytd_actual + remaining_budget
+	forecast_budget = annual_budget
+
+	# Build monthly map: actuals from monthly_actuals, budgets as annual/12
+	monthly_budget_value = (annual_budget / 12.0) if annual_budget else 0
+	monthly = {}
+	monthly_actuals = monthly_actuals or {}
+	for m in range(1, 13):
+		monthly[m] = {"actual": float(monthly_actuals.get(m, 0) or 0), "budget": float(monthly_budget_value)}
+
+	return {
+		"type": "account",
+		"category": account.get("account_name", account_name),
+		"account": account_name,
+		"root_type": account.get("root_type"),
+		"currentMonth": {
+			"lastYear": current_month_last_year,
+			"budget": current_month_budget,
+			"actual": current_month_actual,
+			"actBudThisYear": safe_ratio(current_month_actual, current_month_budget),
+			"actVsLastYear": safe_ratio(current_month_actual, current_month_last_year),
+		},
+		"yearToDate": {
+			"lastYear": ytd_last_year,
+			"budget": ytd_budget,
+			"actual": ytd_actual,
+			"actBudThisYear": safe_ratio(ytd_actual, ytd_budget),
+			"actVsLastYear": safe_ratio(ytd_actual, ytd_last_year),
+		},
+		"forecast": {
+			"lastYear": ytd_last_year,
+			"budget": forecast_budget,
+			"actual": forecast_actual,
+			"actBudThisYear": safe_ratio(forecast_actual, forecast_budget),
+			"actVsLastYear": safe_ratio(forecast_actual, ytd_last_year),
+		},
+		"monthly": monthly,
+	}
+
+
+def calculate_account_financial_data(
+	account, aggregates, annual_budget, from_date, to_date_, ytd_end_date, with_current_month=False
+):
+	"""Period values of one account over an arbitrary date range.
+
+	`aggregates` maps GL_PERIODS names to pre_aggregate_gl_entries output
+	(missing periods count as no postings). Unlike build_account_row, the YTD
+	budget is prorated by days elapsed in from_date..to_date_, amounts keep
+	their sign, and the current month is only filled in when asked for and
+	it has postings.
+	"""
+	account_name = account["name"]
+
+	def net_amount(period):
+		return ((aggregates.get(period) or {}).get(account_name) or {}).get("net_amount", 0)
+
+	annual_budget = annual_budget or 0
+	prev_actual_amount = net_amount("previous_year")
+	ytd_actual_amount = net_amount("ytd")
+	ytd_last_year_amount = net_amount("ytd_last_year")
+
+	# YTD budget is proportional to the days elapsed
+	from_date = to_date(from_date)
+	days_elapsed = (to_date(ytd_end_date) - from_date).days
+	total_days = (to_date(to_date_) - from_date).days
+	ytd_budget_amount = annual_budget * (days_elapsed / total_days) if total_days > 0 else 0
+
+	current_month_budget_amount = 0
+	current_month_actual_amount = 0
+	current_month_last_year_amount = 0
+	if with_current_month and aggregates.get("current_month"):
+		current_month_budget_amount = annual_budget / 12
+		current_month_actual_amount = net_amount("current_month")
+		current_month_last_year_amount = net_amount("current_month_last_year")
+
+	# Forecast = YTD actual + remaining budget
+	forecast_actual = ytd_actual_amount + max(annual_budget - ytd_budget_amount, 0)
+
+	return {
+		"currentMonth": {
+			"lastYear": current_month_last_year_amount,
+			"budget": current_month_budget_amount,
+			"actual": current_month_actual_amount,
+			"actBudThisYear": safe_ratio(current_month_actual_amount, current_month_budget_amount),
+			"actVsLastYear": safe_ratio(current_month_actual_amount, current_month_last_year_amount),
+		},
+		"yearToDate": {
+			"lastYear": ytd_last_year_amount,
+			"budget": ytd_budget_amount,
+			"actual": ytd_actual_amount,
+			"actBudThisYear": safe_ratio(ytd_actual_amount, ytd_budget_amount),
+			"actVsLastYear": safe_ratio(ytd_actual_amount, ytd_last_year_amount),
+		},
+		"forecast": {
+			"lastYear": prev_actual_amount,
+			"budget": annual_budget,
+			"actual": forecast_actual,
+			"actBudThisYear": safe_ratio(forecast_actual, annual_budget),
+			"actVsLastYear": safe_ratio(forecast_actual, prev_actual_amount),
+		},
+	}
+
+
+def calculate_section_total(account_rows, total_label, root_type):
+	"""Total row of a section, summed from its account rows (see build_account_row)"""
+	total_data = {period: dict.fromkeys(AMOUNT_KEYS, 0) for period in PERIOD_KEYS}
+
+	for row in account_rows:
+		for period, totals in total_data.items():
+			for field in totals:
+				totals[field] += row[period][field]
+
+	for totals in total_data.values():
+		totals["actBudThisYear"] = safe_ratio(totals["actual"], totals["budget"])
+		totals["actVsLastYear"] = safe_ratio(totals["actual"], totals["lastYear"])
+
+	return {
+		"type": "total",
+		"category": total_label,
+		"root_type": root_type,
+		"currentMonth": total_data["currentMonth"],
+		"yearToDate": total_data["yearToDate"],
+		"forecast": total_data["forecast"],
+	}
+
+
+def build_section_rows(sections, period_aggregates, monthly_actuals_map, budget_map):
+	"""Header, report class sub-header, account and total rows of every DASHBOARD_SECTIONS entry.
+
+	`sections` comes from classify_accounts over accounts indented by
+	filter_accounts_hierarchy; `budget_map` is {account: annual budget}.
+	"""
+	rows = []
+	for section, root_type, is_direct in DASHBOARD_SECTIONS:
+		accounts = sections.get(section)
+		if not accounts:
+			continue
+
+		rows.append(
+			{
+				"type": "header",
+				"category": section,
+				"account": f"HEADER_{section.replace(' ', '_')}",
+				"root_type": root_type,
+				"is_group": True,
+				"indent": 0,
+				"section": section,
+			}
+		)
+
+		# Group by report_class
+		by_class = {}
+		for account in accounts:
+			by_class.setdefault(account.get("report_class", ""), []).append(account)
+
+		account_rows = []
+		for report_class, class_accounts in by_class.items():
+			rows.append(
+				{
+					"type": "sub_header",
+					"category": report_class,
+					"account": f"SUB_HEADER_{report_class}",
+					"root_type": root_type,
+					"is_group": True,
+					"indent": 1,
+					"section": section,
+				}
+			)
+			for account in class_accounts:
+				account_row = build_account_row(
+					account,
+					period_aggregates,
+					budget_map.get(account["name"], 0),
+					monthly_actuals_map.get(account["name"]),
+				)
+				account_row["indent"] = account.get("indent", 1) + 2
+				account_row["section"] = section
+				account_row["is_direct"] = is_direct
+				account_row["report_class"] = report_class
+				rows.append(account_row)
+				account_rows.append(account_row)
+
+		section_total = calculate_section_total(account_rows, f"TOTAL {section.upper()}", root_type)
+		section_total["section"] = section
+		rows.append(section_total)
+	return rows
+
+
+def build_summary_data(rows):
+	"""Year to date income, expense and net profit totals of the account rows"""
+	total_income = sum(
+		row["yearToDate"]["actual"]
+		for row in rows
+		if row.get("root_type") == "Income" and row.get("type") == "account"
+	)
+	total_expenses = sum(
+		row["yearToDate"]["actual"]
+		for row in rows
+		if row.get("root_type") == "Expense" and row.get("type") == "account"
+	)
+	return {
+		"total_income": total_income,
+		"total_expenses": total_expenses,
+		"net_profit": total_income - total_expenses,
+	}
+
+
+def build_period_list(windows):
+	"""Period columns of the dashboard for get_report_windows output"""
+	current_month = windows["current_month"]
+	from_date, to_date_ = windows["full_year"]
+	return [
+		{
+			"key": "currentMonth",
+			"label": "Current Month",
+			"from_date": str(current_month[0]) if current_month else "",
+			"to_date": str(current_month[1]) if current_month else "",
+		},
+		{
+			"key": "yearToDate",
+			"label": "Year to Date",
+			"from_date": str(from_date),
+			"to_date": str(windows["ytd_end"]),
+		},
+		{"key": "forecast", "label": "Forecast", "from_date": str(from_date), "to_date": str(to_date_)},
+	]
+
+
+def build_dashboard_rows(
+	income_accounts, expense_accounts, gl_entries, inc_gross_map, report_class_direct_map, budget_map
+):
+	"""Dashboard rows from plain inputs, in one call.
+
+	`gl_entries` maps DASHBOARD_GL_PERIODS names to entry lists (missing
+	periods are empty); accounts are dicts ordered by lft and are annotated in place.
+	api.compute_dashboard_data loads these inputs and calls this.
+	"""
+	monthly_actuals_map = aggregate_monthly_amounts(gl_entries.get("full_year"))
+	period_aggregates = build_period_aggregates(
+		gl_entries.get("ytd"),
+		gl_entries.get("ytd_last_year"),
+		gl_entries.get("current_month"),
+		gl_entries.get("current_month_last_year"),
+	)
+	income_hierarchy = filter_accounts_hierarchy(income_accounts)[0]
+	expense_hierarchy = filter_accounts_hierarchy(expense_accounts)[0]
+	sections = classify_accounts(income_hierarchy + expense_hierarchy, inc_gross_map, report_class_direct_map)
+	return build_section_rows(sections, period_aggregates, monthly_actuals_map, budget_map)
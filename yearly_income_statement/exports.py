@@ -0,0 +1,695 @@
+import csv
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import frappe
+from frappe import _
+from frappe.utils import add_months, getdate
+from frappe.utils.response import json_handler
+
+from yearly_income_statement.api import (
+	AMOUNT_KEYS,
+	PERIOD_KEYS,
+	get_dashboard_data,
+	get_gl_entries_query,
+	resolve_drilldown_window,
+	shared_report_aggregation,
+)
+from yearly_income_statement.metrics import observe_job
+
+# Column grid of the "Income Statement" sheet in Mgt Pack.xlsx: account code in A,
+# section/total labels in F, line labels in G, then one 7-column block per period
+# separated by narrow spacer columns, 12 monthly columns and the full-year total.
+PACK_ACCOUNT_COLUMN = 0
+PACK_SECTION_COLUMN = 5
+PACK_LABEL_COLUMN = 6
+PACK_PERIOD_COLUMNS = {"currentMonth": 9, "yearToDate": 17, "forecast": 25}
+PACK_MONTH_COLUMN = 33
+PACK_FULL_YEAR_COLUMN = 46
+PACK_WIDTH = PACK_FULL_YEAR_COLUMN + 1
+PACK_HEADER_ROWS = 7
+
+PACK_PERIOD_TITLES = {"currentMonth": "CURRENT MONTH", "yearToDate": "YEAR TO DATE", "forecast": "FORECAST"}
+PACK_BLOCK_HEADERS = {
+	"currentMonth": (
+		"L/Year",
+		"Budget",
+		"Actual",
+		"Act:Bud",
+		"% of Total",
+		"Act/Bud This Year",
+		"Act/Last Year",
+	),
+	"yearToDate": (
+		"L/Year",
+		"Budget",
+		"Actual",
+		"Act:Bud",
+		"% of Total",
+		"Act/Bud This Year",
+		"Act/Last Year",
+	),
+	"forecast": (
+		"L/Year",
+		"Budget",
+		"Forecast",
+		"Act:Bud",
+		"% of Total",
+		"Act/Bud This Year",
+		"Act/Bud Last Year",
+	),
+}
+PACK_COLUMN_WIDTHS = {"A": 12.2, "F": 4.8, "G": 39.5, "H": 2.3, "Q": 2.3, "Y": 2.3, "AG": 2.3, "AT": 1.5}
+PACK_AMOUNT_WIDTH = 14.7
+
+PACK_PROGRESS_EVENT = "management_pack_progress"
+PACK_JOB_TIMEOUT = 3600
+PACK_MAX_RENDER_WORKERS = 4
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_MIMETYPES = {
+	"csv": "text/csv",
+	"ndjson": "application/x-ndjson",
+	"xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+EXPORT_CHUNK_ROWS = 500
+EXPORT_FILE_CHUNK_BYTES = 64 * 1024
+
+GL_EXPORT_FIELDS = (
+	"name",
+	"posting_date",
+	"account",
+	"account_name",
+	"root_type",
+	"report_class",
+	"debit",
+	"credit",
+	"voucher_type",
+	"voucher_no",
+	"cost_center",
+	"party_type",
+	"party",
+	"against_voucher_type",
+	"against_voucher",
+	"remarks",
+	"fiscal_year",
+	"company",
+)
+DASHBOARD_EXPORT_FIELDS = (
+	"type",
+	"category",
+	"account",
+	"root_type",
+	"report_class",
+	"section",
+	"indent",
+	*(f"{period}_{key}" for period in PERIOD_KEYS for key in AMOUNT_KEYS),
+	*(f"month_{m}_{key}" for m in range(1, 13) for key in ("actual", "budget")),
+)
+
+PACK_AMOUNT_FORMAT = '#,##0_);[Red]\\(#,##0\\);\\ "-"_);_)'
+PACK_PERCENT_FORMAT = "0%"
+PACK_RATIO_FORMAT = "0.0%"
+
+
+def empty_pack_totals():
+	"""Zeroed period amounts and monthly values for a running pack total"""
+	return {
+		"periods": {period: {key: 0.0 for key in AMOUNT_KEYS} for period in PERIOD_KEYS},
+		"monthly": [0.0] * 12,
+	}
+
+
+def add_into_pack_totals(target, source, sign=1):
+	for period in PERIOD_KEYS:
+		for key in AMOUNT_KEYS:
+			target["periods"][period][key] += sign * source["periods"][period][key]
+	for i, value in enumerate(source["monthly"]):
+		target["monthly"][i] += sign * value
+
+
+def get_fiscal_months(year_start_date):
+	"""Calendar month numbers in fiscal order, with each month's first day"""
+	start = getdate(year_start_date).replace(day=1)
+	return [(d.month, d) for d in (getdate(add_months(start, i)) for i in range(12))]
+
+
+def pack_row_values(row, fiscal_months, ytd_end_date):
+	"""Period amounts and the 12 monthly columns of a dashboard account row.
+
+	Like the pack, months up to the YTD end carry actuals and later months
+	the budget, so the monthly columns add up to a forecast for the year.
+	"""
+	monthly = row.get("monthly") or {}
+	values = []
+	for month, first_day in fiscal_months:
+		bucket = monthly.get(month) or monthly.get(str(month)) or {}
+		values.append(float(bucket.get("actual" if first_day <= ytd_end_date else "budget") or 0))
+	return {
+		"periods": {
+			period: {key: float((row.get(period) or {}).get(key) or 0) for key in AMOUNT_KEYS}
+			for period in PERIOD_KEYS
+		},
+		"monthly": values,
+	}
+
+
+def iter_pack_lines(rows, labels):
+	"""Yield (kind, label, values, root_type, section, account) lines in pack order.
+
+	Dashboard rows are passed through with their amounts normalised; section
+	totals are summed from the section's account lines as they go by (the
+	dashboard's own total rows have no monthly values), and the revenue total
+	and net result close the statement.
+	"""
+	section_totals = None
+	income_total = empty_pack_totals()
+	expense_total = empty_pack_totals()
+
+	for row, values in rows:
+		row_type = row.get("type")
+		if row_type == "header":
+			section_totals = empty_pack_totals()
+			yield (
+				"header",
+				(row.get("category") or "").upper(),
+				None,
+				row.get("root_type"),
+				row.get("section"),
+				None,
+			)
+		elif row_type == "sub_header":
+			yield (
+				"sub_header",
+				row.get("category") or labels["unclassified"],
+				None,
+				row.get("root_type"),
+				row.get("section"),
+				None,
+			)
+		elif row_type == "account":
+			if section_totals is not None:
+				add_into_pack_totals(section_totals, values)
+			add_into_pack_totals(income_total if row.get("root_type") == "Income" else expense_total, values)
+			yield (
+				"account",
+				row.get("category"),
+				values,
+				row.get("root_type"),
+				row.get("section"),
+				row.get("account"),
+			)
+		elif row_type == "total" and section_totals is not None:
+			yield (
+				"total",
+				(row.get("category") or "").upper(),
+				section_totals,
+				row.get("root_type"),
+				row.get("section"),
+				None,
+			)
+			section_totals = None
+
+	yield "blank", None, None, None, None, None
+	yield "result", labels["total_revenue"], income_total, "Income", None, None
+	yield "result", labels["total_expenses"], expense_total, "Expense", None, None
+	net_result = empty_pack_totals()
+	add_into_pack_totals(net_result, income_total)
+	add_into_pack_totals(net_result, expense_total, sign=-1)
+	yield "blank", None, None, None, None, None
+	yield "result", labels["net_profit"], net_result, "Income", None, None
+
+
+def get_pack_denominators(rows):
+	"""Per-period section actuals and total revenue, the bases of '% of Total'"""
+	sections = {}
+	revenue = {period: 0.0 for period in PERIOD_KEYS}
+	for row, values in rows:
+		if row.get("type") != "account":
+			continue
+		section = sections.setdefault(row.get("section"), {period: 0.0 for period in PERIOD_KEYS})
+		for period in PERIOD_KEYS:
+			actual = values["periods"][period]["actual"]
+			section[period] += actual
+			if row.get("root_type") == "Income":
+				revenue[period] += actual
+	return sections, revenue
+
+
+def build_dashboard_report(filters):
+	"""get_dashboard_data for an export: always computed, never answered with a 304"""
+	in_conditional_report = frappe.flags.in_conditional_report
+	frappe.flags.in_conditional_report = True
+	try:
+		return get_dashboard_data(filters)
+	finally:
+		frappe.flags.in_conditional_report = in_conditional_report
+
+
+def get_pack_labels():
+	"""Translated text of the pack, resolved up front so rendering needs no site context"""
+	return {
+		"sheet": _("Income Statement"),
+		"title": _("Income Statement for Period Ending {0}"),
+		"not_selected": _("Not Selected"),
+		"full_year": _("Full Year"),
+		"total": _("Total"),
+		"actual": _("Actual"),
+		"budget": _("Budget"),
+		"unclassified": _("Unclassified"),
+		"total_revenue": _("TOTAL REVENUE"),
+		"total_expenses": _("TOTAL EXPENSES"),
+		"net_profit": _("NET PROFIT/(LOSS)"),
+	}
+
+
+def get_pack_context(response, filters):
+	"""Everything besides the rows that rendering a pack needs from the site"""
+	fy_doc = frappe.get_doc("Fiscal Year", filters.get("fiscal_year", "2025"))
+	period_list = {p["key"]: p for p in response.get("period_list") or []}
+	month_end = period_list.get("currentMonth", {}).get("to_date")
+	return {
+		"company": filters.get("company", ""),
+		"ytd_end_date": getdate(period_list.get("yearToDate", {}).get("to_date") or fy_doc.year_end_date),
+		"month_end_date": getdate(month_end) if month_end else None,
+		"fiscal_months": get_fiscal_months(fy_doc.year_start_date),
+		"labels": get_pack_labels(),
+	}
+
+
+def write_management_pack(response, filters, fileobj):
+	"""Stream a dashboard response into `fileobj` as a management pack workbook"""
+	render_management_pack(response.get("dashboard_data") or [], get_pack_context(response, filters), fileobj)
+
+
+def render_management_pack(dashboard_rows, context, fileobj):
+	"""Write dashboard rows into `fileobj` as a management pack workbook.
+
+	The workbook is opened in openpyxl's write-only mode, so rows are
+	serialised to disk as they are appended and memory stays flat regardless
+	of the chart size. Needs no database or site context, so packs can be
+	rendered in worker processes.
+	"""
+	from openpyxl import Workbook
+	from openpyxl.cell import WriteOnlyCell
+	from openpyxl.styles import Alignment, Font
+	from openpyxl.utils import get_column_letter
+
+	labels = context["labels"]
+	ytd_end_date = context["ytd_end_date"]
+	fiscal_months = context["fiscal_months"]
+
+	rows = [
+		(row, pack_row_values(row, fiscal_months, ytd_end_date) if row.get("type") == "account" else None)
+		for row in dashboard_rows
+	]
+	section_bases, revenue_bases = get_pack_denominators(rows)
+
+	wb = Workbook(write_only=True)
+	ws = wb.create_sheet(labels["sheet"])
+	for index in range(PACK_PERIOD_COLUMNS["currentMonth"], PACK_WIDTH):
+		ws.column_dimensions[get_column_letter(index + 1)].width = PACK_AMOUNT_WIDTH
+	for letter, width in PACK_COLUMN_WIDTHS.items():
+		ws.column_dimensions[letter].width = width
+	ws.freeze_panes = f"H{PACK_HEADER_ROWS + 1}"
+
+	bold = Font(bold=True)
+	indented = Alignment(indent=1)
+
+	def cell(value, font=None, number_format=None, alignment=None):
+		c = WriteOnlyCell(ws, value=value)
+		if font:
+			c.font = font
+		if number_format:
+			c.number_format = number_format
+		if alignment:
+			c.alignment = alignment
+		return c
+
+	def blank_row():
+		return [None] * PACK_WIDTH
+
+	# Title and column header rows
+	title = blank_row()
+	title[PACK_SECTION_COLUMN] = cell(context["company"], bold)
+	ws.append([])
+	ws.append(title)
+	title = blank_row()
+	title[PACK_SECTION_COLUMN] = cell(labels["title"].format(ytd_end_date.strftime("%d %B %Y")), bold)
+	ws.append(title)
+	ws.append([])
+
+	banner, dates, headers = blank_row(), blank_row(), blank_row()
+	for period, start in PACK_PERIOD_COLUMNS.items():
+		banner[start] = cell(PACK_PERIOD_TITLES[period], bold)
+		for offset, label in enumerate(PACK_BLOCK_HEADERS[period]):
+			headers[start + offset] = cell(label, bold)
+	month_end_date = context["month_end_date"]
+	dates[PACK_PERIOD_COLUMNS["currentMonth"]] = cell(
+		month_end_date.strftime("%b-%y") if month_end_date else labels["not_selected"]
+	)
+	dates[PACK_PERIOD_COLUMNS["yearToDate"]] = cell(ytd_end_date.strftime("%d-%b-%y"))
+	dates[PACK_PERIOD_COLUMNS["forecast"]] = cell(labels["full_year"])
+	for i, (_month, first_day) in enumerate(fiscal_months):
+		banner[PACK_MONTH_COLUMN + i] = cell(first_day.strftime("%b-%y"), bold)
+		headers[PACK_MONTH_COLUMN + i] = cell(
+			labels["actual"] if first_day <= ytd_end_date else labels["budget"], bold
+		)
+	banner[PACK_FULL_YEAR_COLUMN] = cell(labels["full_year"], bold)
+	headers[PACK_FULL_YEAR_COLUMN] = cell(labels["total"], bold)
+	ws.append(banner)
+	ws.append(dates)
+	ws.append(headers)
+
+	def amounts(line, values, root_type, base, font=None):
+		# Expense variances are favourable when under budget, as in the pack
+		is_income = root_type == "Income"
+		for period, start in PACK_PERIOD_COLUMNS.items():
+			p = values["periods"][period]
+			share_base = base[period] if base else 0
+			line[start] = cell(p["lastYear"], font, PACK_AMOUNT_FORMAT)
+			line[start + 1] = cell(p["budget"], font, PACK_AMOUNT_FORMAT)
+			line[start + 2] = cell(p["actual"], font, PACK_AMOUNT_FORMAT)
+			line[start + 3] = cell(p["actual"] / p["budget"] if p["budget"] else 0, font, PACK_PERCENT_FORMAT)
+			line[start + 4] = cell(p["actual"] / share_base if share_base else 0, font, PACK_PERCENT_FORMAT)
+			line[start + 5] = cell(
+				p["actual"] - p["budget"] if is_income else p["budget"] - p["actual"],
+				font,
+				PACK_AMOUNT_FORMAT,
+			)
+			line[start + 6] = cell(
+				round(p["actual"] / p["lastYear"], 3) if p["lastYear"] else None, font, PACK_RATIO_FORMAT
+			)
+		for i, value in enumerate(values["monthly"]):
+			line[PACK_MONTH_COLUMN + i] = cell(value, font, PACK_AMOUNT_FORMAT)
+		line[PACK_FULL_YEAR_COLUMN] = cell(sum(values["monthly"]), font, PACK_AMOUNT_FORMAT)
+
+	for kind, label, values, root_type, section, account in iter_pack_lines(rows, labels):
+		line = blank_row()
+		if kind == "header":
+			line[PACK_SECTION_COLUMN] = cell(label, bold)
+		elif kind == "sub_header":
+			line[PACK_LABEL_COLUMN] = cell(label, bold)
+		elif kind == "account":
+			line[PACK_ACCOUNT_COLUMN] = cell(account)
+			line[PACK_LABEL_COLUMN] = cell(label, alignment=indented)
+			amounts(line, values, root_type, section_bases.get(section))
+		elif kind == "total":
+			line[PACK_SECTION_COLUMN] = cell(label, bold)
+			amounts(line, values, root_type, section_bases.get(section), bold)
+		elif kind == "result":
+			line[PACK_SECTION_COLUMN] = cell(label, bold)
+			amounts(line, values, root_type, revenue_bases, bold)
+		ws.append(line if kind != "blank" else [])
+		if kind == "total":
+			ws.append([])
+
+	wb.save(fileobj)
+
+
+def get_export_filename(title, filters, extension):
+	"""'<title> - <company> - <cost center> - <fiscal year>.<extension>', skipping unset parts"""
+	parts = [title, filters.get("company"), filters.get("cost_center"), filters.get("fiscal_year")]
+	return " - ".join(str(p).replace("/", "-") for p in parts if p) + f".{extension}"
+
+
+@frappe.whitelist()
+def export_management_pack(filters=None):
+	"""Download the dashboard as an XLSX in the management pack layout.
+
+	The workbook is written to a temporary file, which is then streamed to the
+	client in EXPORT_FILE_CHUNK_BYTES chunks and deleted when the response
+	closes, so the finished file is never held in memory.
+	"""
+	if isinstance(filters, str):
+		filters = json.loads(filters)
+	filters = filters or {}
+
+	response = build_dashboard_report(filters)
+
+	fd, path = tempfile.mkstemp(suffix=".xlsx")
+	try:
+		with os.fdopen(fd, "wb") as fileobj:
+			write_management_pack(response, filters, fileobj)
+	except Exception:
+		os.remove(path)
+		raise
+
+	filename = get_export_filename(_("Management Pack"), filters, "xlsx")
+	return make_stream_response(iter_temp_file(path), filename, "xlsx")
+
+
+def iter_temp_file(path):
+	"""Yield a file in EXPORT_FILE_CHUNK_BYTES chunks and delete it once exhausted or closed"""
+	try:
+		with open(path, "rb") as fileobj:
+			while chunk := fileobj.read(EXPORT_FILE_CHUNK_BYTES):
+				yield chunk
+	finally:
+		os.remove(path)
+
+
+def render_pack_file(dashboard_rows, context, path):
+	"""Render one pack to `path`; runs in a worker process of generate_management_packs"""
+	with open(path, "wb") as fileobj:
+		render_management_pack(dashboard_rows, context, fileobj)
+	return path
+
+
+@observe_job("generate_management_packs")
+def generate_management_packs(filters, pack_job_id=None):
+	"""Background job: a management pack per cost center plus a consolidated one, zipped into a private File.
+
+	Dashboards are computed here inside shared_report_aggregation, so each GL
+	window and budget set is read once for all cost centers. Each finished
+	dashboard goes to a pool of forked worker processes that render the
+	workbook while the next dashboard is computed. Progress is published to
+	the requesting user as PACK_PROGRESS_EVENT.
+	"""
+	filters = dict(filters or {})
+	company = filters.get("company", "Western Serene Atlantic Hotel Ltd")
+	cost_centers = [
+		"",
+		*frappe.get_all(
+			"Cost Center",
+			filters={"company": company, "is_group": 0, "disabled": 0},
+			order_by="lft",
+			pluck="name",
+		),
+	]
+	total = len(cost_centers)
+	user = frappe.session.user
+
+	def progress(stage, done, after_commit=False, **extra):
+		frappe.publish_realtime(
+			PACK_PROGRESS_EVENT,
+			{"job_id": pack_job_id, "stage": stage, "done": done, "total": total, **extra},
+			user=user,
+			after_commit=after_commit,
+		)
+
+	workdir = tempfile.mkdtemp(prefix="management_packs_")
+	try:
+		workers = min(PACK_MAX_RENDER_WORKERS, os.cpu_count() or 1, total)
+		# Workers only render from plain data and never touch the inherited
+		# database or redis connections
+		with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+			renders = []
+			with shared_report_aggregation():
+				for done, cost_center in enumerate(cost_centers, 1):
+					pack_filters = {**filters, "company": company, "cost_center": cost_center}
+					response = build_dashboard_report(pack_filters)
+					renders.append(
+						pool.submit(
+							render_pack_file,
+							response.get("dashboard_data") or [],
+							get_pack_context(response, pack_filters),
+							os.path.join(
+								workdir, get_export_filename(_("Management Pack"), pack_filters, "xlsx")
+							),
+						)
+					)
+					progress("computing", done)
+			for done, future in enumerate(as_completed(renders), 1):
+				future.result()
+				progress("rendering", done)
+
+		zip_name = get_export_filename(
+			_("Management Packs"), {**filters, "company": company, "cost_center": None}, "zip"
+		)
+		zip_path = os.path.join(workdir, zip_name)
+		# Workbooks are already deflated; store them as they are
+		with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as archive:
+			for future in renders:
+				path = future.result()
+				archive.write(path, os.path.basename(path))
+
+		with open(zip_path, "rb") as fileobj:
+			file_doc = frappe.get_doc(
+				{"doctype": "File", "file_name": zip_name, "is_private": 1, "content": fileobj.read()}
+			).insert(ignore_permissions=True)
+
+		progress("done", total, after_commit=True, file_url=file_doc.file_url, file_name=file_doc.file_name)
+		return file_doc.name
+	except Exception as e:
+		frappe.log_error(f"Error generating management packs: {e!s}")
+		progress("failed", 0, error=str(e))
+		raise
+	finally:
+		shutil.rmtree(workdir, ignore_errors=True)
+
+
+@frappe.whitelist()
+def enqueue_management_packs(filters=None):
+	"""Queue generate_management_packs; returns the job id carried by its progress events"""
+	if isinstance(filters, str):
+		filters = json.loads(filters)
+
+	pack_job_id = f"management_packs::{frappe.generate_hash(length=12)}"
+	frappe.enqueue(
+		"yearly_income_statement.exports.generate_management_packs",
+		queue="long",
+		timeout=PACK_JOB_TIMEOUT,
+		job_id=pack_job_id,
+		filters=filters or {},
+		pack_job_id=pack_job_id,
+	)
+	return {"job_id": pack_job_id, "event": PACK_PROGRESS_EVENT}
+
+
+def encode_rows(rows, fields, export_format):
+	"""Encode dict rows as CSV or NDJSON text, yielded in chunks of EXPORT_CHUNK_ROWS"""
+	buffer = io.StringIO()
+	writer = None
+	if export_format == "csv":
+		writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+		writer.writeheader()
+
+	pending = 0
+	for row in rows:
+		if writer:
+			writer.writerow(row)
+		else:
+			buffer.write(json.dumps({f: row.get(f) for f in fields}, default=json_handler))
+			buffer.write("\n")
+		pending += 1
+		if pending == EXPORT_CHUNK_ROWS:
+			yield buffer.getvalue()
+			buffer.seek(0)
+			buffer.truncate()
+			pending = 0
+	if buffer.tell():
+		yield buffer.getvalue()
+
+
+def stream_in_site(make_chunks):
+	"""Run `make_chunks` in its own site connection while the response is consumed.
+
+	Frappe closes the request's database connection before the WSGI server
+	iterates a response body, so the generator reconnects as the same user
+	and tears the connection down when it is exhausted or closed.
+	"""
+	site, sites_path, user = frappe.local.site, frappe.local.sites_path, frappe.session.user
+
+	def generate():
+		frappe.init(site=site, sites_path=sites_path)
+		try:
+			frappe.connect()
+			frappe.set_user(user)
+			yield from make_chunks()
+		finally:
+			frappe.destroy()
+
+	return generate()
+
+
+def make_stream_response(chunks, filename, export_format):
+	from werkzeug.wrappers import Response
+
+	response = Response(chunks, mimetype=EXPORT_MIMETYPES[export_format], direct_passthrough=True)
+	response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+	# Let nginx pass chunks through instead of spooling the whole body
+	response.headers["X-Accel-Buffering"] = "no"
+	return response
+
+
+def validate_export_format(export_format):
+	export_format = (export_format or "csv").lower()
+	if export_format not in EXPORT_FORMATS:
+		frappe.throw(_("format must be one of {0}").format(", ".join(EXPORT_FORMATS)))
+	return export_format
+
+
+@frappe.whitelist()
+def export_gl_entries(filters=None, format="csv"):
+	"""Stream GL entries with report_class and root_type as CSV or NDJSON.
+
+	Same rows as get_gl_entries_with_report_class_api, read through an
+	unbuffered cursor and encoded as they arrive, so memory stays flat
+	however long the extract is. The window is from_date/to_date, or a
+	fiscal_year (optionally narrowed to a month).
+	"""
+	if isinstance(filters, str):
+		filters = json.loads(filters)
+	filters = filters or {}
+	export_format = validate_export_format(format)
+
+	from_date, to_date = resolve_drilldown_window(filters)
+	query, params = get_gl_entries_query(
+		filters.get("company", "Western Serene Atlantic Hotel Ltd"),
+		from_date,
+		to_date,
+		{"cost_center": filters["cost_center"]} if filters.get("cost_center") else None,
+	)
+
+	def make_chunks():
+		with frappe.db.unbuffered_cursor():
+			rows = frappe.db.sql(query, params, as_dict=1, as_iterator=True)
+			yield from encode_rows(rows, GL_EXPORT_FIELDS, export_format)
+
+	filename = f"GL Entries {from_date} to {to_date}.{export_format}"
+	return make_stream_response(stream_in_site(make_chunks), filename, export_format)
+
+
+def flatten_dashboard_row(row):
+	"""One flat record per dashboard row: descriptive fields, period amounts, monthly values"""
+	flat = {
+		f: row.get(f)
+		for f in ("type", "category", "account", "root_type", "report_class", "section", "indent")
+	}
+	for period in PERIOD_KEYS:
+		values = row.get(period) or {}
+		for key in AMOUNT_KEYS:
+			flat[f"{period}_{key}"] = values.get(key)
+	monthly = row.get("monthly") or {}
+	for m in range(1, 13):
+		bucket = monthly.get(m) or monthly.get(str(m)) or {}
+		flat[f"month_{m}_actual"] = bucket.get("actual")
+		flat[f"month_{m}_budget"] = bucket.get("budget")
+	return flat
+
+
+@frappe.whitelist()
+def export_dashboard_rows(filters=None, format="csv"):
+	"""Stream the aggregated dashboard rows as CSV or NDJSON.
+
+	The report is computed up front (so errors surface before any bytes are
+	sent), then flattened and encoded row by row into the response.
+	"""
+	if isinstance(filters, str):
+		filters = json.loads(filters)
+	filters = filters or {}
+	export_format = validate_export_format(format)
+
+	rows = build_dashboard_report(filters).get("dashboard_data") or []
+
+	chunks = encode_rows((flatten_dashboard_row(row) for row in rows), DASHBOARD_EXPORT_FIELDS, export_format)
+	return make_stream_response(
+		chunks, get_export_filename(_("Dashboard"), filters, export_format), export_format
+	)
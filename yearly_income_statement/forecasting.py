@@ -0,0 +1,153 @@
+"""
+Array-backed forecasting engine.
+
+Budget and actual rows are keyed by (account, cost_center) tuples and loaded
+into one NumPy vector per series, so growth rates, forecasts and ratios are
+computed for every pair at once instead of per key in Python.
+"""
+
+import numpy as np
+
+
+def pair_key(item):
+	"""(account, cost_center) key of a budget or actual row"""
+	return (item.get("account"), item.get("cost_center") or "")
+
+
+def build_pair_matrix(sources, key_series=None):
+	"""
+	Load row sources into aligned per-series vectors.
+
+	`sources` is a list of (series_name, rows, amount_field). The pair universe
+	is every key seen in the `key_series` sources (all sources when None); rows
+	of other series whose pair is outside it are ignored. Amounts of repeated
+	pairs are summed.
+
+	Returns (pairs, {series_name: np.ndarray}) with vectors aligned to `pairs`.
+	"""
+	pairs = []
+	index = {}
+	for name, rows, _field in sources:
+		if key_series is not None and name not in key_series:
+			continue
+		for row in rows or []:
+			key = pair_key(row)
+			if key not in index:
+				index[key] = len(pairs)
+				pairs.append(key)
+
+	values = {}
+	for name, rows, field in sources:
+		positions = []
+		amounts = []
+		for row in rows or []:
+			position = index.get(pair_key(row))
+			if position is not None:
+				positions.append(position)
+				amounts.append(float(row.get(field) or 0))
+		column = np.zeros(len(pairs))
+		if positions:
+			np.add.at(column, np.asarray(positions, dtype=np.intp), np.asarray(amounts))
+		values[name] = column
+	return pairs, values
+
+
+def safe_divide(numerator, denominator, scale=1.0):
+	"""Element-wise numerator / denominator * scale, 0 where the denominator is 0"""
+	out = np.zeros(np.broadcast(numerator, denominator).shape)
+	np.divide(numerator, denominator, out=out, where=denominator != 0)
+	return out * scale
+
+
+def trend_forecast(current_budget, current_actual, previous_actual):
+	"""
+	Simple trend forecast: growth = (current - previous) / previous actual, applied
+	to the current budget and actual. Pairs without a previous actual get 0 growth.
+
+	Returns (growth_rate, forecast_budget, forecast_actual) as arrays.
+	"""
+	growth_rate = safe_divide(current_actual - previous_actual, previous_actual)
+	return growth_rate, current_budget * (1 + growth_rate), current_actual * (1 + growth_rate)
+
+
+def seasonal_run_rate_path(current, prior, elapsed):
+	"""
+	Project each remaining month from prior-year seasonality and the current run rate.
+
+	`current` and `prior` are (accounts x 12) matrices of monthly amounts in fiscal
+	order; the first `elapsed` months of `current` are actuals. Each account's
+	remaining prior-year months are scaled by its run rate (current YTD / prior
+	same-months). Where the prior year has nothing to compare against, the current
+	average monthly amount is carried forward instead; with no elapsed months the
+	prior year is repeated.
+
+	Returns an (accounts x remaining months) matrix.
+	"""
+	remaining = prior[:, elapsed:]
+	if elapsed == 0:
+		return remaining.copy()
+	ytd = current[:, :elapsed].sum(axis=1)
+	prior_ytd = prior[:, :elapsed].sum(axis=1)
+
+	run_rate = safe_divide(ytd, prior_ytd)
+	seasonal = run_rate[:, None] * remaining
+	flat = np.repeat((ytd / elapsed)[:, None], remaining.shape[1], axis=1)
+	return np.where((prior_ytd != 0)[:, None], seasonal, flat)
+
+
+def seasonal_run_rate_forecast(current, prior, elapsed):
+	"""Projected amount for the remaining months per account (see seasonal_run_rate_path)"""
+	return seasonal_run_rate_path(current, prior, elapsed).sum(axis=1)
+
+
+def holt_winters_forecast(history, horizon, season_length=12, alpha=0.3, beta=0.1, gamma=0.2):
+	"""
+	Additive Holt-Winters forecast for many series at once.
+
+	`history` is an (accounts x periods) matrix; each time step updates level,
+	trend and seasonal state for every account in one array operation. State is
+	initialised from the first season (trend from the first two seasons when
+	available). Returns an (accounts x horizon) matrix of forecasts.
+	"""
+	history = np.asarray(history, dtype=float)
+	n_series, n_periods = history.shape
+	if n_periods < season_length:
+		raise ValueError("Holt-Winters needs at least one full season of history")
+
+	first = history[:, :season_length]
+	level = first.mean(axis=1)
+	if n_periods >= 2 * season_length:
+		trend = (history[:, season_length : 2 * season_length].mean(axis=1) - level) / season_length
+	else:
+		trend = np.zeros(n_series)
+	seasonals = first - level[:, None]
+
+	for t in range(season_length, n_periods):
+		s = t % season_length
+		value = history[:, t]
+		previous_level = level
+		level = alpha * (value - seasonals[:, s]) + (1 - alpha) * (level + trend)
+		trend = beta * (level - previous_level) + (1 - beta) * trend
+		seasonals[:, s] = gamma * (value - level) + (1 - gamma) * seasonals[:, s]
+
+	steps = np.arange(1, horizon + 1)
+	season_index = (n_periods + steps - 1) % season_length
+	return level[:, None] + trend[:, None] * steps[None, :] + seasonals[:, season_index]
+
+
+def monte_carlo_year_end(ytd, expected_remaining, deviations, paths, rng):
+	"""
+	Simulate year-end totals by resampling historical monthly deviations.
+
+	`ytd` is (groups,), `expected_remaining` (groups x remaining months) and
+	`deviations` (groups x history months) holds each group's centred historical
+	deviations. Every path draws one historical month per remaining month, shared
+	by all groups so their co-movement is preserved, and adds that month's
+	deviation to the expectation. Returns a (groups x paths) matrix.
+	"""
+	remaining = expected_remaining.shape[1]
+	base = ytd + expected_remaining.sum(axis=1)
+	if remaining == 0 or deviations.shape[1] == 0:
+		return np.repeat(base[:, None], paths, axis=1)
+	draws = rng.integers(0, deviations.shape[1], size=(paths, remaining))
+	return base[:, None] + deviations[:, draws].sum(axis=2)
@@ -137,17 +137,25 @@ app_license = "mit"
 # ---------------
 # Hook on document methods and events
 
-# doc_events = {
-# 	"*": {
-# 		"on_update": "method",
-# 		"on_cancel": "method",
-# 		"on_trash": "method"
-# 	}
-# }
+doc_events = {
+	"GL Entry": {
+		"on_submit": "yearly_income_statement.live_updates.queue_gl_delta",
+		"on_cancel": "yearly_income_statement.live_updates.queue_gl_delta"
+	}
+}
 
 # Scheduled Tasks
 # ---------------
 
+scheduler_events = {
+	"all": [
+		"yearly_income_statement.metrics.write_metrics_textfile"
+	],
+	"daily_long": [
+		"yearly_income_statement.tasks.warm_saved_dashboard_views"
+	]
+}
+
 # scheduler_events = {
 # 	"all": [
 # 		"yearly_income_statement.tasks.all"
@@ -196,12 +204,15 @@ app_license = "mit"
 
 # Request Events
 # ----------------
-# before_request = ["yearly_income_statement.utils.before_request"]
-# after_request = ["yearly_income_statement.utils.after_request"]
+before_request = [
+	"yearly_income_statement.metrics.start_request_timer",
+	"yearly_income_statement.slow_queries.install_for_request"
+]
+after_request = ["yearly_income_statement.metrics.observe_request"]
 
 # Job Events
 # ----------
-# before_job = ["yearly_income_statement.utils.before_job"]
+before_job = ["yearly_income_statement.slow_queries.install_for_job"]
 # after_job = ["yearly_income_statement.utils.after_job"]
 
 # User Data Protection
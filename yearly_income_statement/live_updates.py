@@ -0,0 +1,94 @@
+import frappe
+from frappe.utils import flt, getdate, today
+
+from yearly_income_statement.tasks import enqueue_saved_view_warming
+
+GL_DELTA_EVENT = "gl_delta"
+
+
+def queue_gl_delta(doc, method=None):
+	"""doc_events hook for GL Entry: collect the entry's effect on dashboard actuals.
+
+	A voucher posts many GL entries in one transaction, so deltas are summed
+	per (company, fiscal year, account, cost center, month) and published once
+	after commit; nothing is sent if the transaction rolls back. Cancelling a
+	voucher submits reversal entries with debit and credit swapped, which
+	yields the negative delta on their own; a GL Entry cancelled directly is
+	negated here.
+	"""
+	pending = frappe.flags.pending_gl_deltas
+	if pending is None:
+		pending = frappe.flags.pending_gl_deltas = {}
+		frappe.db.after_commit.add(publish_gl_deltas)
+		frappe.db.after_rollback.add(discard_gl_deltas)
+
+	posting_date = getdate(doc.posting_date)
+	key = (
+		doc.company,
+		doc.fiscal_year,
+		doc.account,
+		doc.cost_center or "",
+		posting_date.month,
+		posting_date <= getdate(today()),
+	)
+	amount = flt(doc.debit) - flt(doc.credit)
+	if method == "on_cancel":
+		amount = -amount
+	pending[key] = pending.get(key, 0) + amount
+
+
+def discard_gl_deltas():
+	frappe.flags.pending_gl_deltas = None
+
+
+def publish_gl_deltas():
+	"""Publish the committed deltas to everyone following the company.
+
+	One message per (company, fiscal year):
+	{company, fiscal_year, deltas: [[account, cost_center, month, amount, in_ytd]]}.
+	Only Income and Expense accounts are sent, with amounts signed the way the
+	dashboard shows them (credits up for Income, debits up for Expense).
+	Clients join the room with doc_subscribe('Company', company). The companies'
+	saved dashboard views are queued for re-warming.
+	"""
+	pending = frappe.flags.pending_gl_deltas or {}
+	frappe.flags.pending_gl_deltas = None
+	if not pending:
+		return
+
+	root_types = dict(
+		frappe.get_all(
+			"Account",
+			filters={
+				"name": ["in", list({key[2] for key in pending})],
+				"root_type": ["in", ["Income", "Expense"]],
+			},
+			fields=["name", "root_type"],
+			as_list=True,
+		)
+	)
+
+	by_view = {}
+	for (company, fiscal_year, account, cost_center, month, in_ytd), amount in pending.items():
+		root_type = root_types.get(account)
+		amount = flt(amount, 2)
+		if not root_type or not amount:
+			continue
+		if root_type == "Income":
+			amount = -amount
+		by_view.setdefault((company, fiscal_year), []).append(
+			[account, cost_center, month, amount, int(in_ytd)]
+		)
+
+	for (company, fiscal_year), deltas in by_view.items():
+		frappe.publish_realtime(
+			GL_DELTA_EVENT,
+			{"company": company, "fiscal_year": fiscal_year, "deltas": deltas},
+			doctype="Company",
+			docname=company,
+		)
+
+	# Pre-warmed saved views of these companies now have a stale data version
+	for company in {company for company, _fiscal_year in by_view}:
+		if frappe.db.exists("Saved Dashboard View", {"company": company, "prewarm": 1}):
+			enqueue_saved_view_warming(company=company)
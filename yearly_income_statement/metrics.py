@@ -0,0 +1,192 @@
+import contextlib
+import json
+import os
+import re
+import time
+
+import frappe
+
+# Samples live in one Redis hash per site, so every web worker and background
+# job adds to the same counters; get_metrics renders them in the Prometheus
+# text format and write_metrics_textfile drops them for the textfile collector.
+METRICS_CACHE_KEY = "yearly_income_statement:metrics"
+METRICS_TEXTFILE_CONF = "yearly_income_statement_metrics_textfile"
+METRICS_PREFIX = "yearly_income_statement_"
+
+APP_METHOD_PATH = re.compile(r"^/api/(?:v\d+/)?method/yearly_income_statement\.(?:[\w.]+\.)?(\w+)$")
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PAYLOAD_BUCKETS = (1_000, 10_000, 100_000, 500_000, 1_000_000, 5_000_000, 20_000_000)
+JOB_BUCKETS = (1, 5, 15, 60, 300, 900, 1800, 3600)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+	"request_duration_seconds": ("histogram", "Endpoint latency", LATENCY_BUCKETS),
+	"requests_total": ("counter", "Endpoint responses by HTTP status", None),
+	"response_bytes": ("histogram", "Endpoint payload size", PAYLOAD_BUCKETS),
+	"queries_total": ("counter", "SQL queries run by traced report computations", None),
+	"rows_fetched_total": ("counter", "Rows returned to traced report computations", None),
+	"gl_rows_scanned_total": ("counter", "GL Entry rows fetched by traced report computations", None),
+	"cache_requests_total": ("counter", "Report cache lookups by result (hit, miss, stale)", None),
+	"single_flight_total": (
+		"counter",
+		"Coalesced computations by role (leader, follower, fallback with its reason)",
+		None,
+	),
+	"job_duration_seconds": ("histogram", "Background job duration by status", JOB_BUCKETS),
+}
+
+
+def increment(name, labels, value=1):
+	observe(name, labels, value)
+
+
+def observe(name, labels, value):
+	"""Add one observation; metrics must never break the request, so errors are swallowed"""
+	metric_type, _help, buckets = METRICS[name]
+	try:
+		cache = frappe.cache()
+		key = cache.make_key(METRICS_CACHE_KEY)
+		pipeline = cache.pipeline(transaction=False)
+		if metric_type == "histogram":
+			# Every bucket is touched so each series exists from its first observation
+			for le in buckets:
+				pipeline.hincrbyfloat(
+					key, sample_field(name + "_bucket", {**labels, "le": le}), 1 if value <= le else 0
+				)
+			pipeline.hincrbyfloat(key, sample_field(name + "_bucket", {**labels, "le": "+Inf"}), 1)
+			pipeline.hincrbyfloat(key, sample_field(name + "_sum", labels), value)
+			pipeline.hincrbyfloat(key, sample_field(name + "_count", labels), 1)
+		else:
+			pipeline.hincrbyfloat(key, sample_field(name, labels), value)
+		pipeline.execute()
+	except Exception:
+		pass
+
+
+def read_samples():
+	"""{field: value} of the metrics hash, read raw like observe writes it.
+
+	RedisWrapper.hgetall would prefix the key again and unpickle the values,
+	which HINCRBYFLOAT stores as plain numbers.
+	"""
+	cache = frappe.cache()
+	pipeline = cache.pipeline(transaction=False)
+	pipeline.hgetall(cache.make_key(METRICS_CACHE_KEY))
+	raw = pipeline.execute()[0] or {}
+	return {decode(field): decode(value) for field, value in raw.items()}
+
+
+def decode(value):
+	return value.decode() if isinstance(value, bytes) else value
+
+
+def sample_field(name, labels):
+	return json.dumps([name, sorted((k, str(v)) for k, v in labels.items())])
+
+
+def record_cache(cache_name, result):
+	increment("cache_requests_total", {"cache": cache_name, "result": result})
+
+
+@contextlib.contextmanager
+def observe_job(job):
+	"""Time a background job into job_duration_seconds{job, status}"""
+	started = time.perf_counter()
+	status = "failed"
+	try:
+		yield
+		status = "finished"
+	finally:
+		observe("job_duration_seconds", {"job": job, "status": status}, time.perf_counter() - started)
+
+
+def record_trace(summary):
+	"""Query and row counters from a tracing.trace_summary"""
+	labels = {"endpoint": summary["report"]}
+	increment("queries_total", labels, summary["queries"])
+	increment("rows_fetched_total", labels, summary["rows"])
+	increment(
+		"gl_rows_scanned_total",
+		labels,
+		sum(stage["rows"] for name, stage in summary["stages"].items() if name.startswith("gl:")),
+	)
+
+
+def start_request_timer():
+	"""before_request hook"""
+	frappe.local.metrics_request_started = time.perf_counter()
+
+
+def observe_request(response=None, request=None):
+	"""after_request hook: latency, status and payload size of this app's endpoints"""
+	started = getattr(frappe.local, "metrics_request_started", None)
+	match = APP_METHOD_PATH.match(getattr(request, "path", "") or "")
+	if started is None or not match or response is None:
+		return
+
+	labels = {"endpoint": match.group(1)}
+	observe("request_duration_seconds", labels, time.perf_counter() - started)
+	increment("requests_total", {**labels, "status": response.status_code})
+	# Streamed exports have no length up front and are not measured
+	if not response.is_streamed:
+		observe("response_bytes", labels, response.calculate_content_length() or 0)
+
+
+def render_metrics():
+	"""All samples of this site in the Prometheus text exposition format"""
+	samples = {}
+	for field, value in read_samples().items():
+		sample_name, labels = json.loads(field)
+		samples.setdefault(sample_name, []).append((labels, float(value)))
+
+	site = getattr(frappe.local, "site", "") or ""
+	lines = []
+	for name, (metric_type, help_text, _buckets) in METRICS.items():
+		full_name = METRICS_PREFIX + name
+		lines.append(f"# HELP {full_name} {help_text}")
+		lines.append(f"# TYPE {full_name} {metric_type}")
+		suffixes = ("_bucket", "_sum", "_count") if metric_type == "histogram" else ("",)
+		for suffix in suffixes:
+			for labels, value in sorted(samples.get(name + suffix, []), key=sample_sort_key):
+				label_text = ",".join(f'{k}="{escape_label(v)}"' for k, v in [("site", site), *labels])
+				lines.append(f"{full_name}{suffix}{{{label_text}}} {value:g}")
+	return "\n".join(lines) + "\n"
+
+
+def sample_sort_key(sample):
+	labels, _value = sample
+	return [(k, v) for k, v in labels if k != "le"], bucket_bound(dict(labels).get("le"))
+
+
+def bucket_bound(le):
+	return float("inf") if le in (None, "+Inf") else float(le)
+
+
+def escape_label(value):
+	return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@frappe.whitelist()
+def get_metrics():
+	"""Prometheus scrape endpoint (System Manager; authenticate with an API key/secret token)"""
+	from werkzeug.wrappers import Response
+
+	frappe.only_for("System Manager")
+	return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def write_metrics_textfile():
+	"""Scheduled: write the metrics to the node_exporter textfile named in site config.
+
+	Set `yearly_income_statement_metrics_textfile` to a *.prom path in the
+	collector directory, one per site. The file is replaced atomically so the
+	collector never reads a partial write.
+	"""
+	path = frappe.conf.get(METRICS_TEXTFILE_CONF)
+	if not path:
+		return
+	tmp_path = f"{path}.{os.getpid()}.tmp"
+	with open(tmp_path, "w") as f:
+		f.write(render_metrics())
+	os.replace(tmp_path, path)
@@ -0,0 +1,6 @@
+import frappe
+
+
+def execute():
+	"""Index GL Entry for keyset-paginated drill-down into group accounts (company, posting_date, name)."""
+	frappe.db.add_index("GL Entry", ["company", "posting_date", "name"], "company_posting_date_name_index")
@@ -0,0 +1,6 @@
+import frappe
+
+
+def execute():
+	"""Index GL Entry for keyset-paginated drill-down (account, posting_date, name)."""
+	frappe.db.add_index("GL Entry", ["account", "posting_date", "name"], "account_posting_date_name_index")
@@ -0,0 +1,105 @@
+import cProfile
+import functools
+import io
+import marshal
+import pstats
+import time
+import tracemalloc
+
+import frappe
+from frappe.utils import cint, now_datetime
+
+PROFILE_FLAG = "_profile"
+PROFILE_ROLE = "System Manager"
+PROFILE_TOP_ALLOCATIONS = 30
+PROFILE_TOP_FUNCTIONS = 40
+PROFILE_TRACEMALLOC_FRAMES = 10
+
+
+def profiled_report(fn):
+	"""Let System Managers run a report endpoint under cProfile and tracemalloc.
+
+	Triggered by the `_profile=1` request parameter (read from form_dict, since
+	frappe.call drops arguments the endpoint does not declare). The run always
+	computes: no 304, no warm cache and no single-flight wait. The raw pstats
+	dump and a text summary of the top functions and allocations are saved as
+	private Files, and the result links them under `_profile`.
+	"""
+
+	@functools.wraps(fn)
+	def wrapper(*args, **kwargs):
+		if frappe.flags.profiling_report or not cint((frappe.local.form_dict or {}).get(PROFILE_FLAG)):
+			return fn(*args, **kwargs)
+
+		frappe.only_for(PROFILE_ROLE)
+		result, profile = run_profiled(fn, args, kwargs)
+
+		if isinstance(result, dict):
+			return {**result, "_profile": profile}
+		frappe.local.response["_profile"] = profile
+		return result
+
+	return wrapper
+
+
+def run_profiled(fn, args, kwargs):
+	"""fn(*args, **kwargs) under cProfile and tracemalloc; returns (result, profile links)"""
+	was_tracing = tracemalloc.is_tracing()
+	if not was_tracing:
+		tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+	tracemalloc.reset_peak()
+	profiler = cProfile.Profile()
+	previous_conditional = frappe.flags.in_conditional_report
+	frappe.flags.profiling_report = True
+	frappe.flags.in_conditional_report = True
+	started = time.perf_counter()
+	try:
+		result = profiler.runcall(fn, *args, **kwargs)
+	finally:
+		wall = time.perf_counter() - started
+		snapshot = tracemalloc.take_snapshot()
+		peak = tracemalloc.get_traced_memory()[1]
+		if not was_tracing:
+			tracemalloc.stop()
+		frappe.flags.profiling_report = False
+		frappe.flags.in_conditional_report = previous_conditional
+
+	name = f"{fn.__name__}-{now_datetime().strftime('%Y%m%d-%H%M%S')}"
+	stats = pstats.Stats(profiler)
+	profile = {
+		"wall_ms": round(wall * 1000, 1),
+		"peak_memory_kb": round(peak / 1024, 1),
+		"pstats": save_private_file(f"{name}.pstats", dump_pstats(stats)),
+		"summary": save_private_file(
+			f"{name}-summary.txt", format_profile_summary(fn.__name__, wall, peak, stats, snapshot)
+		),
+	}
+	return result, profile
+
+
+def dump_pstats(stats):
+	"""Same bytes as Stats.dump_stats writes (load with pstats.Stats or snakeviz)"""
+	return marshal.dumps(stats.stats)
+
+
+def format_profile_summary(endpoint, wall, peak, stats, snapshot):
+	out = io.StringIO()
+	out.write(f"{endpoint}: {wall * 1000:.1f} ms wall, {peak / 1024:.1f} KiB peak traced memory\n")
+	filters = (frappe.local.form_dict or {}).get("filters")
+	out.write(f"filters: {filters if isinstance(filters, str) else frappe.as_json(filters)}\n\n")
+
+	out.write(f"Top {PROFILE_TOP_ALLOCATIONS} allocations by line (live at the end of the run)\n")
+	for stat in snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+		out.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {stat.traceback[0]}\n")
+
+	out.write(f"\nTop {PROFILE_TOP_FUNCTIONS} functions by cumulative time\n")
+	stats.stream = out
+	stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+	return out.getvalue()
+
+
+def save_private_file(file_name, content):
+	file_doc = frappe.get_doc(
+		{"doctype": "File", "file_name": file_name, "is_private": 1, "content": content}
+	).insert(ignore_permissions=True)
+	return file_doc.file_url
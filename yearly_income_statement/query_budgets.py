@@ -0,0 +1,113 @@
+import frappe
+from frappe import _
+
+from yearly_income_statement.benchmark import (
+	BENCHMARK_SKIP,
+	benchmark_endpoint,
+	generate_hotel_dataset,
+	get_benchmark_context,
+	get_benchmark_endpoints,
+	get_benchmark_kwargs,
+)
+
+# Two fixture companies with the same GL volume and seed but charts of
+# different sizes: a call whose query count differs between them runs a
+# query per account (or per cost center, report class...) somewhere.
+BUDGET_FIXTURES = (
+	("Query Budget Hotel S", 1),
+	("Query Budget Hotel L", 4),
+)
+BUDGET_FIXTURE_GL_ENTRIES = 20_000
+BUDGET_FIXTURE_SEED = 7
+
+# Endpoint -> budget for one cold call (app caches cleared), checked at both
+# chart sizes. `queries` caps the SQL statements, `cold_ms` the wall time.
+# Endpoints not listed here are still held to the chart-size checks below.
+QUERY_BUDGETS = {
+	"api.get_dashboard_data": {"queries": 19, "cold_ms": 5000},
+	"api.get_dashboard_tree_view": {"queries": 23, "cold_ms": 5000},
+	"api.get_direct_revenue_data": {"queries": 21, "cold_ms": 5000},
+	"api.get_cost_of_sales_data": {"queries": 21, "cold_ms": 5000},
+	"api.get_indirect_expenses_data": {"queries": 29, "cold_ms": 5000},
+	"api.get_summary_data": {"queries": 19, "cold_ms": 5000},
+	"api.get_variance_ranking": {"queries": 19, "cold_ms": 5000},
+	"advanced_api.get_comprehensive_dashboard_data": {"queries": 19, "cold_ms": 5000},
+}
+# Rows fetched may grow with the chart (one aggregate per account), but no
+# faster than the chart itself
+ROWS_GROWTH_TOLERANCE = 1.25
+
+
+def ensure_budget_fixtures(progress=None):
+	"""Generate the BUDGET_FIXTURES companies unless they already hold GL entries"""
+	for company, accounts_multiplier in BUDGET_FIXTURES:
+		if frappe.db.exists("Company", company) and frappe.db.exists("GL Entry", {"company": company}):
+			continue
+		generate_hotel_dataset(
+			company,
+			gl_entries=BUDGET_FIXTURE_GL_ENTRIES,
+			accounts_multiplier=accounts_multiplier,
+			seed=BUDGET_FIXTURE_SEED,
+			progress=progress,
+		)
+	return [company for company, _multiplier in BUDGET_FIXTURES]
+
+
+def check_query_budgets(small_company, large_company, endpoints=None, repeat=1, progress=None):
+	"""Run every report endpoint at two chart sizes and check it against its budget.
+
+	Returns {'results': {endpoint: {small, large, budget}}, 'failures': [...]};
+	an endpoint fails when it errors, exceeds its QUERY_BUDGETS entry at either
+	size, runs more queries on the larger chart, or fetches rows faster than
+	the chart grows.
+	"""
+	progress = progress or (lambda message: None)
+	small = get_benchmark_context(small_company)
+	large = get_benchmark_context(large_company)
+	if large["accounts"] <= small["accounts"]:
+		frappe.throw(
+			_("{0} must have a larger chart of accounts than {1}").format(large_company, small_company)
+		)
+	accounts_ratio = large["accounts"] / small["accounts"]
+
+	results = {}
+	failures = []
+	for endpoint, fn in get_benchmark_endpoints():
+		name = endpoint.rsplit(".", 1)[-1]
+		if name in BENCHMARK_SKIP or (endpoints and name not in endpoints):
+			continue
+		budget = QUERY_BUDGETS.get(endpoint, {})
+		measured = {
+			"small": benchmark_endpoint(endpoint, fn, get_benchmark_kwargs(endpoint, fn, small), repeat),
+			"large": benchmark_endpoint(endpoint, fn, get_benchmark_kwargs(endpoint, fn, large), repeat),
+		}
+		results[endpoint] = {**measured, "budget": budget}
+		problems = get_budget_problems(measured, budget, accounts_ratio)
+		failures.extend(f"{endpoint}: {problem}" for problem in problems)
+		progress(
+			f"{'FAIL' if problems else 'ok  '} {endpoint:<50} queries {measured['small']['queries']} -> {measured['large']['queries']}"
+			f" (budget {budget.get('queries', '-')}), rows {measured['small']['rows']} -> {measured['large']['rows']}"
+		)
+	return {"results": results, "failures": failures}
+
+
+def get_budget_problems(measured, budget, accounts_ratio):
+	problems = []
+	for size, timing in measured.items():
+		if timing["error"]:
+			problems.append(f"failed on the {size} chart: {timing['error']}")
+		if budget.get("queries") is not None and timing["queries"] > budget["queries"]:
+			problems.append(f"{timing['queries']} queries on the {size} chart, budget {budget['queries']}")
+		if budget.get("cold_ms") is not None and timing["cold_ms"] > budget["cold_ms"]:
+			problems.append(f"{timing['cold_ms']} ms on the {size} chart, budget {budget['cold_ms']} ms")
+
+	small, large = measured["small"], measured["large"]
+	if large["queries"] > small["queries"]:
+		problems.append(
+			f"query count grows with the chart: {small['queries']} -> {large['queries']} for {accounts_ratio:.1f}x the accounts"
+		)
+	if large["rows"] > max(small["rows"], 1) * accounts_ratio * ROWS_GROWTH_TOLERANCE:
+		problems.append(
+			f"rows fetched grow faster than the chart: {small['rows']} -> {large['rows']} for {accounts_ratio:.1f}x the accounts"
+		)
+	return problems
@@ -0,0 +1,98 @@
+import json
+import re
+import time
+
+import frappe
+from frappe.utils import cint, flt, now_datetime
+
+from yearly_income_statement.metrics import APP_METHOD_PATH
+
+# Thresholds are read from site config, so they can be changed during an incident
+SLOW_QUERY_MS_CONF = "yearly_income_statement_slow_query_ms"
+SLOW_QUERY_LOG_LIMIT_CONF = "yearly_income_statement_slow_query_log_limit"
+SLOW_QUERY_MS = 1000
+SLOW_QUERY_LOG_LIMIT = 500
+SLOW_QUERY_MAX_LENGTH = 20000
+
+EXPLAINABLE = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+APP_JOB_PREFIX = "yearly_income_statement."
+SAVE_JOB_METHOD = "yearly_income_statement.slow_queries.save_slow_query"
+
+
+def install_for_request():
+	"""before_request hook: log slow statements of this app's endpoints"""
+	request = getattr(frappe.local, "request", None)
+	if request is not None and APP_METHOD_PATH.match(request.path or ""):
+		install_slow_query_log(request.path)
+
+
+def install_for_job(method=None, kwargs=None, transaction_type=None):
+	"""before_job hook: log slow statements of this app's background jobs"""
+	method = str(method or "")
+	if method.startswith(APP_JOB_PREFIX) and method != SAVE_JOB_METHOD:
+		install_slow_query_log(method)
+
+
+def install_slow_query_log(source):
+	"""Wrap frappe.db.sql on this connection to capture statements slower than the threshold.
+
+	The connection is set up per request and per job, so the wrapper goes
+	away with it. A slow statement is recorded with its parameters, duration,
+	row count and, for reads, its EXPLAIN plan. Streamed (as_iterator) reads
+	are skipped: their cost is paid while iterating, and a second statement
+	cannot run on the connection until they are drained.
+	"""
+	db = frappe.local.db
+	if db is None or vars(db).get("slow_query_log_source"):
+		return
+
+	threshold = flt(frappe.conf.get(SLOW_QUERY_MS_CONF) or SLOW_QUERY_MS) / 1000
+	original_sql = db.sql
+
+	def logged_sql(query, values=(), *args, **kwargs):
+		started = time.perf_counter()
+		result = original_sql(query, values, *args, **kwargs)
+		duration = time.perf_counter() - started
+		if duration >= threshold and not kwargs.get("as_iterator"):
+			try:
+				log_slow_query(original_sql, source, query, values, duration, result)
+			except Exception:
+				pass
+		return result
+
+	db.sql = logged_sql
+	db.slow_query_log_source = source
+
+
+def log_slow_query(original_sql, source, query, values, duration, result):
+	explain = None
+	if EXPLAINABLE.match(query):
+		try:
+			explain = original_sql(f"EXPLAIN {query}", values, as_dict=1)
+		except Exception as e:
+			explain = {"error": str(e)}
+
+	entry = {
+		"source": source,
+		"duration_ms": round(duration * 1000, 1),
+		"rows": len(result) if isinstance(result, (list, tuple)) else 0,
+		"user": frappe.session.user if getattr(frappe.local, "session", None) else None,
+		"logged_on": now_datetime(),
+		"query": query[:SLOW_QUERY_MAX_LENGTH],
+		"parameters": json.dumps(values, default=str, indent=1),
+		"explain": json.dumps(explain, default=str, indent=1) if explain is not None else None,
+	}
+	# GET requests roll back, so the entry is written by a job of its own
+	frappe.enqueue(SAVE_JOB_METHOD, queue="short", entry=entry)
+
+
+def save_slow_query(entry):
+	"""Insert one Slow Query Log, trimming the log to its newest SLOW_QUERY_LOG_LIMIT entries"""
+	frappe.get_doc({"doctype": "Slow Query Log", **entry}).insert(ignore_permissions=True)
+
+	limit = cint(frappe.conf.get(SLOW_QUERY_LOG_LIMIT_CONF) or SLOW_QUERY_LOG_LIMIT)
+	cutoff = frappe.get_all(
+		"Slow Query Log", order_by="creation desc", limit_start=limit, limit_page_length=1, pluck="creation"
+	)
+	if cutoff:
+		frappe.db.delete("Slow Query Log", {"creation": ["<=", cutoff[0]]})
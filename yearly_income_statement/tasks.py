@@ -0,0 +1,88 @@
+import frappe
+from frappe.utils import now_datetime
+
+from yearly_income_statement.api import (
+	data_version_scope,
+	get_dashboard_data,
+	get_scoped_data_version,
+	get_warm_dashboard_entry,
+	shared_report_aggregation,
+	store_warm_dashboard_data,
+)
+from yearly_income_statement.metrics import observe_job
+
+WARM_JOB_TIMEOUT = 1800
+WARM_MAX_PASSES = 3
+
+
+def enqueue_saved_view_warming(company=None, view=None):
+	"""Queue warm_saved_dashboard_views for one view, one company, or all views.
+
+	A job already queued or running for the same scope absorbs the request; the
+	running job re-checks its views before finishing, so nothing is missed.
+	"""
+	frappe.enqueue(
+		"yearly_income_statement.tasks.warm_saved_dashboard_views",
+		queue="long",
+		timeout=WARM_JOB_TIMEOUT,
+		job_id=f"warm_saved_dashboard_views::{view or company or 'all'}",
+		deduplicate=True,
+		company=company,
+		view=view,
+	)
+
+
+@observe_job("warm_saved_dashboard_views")
+def warm_saved_dashboard_views(company=None, view=None):
+	"""Recompute the saved dashboard views whose warm result is missing or out of date.
+
+	Runs nightly (the YTD window moves with the date) and after each committed
+	GL batch. Each pass runs in one shared_report_aggregation block, so a GL
+	window used by several views is read once.
+	Passes repeat until nothing is stale, which picks up postings committed
+	while the job was running.
+	"""
+	filters = {"prewarm": 1}
+	if company:
+		filters["company"] = company
+	if view:
+		filters["name"] = view
+	views = frappe.get_all("Saved Dashboard View", filters=filters, pluck="name")
+
+	for _pass in range(WARM_MAX_PASSES):
+		with shared_report_aggregation():
+			warmed = [name for name in views if warm_saved_view(name)]
+		if not warmed:
+			break
+		frappe.db.commit()
+
+
+def warm_saved_view(name):
+	"""Recompute one saved view if its stored result is stale; returns whether it did.
+
+	The version read here is reused by the computation (data_version_scope), and
+	each call reads a fresh one, so later passes see newly committed postings.
+	"""
+	with data_version_scope():
+		doc = frappe.get_doc("Saved Dashboard View", name)
+		filters = doc.get_dashboard_filters()
+		version = get_scoped_data_version(filters)
+		entry = get_warm_dashboard_entry(filters)
+		if entry and entry.get("version") == version:
+			return False
+
+		frappe.flags.warming_dashboard_views = True
+		try:
+			result = get_dashboard_data(filters)
+		except Exception:
+			frappe.log_error(title=f"Warming saved dashboard view {name} failed")
+			return False
+		finally:
+			frappe.flags.warming_dashboard_views = False
+
+		if not result.get("dashboard_data"):
+			return False
+
+		store_warm_dashboard_data(filters, version, result)
+		doc.db_set("last_warmed_on", now_datetime(), update_modified=False)
+		return True
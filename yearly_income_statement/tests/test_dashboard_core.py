@@ -0,0 +1,235 @@
+"""
+Site-free tests of dashboard_core. They need no bench:
+
+	python -m unittest yearly_income_statement.tests.test_dashboard_core
+"""
+
+import unittest
+from datetime import date
+
+from yearly_income_statement.dashboard_core import (
+	build_dashboard_rows,
+	build_summary_data,
+	calculate_account_financial_data,
+	filter_accounts_hierarchy,
+	get_report_windows,
+)
+
+
+def account(name, parent=None, root_type="Expense", report_class="", is_group=0):
+	return {
+		"name": name,
+		"account_name": name.split(" - ")[0],
+		"parent_account": parent,
+		"root_type": root_type,
+		"report_class": report_class,
+		"is_group": is_group,
+	}
+
+
+def gl(account_name, posting_date, debit=0, credit=0):
+	return {"account": account_name, "posting_date": posting_date, "debit": debit, "credit": credit}
+
+
+def get_income_accounts():
+	return [
+		account("Income - H", root_type="Income", is_group=1),
+		account("Rooms - H", "Income - H", "Income", "Room"),
+		account("Rental - H", "Income - H", "Income", "Rental"),
+		account("Orphan - H", "Missing - H", "Income", "Room"),
+	]
+
+
+def get_expense_accounts():
+	return [
+		account("Expenses - H", is_group=1),
+		account("Food Cost - H", "Expenses - H", report_class="Food"),
+		account("Office - H", "Expenses - H", report_class="Office Supplies"),
+		account("Wages - H", "Expenses - H", report_class="Wages"),
+	]
+
+
+def get_gl_entries():
+	"""A February 2025 dashboard: YTD runs to the end of March"""
+	full_year = [
+		gl("Rooms - H", "2025-01-10", credit=1000),
+		gl("Rooms - H", "2025-02-10", credit=500),
+		gl("Food Cost - H", "2025-01-15", debit=300),
+		gl("Office - H", "2025-03-01", debit=120),
+		gl("Wages - H", "2025-03-01", debit=900),
+	]
+	return {
+		"full_year": full_year,
+		"ytd": full_year,
+		"ytd_last_year": [gl("Rooms - H", "2024-01-10", credit=800)],
+		"current_month": [gl("Rooms - H", "2025-02-10", credit=500)],
+		"current_month_last_year": [gl("Rooms - H", "2024-02-10", credit=400)],
+	}
+
+
+class TestDashboardRows(unittest.TestCase):
+	def setUp(self):
+		self.rows = build_dashboard_rows(
+			get_income_accounts(),
+			get_expense_accounts(),
+			get_gl_entries(),
+			inc_gross_map={},
+			report_class_direct_map={},
+			budget_map={"Rooms - H": 12000, "Food Cost - H": 2400},
+		)
+		self.by_account = {row["account"]: row for row in self.rows if row["type"] == "account"}
+
+	def test_section_order_and_hidden_sections(self):
+		headers = [row["category"] for row in self.rows if row["type"] == "header"]
+		self.assertEqual(
+			headers, ["Direct Revenue", "Cost of Sales", "Indirect Revenue", "Indirect Expenses"]
+		)
+		# Salaries & Wages is not a dashboard section; orphans are dropped by the hierarchy
+		self.assertNotIn("Wages - H", self.by_account)
+		self.assertNotIn("Orphan - H", self.by_account)
+
+	def test_account_row(self):
+		row = self.by_account["Rooms - H"]
+		self.assertEqual(row["section"], "Direct Revenue")
+		self.assertTrue(row["is_direct"])
+		self.assertEqual(row["indent"], 3)
+		self.assertEqual(row["currentMonth"]["actual"], 500)
+		self.assertEqual(row["currentMonth"]["lastYear"], 400)
+		self.assertEqual(row["currentMonth"]["budget"], 1000)
+		self.assertEqual(row["currentMonth"]["actVsLastYear"], 125.0)
+		# Two months with YTD postings: YTD budget is 2/12 of the annual budget
+		self.assertEqual(row["yearToDate"]["actual"], 1500)
+		self.assertEqual(row["yearToDate"]["budget"], 2000)
+		self.assertEqual(row["yearToDate"]["lastYear"], 800)
+		self.assertEqual(row["forecast"]["actual"], 1500 + 10000)
+		self.assertEqual(row["forecast"]["budget"], 12000)
+		self.assertEqual(row["monthly"][1], {"actual": 1000.0, "budget": 1000.0})
+		self.assertEqual(row["monthly"][2], {"actual": 500.0, "budget": 1000.0})
+		self.assertEqual(row["monthly"][3], {"actual": 0.0, "budget": 1000.0})
+
+	def test_account_without_budget(self):
+		row = self.by_account["Office - H"]
+		self.assertEqual(row["section"], "Indirect Expenses")
+		self.assertEqual(row["yearToDate"]["actual"], 120)
+		self.assertEqual(row["yearToDate"]["budget"], 0)
+		self.assertEqual(row["yearToDate"]["actBudThisYear"], "N/A")
+
+	def test_section_totals_sum_their_account_rows(self):
+		section_rows = {}
+		for row in self.rows:
+			if row["type"] == "account":
+				section_rows.setdefault(row["section"], []).append(row)
+			elif row["type"] == "total":
+				accounts = section_rows[row["section"]]
+				for period in ("currentMonth", "yearToDate", "forecast"):
+					for field in ("lastYear", "budget", "actual"):
+						self.assertAlmostEqual(row[period][field], sum(a[period][field] for a in accounts))
+
+		cost_of_sales_total = next(
+			row for row in self.rows if row["type"] == "total" and row["section"] == "Cost of Sales"
+		)
+		self.assertEqual(cost_of_sales_total["category"], "TOTAL COST OF SALES")
+		self.assertEqual(cost_of_sales_total["yearToDate"]["actual"], 300)
+		self.assertEqual(cost_of_sales_total["yearToDate"]["budget"], 200)
+		self.assertEqual(cost_of_sales_total["yearToDate"]["actBudThisYear"], 150.0)
+
+	def test_summary_is_year_to_date(self):
+		# Wages - H is in a hidden section, so it is not in the rows or the summary
+		self.assertEqual(
+			build_summary_data(self.rows), {"total_income": 1500, "total_expenses": 420, "net_profit": 1080}
+		)
+
+	def test_missing_periods_are_empty(self):
+		gl_entries = get_gl_entries()
+		del gl_entries["current_month"], gl_entries["current_month_last_year"]
+		rows = build_dashboard_rows(get_income_accounts(), get_expense_accounts(), gl_entries, {}, {}, {})
+		row = next(row for row in rows if row.get("account") == "Rooms - H")
+		self.assertEqual(row["currentMonth"]["actual"], 0)
+		self.assertEqual(row["yearToDate"]["actual"], 1500)
+
+
+class TestHierarchy(unittest.TestCase):
+	def test_indent_and_orphans(self):
+		accounts = [*get_income_accounts(), account("Suites - H", "Rooms - H", "Income", "Room")]
+		filtered, accounts_by_name, parent_children_map = filter_accounts_hierarchy(accounts)
+		self.assertEqual(
+			[(d["name"], d["indent"]) for d in filtered],
+			[("Income - H", 0), ("Rooms - H", 1), ("Rental - H", 1), ("Suites - H", 2)],
+		)
+		self.assertIn("Orphan - H", accounts_by_name)
+		self.assertEqual([d["name"] for d in parent_children_map["Rooms - H"]], ["Suites - H"])
+
+
+class TestReportWindows(unittest.TestCase):
+	def get_windows(self, month=None):
+		return get_report_windows(
+			"2025", "2025-01-01", "2025-12-31", "2024-01-01", "2024-12-31", date(2025, 3, 31), month=month
+		)
+
+	def test_without_month(self):
+		windows = self.get_windows()
+		self.assertEqual(windows["ytd"], (date(2025, 1, 1), date(2025, 3, 31)))
+		self.assertEqual(windows["ytd_last_year"], (date(2024, 1, 1), date(2024, 12, 31)))
+		self.assertIsNone(windows["current_month"])
+		self.assertIsNone(windows["current_month_last_year"])
+
+	def test_with_month(self):
+		windows = self.get_windows(month="2")
+		self.assertEqual(windows["current_month"], (date(2025, 2, 1), date(2025, 2, 28)))
+		self.assertEqual(windows["current_month_last_year"], (date(2024, 2, 1), date(2024, 2, 28)))
+		self.assertEqual(windows["ytd_last_year"], (date(2024, 1, 1), date(2024, 3, 31)))
+
+	def test_ytd_end_is_clamped_to_the_year(self):
+		windows = get_report_windows(
+			"2024", "2024-01-01", "2024-12-31", "2023-01-01", "2023-12-31", date(2025, 3, 31)
+		)
+		self.assertEqual(windows["ytd_end"], date(2024, 12, 31))
+
+
+class TestAccountFinancialData(unittest.TestCase):
+	def setUp(self):
+		year = {"Office - H": {"net_amount": 400}}
+		last_year = {"Office - H": {"net_amount": 500}}
+		self.aggregates = {
+			"previous_year": last_year,
+			"ytd": year,
+			"ytd_last_year": last_year,
+			"current_month": year,
+			"current_month_last_year": last_year,
+		}
+
+	def test_budget_prorated_by_days(self):
+		data = calculate_account_financial_data(
+			account("Office - H"), self.aggregates, 1200, "2025-01-01", "2025-12-31", "2025-07-02"
+		)
+		# 182 of 364 days elapsed
+		self.assertEqual(data["yearToDate"]["budget"], 600)
+		self.assertEqual(data["forecast"]["actual"], 400 + 600)
+		self.assertEqual(data["forecast"]["lastYear"], 500)
+		self.assertEqual(data["currentMonth"]["budget"], 0)
+		self.assertEqual(data["currentMonth"]["actual"], 0)
+
+	def test_current_month(self):
+		data = calculate_account_financial_data(
+			account("Office - H"),
+			self.aggregates,
+			1200,
+			"2025-01-01",
+			"2025-12-31",
+			"2025-07-02",
+			with_current_month=True,
+		)
+		self.assertEqual(data["currentMonth"]["budget"], 100)
+		self.assertEqual(data["currentMonth"]["actual"], 400)
+		self.assertEqual(data["currentMonth"]["actVsLastYear"], 80.0)
+
+	def test_account_without_postings(self):
+		data = calculate_account_financial_data(
+			account("Rent - H"), self.aggregates, 0, "2025-01-01", "2025-12-31", "2025-12-31"
+		)
+		self.assertEqual(data["yearToDate"]["actual"], 0)
+		self.assertEqual(data["forecast"]["actBudThisYear"], "N/A")
+
+
+if __name__ == "__main__":
+	unittest.main()
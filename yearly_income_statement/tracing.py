@@ -0,0 +1,124 @@
+import contextlib
+import json
+import time
+
+import frappe
+
+from yearly_income_statement.metrics import record_trace
+
+TRACE_LOGGER = "yearly_income_statement.timings"
+TRACE_CONTEXT_KEYS = (
+	"company",
+	"fiscal_year",
+	"month",
+	"cost_center",
+	"reporting_framework",
+	"forecast_mode",
+)
+UNSTAGED = "unstaged"
+
+
+def new_stage_stats():
+	return {"wall": 0.0, "db": 0.0, "queries": 0, "rows": 0}
+
+
+@contextlib.contextmanager
+def report_trace(report, filters=None):
+	"""Time a report computation stage by stage while the block runs.
+
+	Inside the block frappe.db.sql is wrapped so each query's time and row
+	count are charged to the current stage (see trace_stage). When the block
+	ends, the summary is written as one JSON line to the
+	yearly_income_statement.timings log and added to the query and row
+	metrics. A trace started inside another one joins it. Yields the trace
+	for trace_summary.
+	"""
+	trace = frappe.flags.report_trace
+	if trace is not None:
+		yield trace
+		return
+
+	now = time.perf_counter()
+	trace = frappe.flags.report_trace = {
+		"report": report,
+		"context": {
+			k: v for k, v in (filters or {}).items() if k in TRACE_CONTEXT_KEYS and v not in (None, "")
+		},
+		"started": now,
+		"stage": UNSTAGED,
+		"stage_started": now,
+		"stages": {UNSTAGED: new_stage_stats()},
+	}
+
+	db = frappe.local.db
+	patched_sql = vars(db).get("sql")
+	original_sql = db.sql
+
+	def traced_sql(*args, **kwargs):
+		started = time.perf_counter()
+		result = original_sql(*args, **kwargs)
+		stats = trace["stages"][trace["stage"]]
+		stats["db"] += time.perf_counter() - started
+		stats["queries"] += 1
+		if isinstance(result, (list, tuple)):
+			stats["rows"] += len(result)
+		return result
+
+	db.sql = traced_sql
+	try:
+		yield trace
+	finally:
+		if patched_sql is None:
+			del db.sql
+		else:
+			db.sql = patched_sql
+		frappe.flags.report_trace = None
+		summary = trace_summary(trace)
+		record_trace(summary)
+		try:
+			frappe.logger(TRACE_LOGGER, allow_site=True).info(json.dumps(summary, default=str))
+		except Exception:
+			pass
+
+
+def trace_stage(stage):
+	"""Charge what follows to `stage`, until the next trace_stage call or the end of the trace.
+
+	Repeated names accumulate. A no-op when no trace is active.
+	"""
+	trace = frappe.flags.report_trace
+	if trace is None:
+		return
+	flush_stage(trace)
+	trace["stage"] = stage
+	trace["stages"].setdefault(stage, new_stage_stats())
+
+
+def flush_stage(trace):
+	now = time.perf_counter()
+	trace["stages"][trace["stage"]]["wall"] += now - trace["stage_started"]
+	trace["stage_started"] = now
+
+
+def trace_summary(trace):
+	"""Totals and per-stage wall time, DB time (ms), query count and rows fetched so far"""
+	flush_stage(trace)
+	stages = {
+		name: {
+			"wall_ms": round(stats["wall"] * 1000, 1),
+			"db_ms": round(stats["db"] * 1000, 1),
+			"queries": stats["queries"],
+			"rows": stats["rows"],
+		}
+		for name, stats in trace["stages"].items()
+		if stats["queries"] or name != UNSTAGED
+	}
+	return {
+		"report": trace["report"],
+		**trace["context"],
+		"wall_ms": round((time.perf_counter() - trace["started"]) * 1000, 1),
+		"db_ms": round(sum(s["db_ms"] for s in stages.values()), 1),
+		"queries": sum(s["queries"] for s in stages.values()),
+		"rows": sum(s["rows"] for s in stages.values()),
+		"stages": stages,
+	}
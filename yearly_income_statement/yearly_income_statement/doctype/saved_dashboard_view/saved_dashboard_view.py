@@ -0,0 +1,33 @@
+# Copyright (c) 2026, carbonite and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+from yearly_income_statement.tasks import enqueue_saved_view_warming
+
+
+class SavedDashboardView(Document):
+	def validate(self):
+		if (
+			self.cost_center
+			and frappe.db.get_value("Cost Center", self.cost_center, "company") != self.company
+		):
+			frappe.throw(
+				_("Cost Center {0} does not belong to Company {1}").format(self.cost_center, self.company)
+			)
+
+	def on_update(self):
+		if self.prewarm:
+			enqueue_saved_view_warming(view=self.name)
+
+	def get_dashboard_filters(self):
+		"""Filters exactly as the dashboard sends them for this view"""
+		return {
+			"company": self.company,
+			"fiscal_year": self.fiscal_year,
+			"month": self.month or "",
+			"cost_center": self.cost_center or "",
+			"reporting_framework": self.reporting_framework or "",
+		}